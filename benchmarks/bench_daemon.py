@@ -0,0 +1,62 @@
+"""
+Round-trip latency of single EU queries against a warm daemon (Unix socket).
+
+    python -m benchmarks.bench_daemon --queries 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from source.daemon import Daemon, DaemonClient
+
+from benchmarks.synthetic import synthetic_world, write_world_csv
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--countries", type=int, default=50)
+    ap.add_argument("--resources", type=int, default=9)
+    ap.add_argument("--queries", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        world, weights = synthetic_world(args.countries, args.resources, seed=args.seed)
+        write_world_csv(Path(d) / "world.csv", world, weights)
+        names = list(world.country_names())
+
+        daemon = Daemon(base_dir=d, workers=0)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        sock = Path(d) / "daemon.sock"
+        asyncio.run_coroutine_threadsafe(daemon.start_unix(sock), loop).result()
+
+        req = {
+            "world": "world.csv", "self": names[0], "participants": names[:5],
+            "deltas": [{names[1]: {"R0": 1}}], "gamma": 0.9, "k": 1.0, "x0": 0.0, "C": -1.0,
+        }
+        latencies = []
+        with DaemonClient(unix=sock) as client:
+            client.request(req)  # warm the store
+            for _ in range(args.queries):
+                t = time.perf_counter()
+                assert client.request(req)["ok"]
+                latencies.append(time.perf_counter() - t)
+
+        asyncio.run_coroutine_threadsafe(daemon.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    latencies.sort()
+    pct = lambda q: 1e3 * latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"{args.queries} EU queries: p50 {pct(0.50):.3f} ms  p99 {pct(0.99):.3f} ms  max {1e3 * latencies[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
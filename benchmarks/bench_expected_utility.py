@@ -0,0 +1,67 @@
+"""
+Throughput of expected_utility_batch vs. calling expected_utility per candidate.
+
+    python -m benchmarks.bench_expected_utility --countries 50 --candidates 2000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from source.array_world import ArrayWorldState
+from source.expected_utility import expected_utility, expected_utility_batch
+
+from benchmarks.synthetic import synthetic_world
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--countries", type=int, default=50)
+    ap.add_argument("--resources", type=int, default=9)
+    ap.add_argument("--candidates", type=int, default=2000)
+    ap.add_argument("--participants", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    w0, weights = synthetic_world(args.countries, args.resources, seed=args.seed)
+    names = list(w0.country_names())
+    ends = []
+    for _ in range(args.candidates):
+        w = w0.copy()
+        for c in rng.sample(names, args.participants):
+            w.get_country(c).add(f"R{rng.randrange(args.resources - 1)}", rng.randint(0, 10))
+        ends.append(w)
+
+    kwargs = dict(
+        self_country=names[0],
+        participant_countries=names[: args.participants],
+        weights=weights,
+        gamma=0.9, N=3, k=1.0, x0=0.0, C=-1.0,
+    )
+
+    for label, start, cands in (
+        ("dict", w0, ends),
+        ("array", ArrayWorldState.from_world_state(w0), None),
+    ):
+        if cands is None:
+            cands = [ArrayWorldState.from_world_state(w, start.index) for w in ends]
+
+        t = time.perf_counter()
+        scalar = [expected_utility(start, w, **kwargs) for w in cands]
+        t_scalar = time.perf_counter() - t
+
+        t = time.perf_counter()
+        batch = expected_utility_batch(start, cands, **kwargs)
+        t_batch = time.perf_counter() - t
+
+        assert batch == scalar
+        print(
+            f"{label:5s} scalar {len(cands) / t_scalar:10.0f} EU/s   "
+            f"batch {len(cands) / t_batch:10.0f} EU/s   speedup x{t_scalar / t_batch:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
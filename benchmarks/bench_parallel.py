@@ -0,0 +1,71 @@
+"""
+Scaling of parallel_beam_search with the number of worker processes.
+
+Every run is the same search as the serial BeamSearch baseline (one global
+beam; only expansion and scoring are split), so the results are checked to be
+identical and speedup compares equal work.
+
+    python -m benchmarks.bench_parallel --countries 30 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from pathlib import Path
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.transforms import compile_transforms, load_transform_templates
+from source.search import SearchConfig, beam_search
+from source.parallel import parallel_beam_search
+
+TEMPLATE = Path(__file__).resolve().parent.parent / "template.txt"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--countries", type=int, default=30)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--beam", type=int, default=8)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    world = WorldState({
+        f"C{i}": CountryState(f"C{i}", {
+            "Population": float(rng.randint(50, 150)),
+            "MetallicElements": float(rng.randint(0, 60)),
+            "Timber": float(rng.randint(0, 60)),
+        })
+        for i in range(args.countries)
+    })
+    weights = ResourceWeights({
+        "MetallicElements": 0.2, "Timber": 0.2,
+        "MetallicAlloys": 0.6, "MetallicAlloysWaste": -0.6,
+        "Electronics": 1.0, "ElectronicsWaste": -1.0,
+        "Housing": 0.8, "HousingWaste": -0.8,
+    })
+    templates = load_transform_templates(TEMPLATE)
+    cfg = SearchConfig(beam_width=args.beam, max_depth=args.depth, top_k=5, transfers=(("Timber", 5),))
+
+    print(f"cpu_count={os.cpu_count()}")
+    t = time.perf_counter()
+    serial = beam_search(world, compile_transforms(templates).values(), self_country="C0", weights=weights, config=cfg)
+    base = time.perf_counter() - t
+    expected = [(r.describe(), r.eu) for r in serial]
+    print(f"serial      {base:7.2f}s  best EU={serial[0].eu:.6f}")
+    for n in args.workers:
+        t = time.perf_counter()
+        res = parallel_beam_search(world, templates, self_country="C0", weights=weights,
+                                   config=cfg, workers=n, chunks_per_worker=4)
+        dt = time.perf_counter() - t
+        if [(r.describe(), r.eu) for r in res] != expected:
+            raise SystemExit(f"workers={n}: results differ from the serial search")
+        speedup = base / dt
+        print(f"workers={n:2d}  {dt:7.2f}s  speedup x{speedup:.2f}  efficiency {speedup / n:.0%}  (identical results)")
+
+
+if __name__ == "__main__":
+    main()
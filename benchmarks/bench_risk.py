@@ -0,0 +1,30 @@
+"""
+Cost of Monte Carlo acceptance sampling (bit-packed masks) per sample count.
+
+    python -m benchmarks.bench_risk --participants 4 --samples 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from source.risk import simulate_acceptance
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--participants", type=int, default=4)
+    ap.add_argument("--samples", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    drs = {f"C{i}": 0.1 * (i - args.participants / 2) for i in range(args.participants)}
+    for n in args.samples:
+        t = time.perf_counter()
+        prof = simulate_acceptance(drs, 0.5, k=2.0, samples=n, seed=args.seed)
+        dt = time.perf_counter() - t
+        print(f"samples={n:>10,d}  {dt * 1e3:8.2f} ms  success rate {prof.success_rate:.4f}")
+
+
+if __name__ == "__main__":
+    main()
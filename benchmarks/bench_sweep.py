@@ -0,0 +1,54 @@
+"""
+Throughput of parameter_sweep over a gamma x k x x0 x C grid.
+
+    python -m benchmarks.bench_sweep --schedules 10 --axis 10
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from source.sweep import ParameterGrid, parameter_sweep, prepare_schedule
+
+from benchmarks.synthetic import synthetic_world
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--countries", type=int, default=20)
+    ap.add_argument("--resources", type=int, default=9)
+    ap.add_argument("--participants", type=int, default=4)
+    ap.add_argument("--schedules", type=int, default=1)
+    ap.add_argument("--axis", type=int, default=10, help="values per parameter (grid has axis^4 points)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    w0, weights = synthetic_world(args.countries, args.resources, seed=args.seed)
+    names = list(w0.country_names())
+    inputs = []
+    for i in range(args.schedules):
+        w = w0.copy()
+        for c in names[: args.participants]:
+            w.get_country(c).add(f"R{rng.randrange(args.resources - 1)}", rng.randint(0, 10))
+        inputs.append(prepare_schedule(
+            w0, w, weights, self_country=names[0], participant_countries=names[1: args.participants],
+            N=3, label=f"s{i}",
+        ))
+
+    n = args.axis
+    grid = ParameterGrid(
+        gamma=tuple(0.9 * (i + 1) / n for i in range(n)),
+        k=tuple(0.5 * (i + 1) for i in range(n)),
+        x0=tuple(0.01 * i for i in range(n)),
+        C=tuple(-0.1 * i for i in range(n)),
+    )
+    t = time.perf_counter()
+    table = parameter_sweep(inputs, grid)
+    dt = time.perf_counter() - t
+    print(f"{len(table)} points in {dt * 1e3:.2f} ms  ({len(table) / dt:,.0f} points/s)")
+
+
+if __name__ == "__main__":
+    main()
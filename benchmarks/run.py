@@ -0,0 +1,174 @@
+"""
+Benchmark suite: times the hot paths on synthetic worlds and writes JSON.
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --countries 10 100 1000 10000 --resources 9 100 500 --schedule-length 20
+
+Each result row records the parameters, the operation, how many times it ran
+per repeat, and the best / mean seconds per call across repeats.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from source.array_world import ArrayWorldState
+from source.parse import parse_world_and_weights_csv, parse_world_and_weights_csv_fast
+from source.quality import state_quality, state_qualities
+from source.score import discounted_reward
+from source.expected_utility import expected_utility
+from source.transforms import compile_transforms
+from source.successors import apply_action
+
+from benchmarks.synthetic import synthetic_world, synthetic_templates, synthetic_schedule, write_world_csv
+
+
+def _time(fn: Callable[[], object], *, number: int, repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t) / number)
+    return {"number": number, "repeat": repeat, "best_s": min(samples), "mean_s": sum(samples) / len(samples)}
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_case(
+    n_countries: int,
+    n_resources: int,
+    schedule_length: int,
+    *,
+    repeat: int,
+    seed: int,
+    max_number: int = 10_000,
+) -> List[dict]:
+    world, weights = synthetic_world(n_countries, n_resources, seed=seed)
+    transforms = list(compile_transforms(synthetic_templates(n_resources, 8, seed=seed)).values()) if n_resources >= 3 else []
+    names = list(world.country_names())
+    participants = names[: min(5, len(names))]
+    schedule = synthetic_schedule(world, transforms, schedule_length, seed=seed) if transforms else []
+    end = world.copy()
+    for a in schedule:
+        apply_action(end, a)
+
+    # Scale inner loop counts so each measurement does comparable work
+    cells = n_countries * n_resources
+    small = max(1, 20_000 // max(1, n_resources))
+
+    cases: Dict[str, tuple] = {
+        "WorldState.copy": (lambda: world.copy(), max(1, 200_000 // max(1, n_countries))),
+        "state_quality": (lambda: state_quality(world, names[0], weights), small),
+        "state_qualities(all)": (lambda: state_qualities(world, weights), max(1, 200_000 // max(1, cells))),
+        "discounted_reward": (
+            lambda: discounted_reward(world, end, names[0], weights, gamma=0.9, N=max(1, len(schedule))), small
+        ),
+        "expected_utility": (
+            lambda: expected_utility(
+                world, end, self_country=names[0], participant_countries=participants, weights=weights,
+                gamma=0.9, N=max(1, len(schedule)), k=1.0, x0=0.0, C=-1.0,
+            ),
+            max(1, small // len(participants)),
+        ),
+    }
+    # Same calls on the array layout (unchanged callers, ArrayWorldState inputs)
+    a_world = ArrayWorldState.from_world_state(world)
+    a_end = ArrayWorldState.from_world_state(end, a_world.index)
+    a_country = a_world.get_country(names[0])
+    d_country = world.get_country(names[0])
+    probe = next(iter(weights.weights))
+    cases.update({
+        "CountryState.get": (lambda: d_country.get(probe), 200_000),
+        "ArrayCountryView.get": (lambda: a_country.get(probe), 200_000),
+        "state_quality[array]": (lambda: state_quality(a_world, names[0], weights), small),
+        "discounted_reward[array]": (
+            lambda: discounted_reward(a_world, a_end, names[0], weights, gamma=0.9, N=max(1, len(schedule))), small
+        ),
+        "expected_utility[array]": (
+            lambda: expected_utility(
+                a_world, a_end, self_country=names[0], participant_countries=participants, weights=weights,
+                gamma=0.9, N=max(1, len(schedule)), k=1.0, x0=0.0, C=-1.0,
+            ),
+            max(1, small // len(participants)),
+        ),
+    })
+    if schedule:
+        def replay() -> None:
+            w = world.copy()
+            for a in schedule:
+                apply_action(w, a)
+        cases["apply_schedule"] = (replay, max(1, 20_000 // max(1, n_countries + len(schedule) * n_resources)))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ("wide", "long"):
+            path = write_world_csv(Path(tmp) / f"world_{layout}.csv", world, weights, layout=layout)
+            parse_n = max(1, 100_000 // max(1, cells))
+            cases[f"parse_{layout}"] = (lambda p=path: parse_world_and_weights_csv(p), parse_n)
+            cases[f"parse_{layout}_fast"] = (lambda p=path: parse_world_and_weights_csv_fast(p), parse_n)
+
+        for op, (fn, number) in cases.items():
+            rows.append({
+                "op": op,
+                "countries": n_countries,
+                "resources": n_resources,
+                "schedule_length": len(schedule),
+                **_time(fn, number=min(number, max_number), repeat=repeat),
+            })
+    return rows
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--countries", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--resources", type=int, nargs="+", default=[9, 50])
+    ap.add_argument("--schedule-length", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-number", type=int, default=10_000, help="cap on calls per repeat")
+    ap.add_argument("--out", type=Path, default=None, help="JSON file (default: stdout)")
+    args = ap.parse_args(argv)
+
+    results = []
+    for n_c in args.countries:
+        for n_r in args.resources:
+            results.extend(bench_case(
+                n_c, n_r, args.schedule_length,
+                repeat=args.repeat, seed=args.seed, max_number=args.max_number,
+            ))
+            print(f"done countries={n_c} resources={n_r}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out is None:
+        print(text)
+    else:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    return report
+
+
+if __name__ == "__main__":
+    main()
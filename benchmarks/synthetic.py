@@ -0,0 +1,106 @@
+"""
+Synthetic worlds, weights, transforms and schedules for benchmarks.
+Everything is driven by a seed, so the same parameters give the same data.
+"""
+from __future__ import annotations
+
+import csv
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.transforms import TransformTemplate, CompiledTransform
+from source.successors import Action, TransformAction, TransferAction, apply_action
+
+
+def resource_names(n_resources: int) -> List[str]:
+    """'Population' followed by R0..R{n-2}."""
+    if n_resources < 1:
+        raise ValueError("n_resources must be >= 1.")
+    return ["Population"] + [f"R{i}" for i in range(n_resources - 1)]
+
+
+def synthetic_world(
+    n_countries: int,
+    n_resources: int,
+    *,
+    seed: int = 0,
+    max_amount: int = 1000,
+) -> Tuple[WorldState, ResourceWeights]:
+    rng = random.Random(seed)
+    names = resource_names(n_resources)
+    world = WorldState()
+    for i in range(n_countries):
+        inv = {r: float(rng.randint(0, max_amount)) for r in names}
+        inv["Population"] = float(rng.randint(10, max_amount))
+        world.countries[f"C{i}"] = CountryState(f"C{i}", inv)
+    weights = ResourceWeights({r: (0.0 if r == "Population" else round(rng.uniform(-1, 1), 3)) for r in names})
+    return world, weights
+
+
+def synthetic_templates(n_resources: int, n_transforms: int, *, seed: int = 0) -> List[TransformTemplate]:
+    """Transforms that keep Population constant and turn 1-3 resources into 1-2 others."""
+    rng = random.Random(seed)
+    names = resource_names(n_resources)[1:]
+    if len(names) < 2:
+        raise ValueError("need at least 3 resources for synthetic transforms.")
+    out = []
+    for t in range(n_transforms):
+        picked = rng.sample(names, min(len(names), rng.randint(2, 5)))
+        k = max(1, len(picked) // 2)
+        ins = tuple((r, float(rng.randint(1, 5))) for r in picked[:k])
+        outs = tuple((r, float(rng.randint(1, 3))) for r in picked[k:])
+        out.append(TransformTemplate(f"T{t}", (("Population", 1.0),) + ins, (("Population", 1.0),) + outs))
+    return out
+
+
+def synthetic_schedule(
+    world: WorldState,
+    transforms: List[CompiledTransform],
+    length: int,
+    *,
+    seed: int = 0,
+    transfer_amount: float = 1.0,
+) -> List[Action]:
+    """A random feasible schedule of up to 'length' actions (applied to a copy of world)."""
+    rng = random.Random(seed)
+    w = world.copy()
+    names = list(w.country_names())
+    out: List[Action] = []
+    for _ in range(length * 20):
+        if len(out) >= length:
+            break
+        c = rng.choice(names)
+        if rng.random() < 0.8 or len(names) < 2:
+            action: Action = TransformAction(rng.choice(transforms), c)
+        else:
+            dst = rng.choice([n for n in names if n != c])
+            action = TransferAction(c, dst, f"R{rng.randrange(len(w.get_country(c).resources) - 1)}", transfer_amount)
+        if action.feasible(w):
+            apply_action(w, action)
+            out.append(action)
+    return out
+
+
+def write_world_csv(path: str | Path, world: WorldState, weights: ResourceWeights, *, layout: str = "wide") -> Path:
+    """Write a world in the WIDE or LONG layout parse_world_and_weights_csv reads."""
+    path = Path(path)
+    resources = list(dict.fromkeys(r for c in world.countries.values() for r in c.resources))
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        if layout == "wide":
+            w.writerow(["Country", *resources])
+            for name, c in world.countries.items():
+                w.writerow([name, *(repr(c.get(r)) for r in resources)])
+            w.writerow(["WEIGHTS", *(repr(weights.get(r)) for r in resources)])
+        elif layout == "long":
+            w.writerow(["Country", "Resource", "Amount", "Weight"])
+            first = True
+            for name, c in world.countries.items():
+                for r in resources:
+                    w.writerow([name, r, repr(c.get(r)), repr(weights.get(r)) if first else ""])
+                first = False
+        else:
+            raise ValueError(f"Unknown layout: {layout}")
+    return path
@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from source.world_state import WorldState, CountryState, ResourceWeights, Number
+
+if TYPE_CHECKING:
+    from source.state_hash import ZobristKeys
+
+
+class ResourceIndex:
+    """
+    Interned resource -> column mapping shared by array-backed worlds.
+
+    Columns are only ever appended, so a column number stays valid for the
+    lifetime of the index (and of every world built on top of it).
+    """
+    __slots__ = ("names", "_cols")
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names: List[str] = []
+        self._cols: Dict[str, int] = {}
+        for r in names:
+            self.intern(r)
+
+    def intern(self, resource: str) -> int:
+        """Return the column for resource, allocating a new one if needed."""
+        col = self._cols.get(resource)
+        if col is None:
+            col = len(self.names)
+            self._cols[resource] = col
+            self.names.append(resource)
+        return col
+
+    def get(self, resource: str) -> Optional[int]:
+        """Return the column for resource, or None if it was never interned."""
+        return self._cols.get(resource)
+
+    def __contains__(self, resource: object) -> bool:
+        return resource in self._cols
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+
+class _RowMapping(Mapping[str, Number]):
+    """Read-only dict-like view of one country's row (what CountryState.resources offers)."""
+    __slots__ = ("_view",)
+
+    def __init__(self, view: ArrayCountryView) -> None:
+        self._view = view
+
+    def __getitem__(self, resource: str) -> Number:
+        v = self._view
+        col = v._cols.get(resource)
+        if col is None or col >= v._ncols:
+            raise KeyError(resource)
+        return v._data[v.offset + col]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._view.world.index.names[: self._view._ncols])
+
+    def __len__(self) -> int:
+        return self._view._ncols
+
+    def items(self):  # type: ignore[override]
+        v = self._view
+        return zip(v.world.index.names[: v._ncols], v._data[v.offset:v.offset + v._ncols])
+
+    def values(self):  # type: ignore[override]
+        v = self._view
+        return v._data[v.offset:v.offset + v._ncols]
+
+
+class ArrayCountryView:
+    """
+    Thin CountryState-compatible view over one row of an ArrayWorldState.
+    Missing resources are treated as 0, exactly like CountryState.
+
+    The row's matrix, offset and width are cached on the view (and refreshed
+    by the world when it widens), so get() is one dict lookup and one index.
+    """
+    __slots__ = ("world", "name", "row", "offset", "_data", "_ncols", "_cols")
+
+    def __init__(self, world: ArrayWorldState, name: str, row: int) -> None:
+        self.world = world
+        self.name = name
+        self.row = row
+        self._cols = world.index._cols
+        self._sync()
+
+    def _sync(self) -> None:
+        w = self.world
+        self._data = w._data
+        self._ncols = w._ncols
+        self.offset = self.row * w._ncols
+
+    @property
+    def resources(self) -> Mapping[str, Number]:
+        return _RowMapping(self)
+
+    def get(self, resource: str) -> Number:
+        """Return amount of resource (defaults to 0)."""
+        col = self._cols.get(resource)
+        if col is None or col >= self._ncols:
+            return 0.0
+        return self._data[self.offset + col]
+
+    def has(self, reqs: Mapping[str, Number]) -> bool:
+        """
+        True if this country has at least the required amount of every resource in reqs.
+        """
+        for r, amt in reqs.items():
+            if self.get(r) < float(amt):
+                return False
+        return True
+
+    def add(self, resource: str, delta: Number) -> None:
+        """
+        Add delta to a resource. Delta may be negative.
+        Raises ValueError if the result would go negative.
+        """
+        cur = self.get(resource)
+        nxt = cur + float(delta)
+        if nxt < 0:
+            raise ValueError(
+                f"{self.name}: insufficient {resource}. "
+                f"current={cur}, delta={delta}, would_be={nxt}"
+            )
+        self._write(resource, cur, nxt)
+
+    def set(self, resource: str, amount: Number) -> None:
+        """
+        Overwrite a resource amount (used to restore exact values on undo).
+        Raises ValueError if amount is negative.
+        """
+        nxt = float(amount)
+        if nxt < 0:
+            raise ValueError(f"{self.name}: negative {resource}={nxt}.")
+        self._write(resource, self.get(resource), nxt)
+
+    def restore(self, resource: str, previous: Optional[Number]) -> None:
+        """Undo helper matching CountryState.restore (None restores 0)."""
+        self.set(resource, 0.0 if previous is None else previous)
+
+    def apply_delta_map(self, deltas: Mapping[str, Number]) -> None:
+        """
+        Apply multiple resource deltas as one atomic update.
+        If any would go negative, raise and do not partially apply.
+        """
+        plan = []
+        for r, d in deltas.items():
+            cur = self.get(r)
+            nxt = cur + float(d)
+            if nxt < 0:
+                raise ValueError(
+                    f"{self.name}: insufficient {r} for delta {d}. current={cur}"
+                )
+            plan.append((r, cur, nxt))
+        for r, cur, nxt in plan:
+            self._write(r, cur, nxt)
+
+    def _write(self, resource: str, cur: Number, nxt: Number) -> None:
+        """Single store path (mirrors CountryState._write): matrix cell, running weighted sum and state hash."""
+        w = self.world
+        col = w._column(resource)  # may widen the matrix and re-sync this view
+        self._data[self.offset + col] = nxt
+        if w._qcols is not None:
+            wt = w._qcols.get(col)
+            if wt:
+                w._wsum[self.row] += wt * (nxt - cur)
+        if w._zkeys is not None:
+            w._zhash[self.row] ^= w._zkeys.key(self.name, resource, cur) ^ w._zkeys.key(self.name, resource, nxt)
+
+    @property
+    def is_bound(self) -> bool:
+        return self.world._qcols is not None
+
+    def quality(self) -> Number:
+        """Per-capita State Quality from the world's running weighted sums (see ArrayWorldState.bind_weights)."""
+        w = self.world
+        if w._qcols is None:
+            raise ValueError(f"{self.name}: quality() requires bind_weights() first.")
+        return w._wsum[self.row] / max(self.get("Population"), w._pop_floor)
+
+    @property
+    def state_hash(self) -> int:
+        w = self.world
+        if w._zkeys is None:
+            raise ValueError(f"{self.name}: state_hash requires enable_hashing() first.")
+        return w._zhash[self.row]
+
+    def to_country_state(self) -> CountryState:
+        return CountryState(self.name, dict(self.resources.items()))
+
+
+class ArrayWorldState:
+    """
+    WorldState backend storing every inventory in one contiguous
+    countries x resources float matrix (row-major array('d')).
+
+    The resource -> column mapping lives in a ResourceIndex that copies share,
+    so the same column number means the same resource across a whole search.
+
+    It offers the WorldState API the search uses: checkpoint/rollback/replay
+    (undo log), apply_delta/apply_batch, bind_weights (incremental quality,
+    one running sum per row) and enable_hashing/state_hash, so a parsed or
+    snapshot-loaded world goes straight into BeamSearch, DepthFirstSearch and
+    the transposition table.
+
+    A single-cell get() costs about the same as a dict lookup; the layout pays
+    off in row-wise scoring (state_quality's row path, state_qualities) and
+    grows with the number of resources (see benchmarks.run, "[array]" ops).
+    """
+    __slots__ = (
+        "index", "_names", "_rows", "_data", "_ncols", "_views",
+        "_journal", "_qcols", "_wsum", "_pop_floor", "_zkeys", "_zhash",
+    )
+
+    def __init__(
+        self,
+        index: Optional[ResourceIndex] = None,
+        names: Iterable[str] = (),
+        data: Optional[array] = None,
+    ) -> None:
+        self.index = index if index is not None else ResourceIndex()
+        self._names: List[str] = list(names)
+        self._rows: Dict[str, int] = {n: i for i, n in enumerate(self._names)}
+        self._ncols = len(self.index)
+        size = len(self._names) * self._ncols
+        if data is None:
+            data = array("d", bytes(8 * size))
+        elif len(data) != size:
+            raise ValueError(f"data has {len(data)} cells, expected {size}.")
+        self._data = data
+        self._views: Dict[str, ArrayCountryView] = {}
+        self._journal: Optional[List[Tuple[ArrayCountryView, str, Number]]] = None
+        self._qcols: Optional[Dict[int, Number]] = None  # column -> weight while bound
+        self._wsum: List[Number] = []
+        self._pop_floor = 1.0
+        self._zkeys: Optional[ZobristKeys] = None
+        self._zhash: List[int] = []
+
+    @classmethod
+    def from_world_state(
+        cls, world: WorldState, index: Optional[ResourceIndex] = None
+    ) -> ArrayWorldState:
+        """Build an array-backed copy of a dict-backed WorldState."""
+        index = index if index is not None else ResourceIndex()
+        for c in world.countries.values():
+            for r in c.resources:
+                index.intern(r)
+        out = cls(index, world.countries.keys())
+        for name, c in world.countries.items():
+            base = out._rows[name] * out._ncols
+            for r, amt in c.resources.items():
+                out._data[base + index.get(r)] = float(amt)
+        return out
+
+    def to_world_state(self) -> WorldState:
+        """Convert back to a dict-backed WorldState."""
+        return WorldState({n: self.get_country(n).to_country_state() for n in self._names})
+
+    @property
+    def countries(self) -> Dict[str, ArrayCountryView]:
+        return {n: self.get_country(n) for n in self._names}
+
+    @property
+    def data(self) -> array:
+        """The raw row-major matrix (len(countries) x len(index) at the last resize)."""
+        return self._data
+
+    @property
+    def ncols(self) -> int:
+        return self._ncols
+
+    def get_country(self, name: str) -> ArrayCountryView:
+        view = self._views.get(name)
+        if view is None:
+            row = self._rows.get(name)
+            if row is None:
+                raise KeyError(f"Unknown country: {name}")
+            view = self._views[name] = ArrayCountryView(self, name, row)
+        return view
+
+    def add_country(self, name: str, resources: Optional[Mapping[str, Number]] = None) -> ArrayCountryView:
+        """Append a new (zero-filled) country row and optionally populate it."""
+        if name in self._rows:
+            raise ValueError(f"Country already exists: {name}")
+        for r in (resources or {}):
+            self.index.intern(r)
+        self._resize()
+        self._rows[name] = len(self._names)
+        self._names.append(name)
+        self._data.extend(array("d", bytes(8 * self._ncols)))
+        view = self.get_country(name)
+        for r, amt in (resources or {}).items():
+            self._data[view.offset + self.index.get(r)] = float(amt)
+        if self._qcols is not None:
+            self._wsum.append(self._row_wsum(view))
+        if self._zkeys is not None:
+            self._zhash.append(self._zkeys.country_hash(view))
+        return view
+
+    def row(self, name: str) -> Tuple[int, int]:
+        """Return the [start, stop) slice of the matrix holding this country's row."""
+        start = self.get_country(name).offset
+        return start, start + self._ncols
+
+    def copy(self) -> ArrayWorldState:
+        """Copy the matrix (one flat memcpy); the resource index stays shared."""
+        out = ArrayWorldState.__new__(ArrayWorldState)
+        out.index = self.index
+        out._names = self._names[:]
+        out._rows = dict(self._rows)
+        out._ncols = self._ncols
+        out._data = array("d", self._data)
+        out._views = {}
+        out._journal = None
+        out._qcols = self._qcols
+        out._wsum = self._wsum[:]
+        out._pop_floor = self._pop_floor
+        out._zkeys = self._zkeys
+        out._zhash = self._zhash[:]
+        return out
+
+    def country_names(self) -> Iterable[str]:
+        return self._rows.keys()
+
+    def _column(self, resource: str) -> int:
+        col = self.index.intern(resource)
+        if col >= self._ncols:
+            self._resize()
+        return col
+
+    def _resize(self) -> None:
+        """Widen every row to the index's current column count."""
+        new = len(self.index)
+        old = self._ncols
+        if new == old:
+            return
+        pad = array("d", bytes(8 * (new - old)))
+        data = array("d")
+        for i in range(len(self._names)):
+            data.extend(self._data[i * old:(i + 1) * old])
+            data.extend(pad)
+        self._data = data
+        self._ncols = new
+        for view in self._views.values():
+            view._sync()
+
+    def checkpoint(self) -> int:
+        """Start (or continue) the undo log and return a mark for rollback()."""
+        if self._journal is None:
+            self._journal = []
+        return len(self._journal)
+
+    def rollback(self, mark: int = 0) -> None:
+        """Undo every logged change made after checkpoint() returned 'mark'."""
+        journal = self._journal
+        if journal is None:
+            raise ValueError("rollback() requires checkpoint() first.")
+        if not 0 <= mark <= len(journal):
+            raise ValueError(f"Invalid checkpoint mark: {mark}")
+        while len(journal) > mark:
+            c, r, old = journal.pop()
+            c.restore(r, old)
+
+    def release(self) -> None:
+        """Stop logging and keep the current state (drops all marks)."""
+        self._journal = None
+
+    def apply_delta(self, country_name: str, deltas: Mapping[str, Number]) -> None:
+        """ArrayCountryView.apply_delta_map on one country, recorded in the undo log if active."""
+        c = self.get_country(country_name)
+        journal = self._journal
+        if journal is None:
+            c.apply_delta_map(deltas)
+            return
+        mark = len(journal)
+        for r in deltas:
+            journal.append((c, r, c.get(r)))
+        try:
+            c.apply_delta_map(deltas)
+        except ValueError:
+            del journal[mark:]
+            raise
+
+    def apply_batch(self, entries: Iterable[Tuple[str, str, Number]]) -> None:
+        """Atomic multi-country transaction; same contract as WorldState.apply_batch."""
+        plan: Dict[Tuple[str, str], List[Any]] = {}
+        for name, r, d in entries:
+            p = plan.get((name, r))
+            if p is None:
+                c = self.get_country(name)
+                cur = c.get(r)
+                p = plan[(name, r)] = [c, r, cur, cur]
+            p[3] += float(d)
+        for c, r, cur, nxt in plan.values():
+            if nxt < 0:
+                raise ValueError(
+                    f"{c.name}: insufficient {r} for batch delta {nxt - cur}. current={cur}"
+                )
+        journal = self._journal
+        for c, r, cur, nxt in plan.values():
+            if journal is not None:
+                journal.append((c, r, cur))
+            c._write(r, cur, nxt)
+
+    def replay(self, steps: Iterable[Any]) -> int:
+        """
+        Apply a schedule in place; same contract as WorldState.replay
+        (all-or-nothing, returns the mark taken before the first step).
+        """
+        mark = self.checkpoint()
+        try:
+            for step in steps:
+                if hasattr(step, "deltas"):
+                    if hasattr(step, "feasible") and not step.feasible(self):
+                        raise ValueError(f"Infeasible step: {step}")
+                    step = step.deltas()
+                self.apply_batch(
+                    (name, r, d) for name, deltas in step.items() for r, d in deltas.items()
+                )
+        except (KeyError, ValueError):
+            self.rollback(mark)
+            raise
+        return mark
+
+    def bind_weights(
+        self,
+        weights: ResourceWeights,
+        *,
+        exclude: Optional[Iterable[str]] = None,
+        pop_floor: float = 1.0,
+    ) -> None:
+        """
+        Enable incremental quality for every country: one running
+        sum_r w[r] * amount[r] per row, updated by every write.
+        Weights (minus 'exclude') are snapshotted; rebind after changing them.
+        """
+        exclude_set = set(exclude) if exclude is not None else set()
+        self._qcols = {
+            self.index.intern(r): float(w) for r, w in weights.weights.items()
+            if w and r not in exclude_set
+        }
+        self._pop_floor = pop_floor
+        self._wsum = [self._row_wsum(self.get_country(n)) for n in self._names]
+
+    def _row_wsum(self, view: ArrayCountryView) -> Number:
+        return sum(w * view.get(self.index.names[col]) for col, w in self._qcols.items())
+
+    def enable_hashing(self, keys: ZobristKeys) -> None:
+        """Enable incremental Zobrist hashing for every country (copies inherit it)."""
+        self._zkeys = keys
+        self._zhash = [keys.country_hash(self.get_country(n)) for n in self._names]
+
+    def state_hash(self) -> int:
+        """XOR of the per-country hashes; equal to WorldState.state_hash() for equal inventories."""
+        if self._zkeys is None:
+            raise ValueError("state_hash requires enable_hashing() first.")
+        h = 0
+        for x in self._zhash:
+            h ^= x
+        return h
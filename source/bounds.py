@@ -0,0 +1,154 @@
+"""
+Admissible (never too low) bounds on what a search node's descendants can reach.
+
+Without transfers each country only changes through its own transforms. For
+one country with amounts a, any sequence of applications x_t >= 0 keeps
+a + sum_t x_t * net_t >= 0, and its weighted-sum gain is sum_t x_t * v_t with
+v_t = sum_r w_r * net_t[r]. Two bounds on that gain are combined:
+
+- LP duality: prices lambda_r >= 0 on the non-renewable resources (never
+  produced by any transform) with sum_r lambda_r * consumed_t[r] >= v_t for
+  every t give gain <= sum_r lambda_r * a_r. lambda_r is the best weight gain
+  per unit of r consumed, max_t v_t / (non-renewables consumed by t).
+- Step count: at most 'remaining steps' applications, each worth <= max_t v_t.
+
+Quality is divided by Population, so transforms that change Population make
+the bound infinite (no pruning), as does a gainful transform that consumes no
+non-renewable resource (only the step bound is left then).
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from source.world_state import CountryState, WorldState, ResourceWeights
+from source.quality import state_quality
+from source.score import ScoreParams
+from source.probability import expected_utility_from_log, log_acceptance_probability
+from source.transforms import CompiledTransform
+
+
+@dataclass(frozen=True, slots=True)
+class QualityBound:
+    """Upper bound on the weighted-sum gain reachable by one country's transforms."""
+    prices: Optional[Dict[str, float]]  # lambda_r; None if the LP bound is unbounded
+    best_step: float                    # max_t v_t (>= 0): most one application can add
+    population_changes: bool            # some transform changes Population: no finite bound
+
+    def gain(self, country: CountryState, steps: Optional[int] = None) -> float:
+        """Upper bound on sum_r w_r * a_r gained within 'steps' applications (None = any number)."""
+        if self.population_changes:
+            return math.inf
+        g = math.inf
+        if self.prices is not None:
+            g = sum(p * country.get(r) for r, p in self.prices.items())
+        if steps is not None:
+            g = min(g, steps * self.best_step)
+        return g
+
+
+def quality_bound(
+    transforms: Iterable[CompiledTransform],
+    weights: ResourceWeights,
+    *,
+    exclude: Optional[Iterable[str]] = None,
+) -> QualityBound:
+    """Dual prices and per-step gain for the given transform set and weights."""
+    transforms = list(transforms)
+    exclude_set = set(exclude) if exclude is not None else set()
+
+    def w(r: str) -> float:
+        return 0.0 if r in exclude_set else weights.get(r)
+
+    produced = {r for t in transforms for r, d in zip(t.resources, t.net) if d > 0.0}
+    population_changes = any(
+        r == "Population" and d != 0.0 for t in transforms for r, d in zip(t.resources, t.net)
+    )
+
+    prices: Optional[Dict[str, float]] = {}
+    best_step = 0.0
+    for t in transforms:
+        v = sum(w(r) * d for r, d in zip(t.resources, t.net))
+        if v <= 0.0:
+            continue
+        best_step = max(best_step, v)
+        consumed = {r: -d for r, d in zip(t.resources, t.net) if d < 0.0 and r not in produced}
+        total = sum(consumed.values())
+        if total <= 0.0:
+            prices = None
+            continue
+        if prices is not None:
+            for r in consumed:
+                prices[r] = max(prices.get(r, 0.0), v / total)
+    return QualityBound(prices, best_step, population_changes)
+
+
+class EUBound:
+    """
+    Upper bound on the expected_utility of any extension of a node, for
+    searches without transfers (see module docstring).
+
+    DR of a descendant of length n is gamma^n * (Q_n - Q_0); it is bounded for
+    each possible n by the quality bound and maximized over n. Because the
+    sigmoid is increasing in DR (k >= 0), P(s) is bounded by the product over
+    the participants known so far (more participants only add factors <= 1),
+    and EU = C + P * (DR_self - C) by those two maxima.
+    """
+    __slots__ = ("world_start", "weights", "bound", "params", "max_depth", "pop_floor", "_q0")
+
+    def __init__(
+        self,
+        world_start: WorldState,
+        transforms: Iterable[CompiledTransform],
+        weights: ResourceWeights,
+        *,
+        params: ScoreParams = ScoreParams(),
+        max_depth: int,
+        pop_floor: float = 1.0,
+    ) -> None:
+        self.world_start = world_start
+        self.weights = weights
+        self.bound = quality_bound(transforms, weights)
+        self.params = params
+        self.max_depth = max_depth
+        self.pop_floor = pop_floor
+        self._q0: Dict[str, float] = {}
+
+    def _q_start(self, name: str) -> float:
+        q = self._q0.get(name)
+        if q is None:
+            q = self._q0[name] = state_quality(self.world_start, name, self.weights, pop_floor=self.pop_floor)
+        return q
+
+    def max_dr(self, world: WorldState, name: str, depth: int) -> float:
+        """Largest DR(name) any schedule extending this node (to max_depth) can have."""
+        gamma = self.params.gamma
+        c = world.get_country(name)
+        denom = max(c.get("Population"), self.pop_floor)
+        dq = state_quality(world, name, self.weights, pop_floor=self.pop_floor) - self._q_start(name)
+        best = -math.inf
+        for j in range(1, self.max_depth - depth + 1):
+            g = self.bound.gain(c, j)
+            if g == math.inf:
+                return math.inf
+            best = max(best, gamma ** (depth + j) * (dq + g / denom))
+        return best
+
+    def node(self, world: WorldState, participants: Sequence[str], self_country: str, depth: int) -> float:
+        """Upper bound on EU over all descendants of a node at 'depth' (-inf if it has none)."""
+        if depth >= self.max_depth:
+            return -math.inf
+        p = self.params
+        dr_self = self.max_dr(world, self_country, depth)
+        if dr_self == math.inf:
+            return math.inf
+        if dr_self <= p.C:
+            return p.C
+        log_p = 0.0
+        if p.k >= 0.0:
+            for name in participants:
+                dr = self.max_dr(world, name, depth)
+                if dr != math.inf:
+                    log_p += log_acceptance_probability(dr, k=p.k, x0=p.x0)
+        return expected_utility_from_log(log_p, dr_self, p.C)
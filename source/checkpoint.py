@@ -0,0 +1,396 @@
+"""
+Checkpoint and resume for BeamSearch.
+
+A checkpoint file is append-only; one level record is written per
+checkpointed beam level:
+
+    MAGIC
+    record* : uint8 type, uint32 payload length, payload
+
+    H  JSON header: search inputs (self country, participants, params,
+       config, fingerprints of the start world and transforms)
+    S  new strings (uint32 n, then n x uint16 length + UTF-8): countries,
+       resources and transform names, referenced by id afterwards
+    N  one search node: seq, EU, encoded actions, and the amounts that differ
+       from the shared root world (found via copy-on-write: only countries
+       whose inventory dict is no longer the root's are compared)
+    L  level commit: depth, counters, beam and best-so-far node seqs, and the
+       transposition-table entries touched or evicted since the previous L
+
+Nodes are written once, when they first appear in the beam or in the
+best-so-far heap; later levels refer to them by seq. A checkpoint therefore
+costs O(new nodes + changed table entries), not O(search state). Records after
+the last complete L (e.g. a run killed mid-write) are ignored and truncated
+on resume. Resuming restores the exact beam, heap layout, seq counter and LRU
+table order, so the remaining levels give the same results as an
+uninterrupted run.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from source.world_state import WorldState
+from source.successors import TransformAction, decode_action
+from source.state_hash import TTEntry
+from source.search import BeamSearch, DepthFirstSearch, ScheduleResult, SearchNode
+
+
+MAGIC = b"CSSRCH1\n"
+_REC = struct.Struct("<BI")
+_NODE = struct.Struct("<qdH")       # seq, eu, number of actions
+_ACT_T = struct.Struct("<BIIi")     # 'T', transform, country, n
+_ACT_X = struct.Struct("<BIIId")    # 'X', src, dst, resource, amount
+_DIFF = struct.Struct("<IId")       # country, resource, amount
+_LEVEL = struct.Struct("<IqqqqqQQQ")  # depth, expanded, generated, dup, bounds, next seq, heap evicted, tt hits, tt evictions
+_TT = struct.Struct("<Qdi")         # hash, eu, depth
+
+
+def _world_fingerprint(world: WorldState) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(world.country_names()):
+        for r, v in sorted(world.get_country(name).resources.items()):
+            h.update(f"{name}\0{r}\0{float(v)!r}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _header(search: BeamSearch) -> dict:
+    t = hashlib.blake2b(digest_size=16)
+    for tr in search.transforms:
+        t.update(repr((tr.name, tr.resources, tr.need, tr.net)).encode("utf-8"))
+    header = {
+        "version": 1,
+        "self_country": search.self_country,
+        "participants": search.participant_countries,
+        "params": dataclasses.asdict(search.params),
+        "config": {k: v for k, v in dataclasses.asdict(search.config).items() if k != "time_budget"},
+        "world": _world_fingerprint(search.world_start),
+        "transforms": t.hexdigest(),
+    }
+    return json.loads(json.dumps(header))  # normalize tuples to lists
+
+
+class SearchCheckpoint:
+    """
+    Periodic, incremental checkpoints of one BeamSearch run at 'path'.
+
+        ckpt = SearchCheckpoint("run.ckpt", every=1)
+        results = ckpt.run(BeamSearch(...))   # resumes if run.ckpt matches
+
+    To drive the search yourself, call begin() (or restore()) before the
+    first step() and write() after the levels to keep.
+
+    'every' is in levels; 'min_interval' (seconds) additionally skips
+    checkpoints taken sooner than that after the previous one.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        every: int = 1,
+        min_interval: float = 0.0,
+        durable: bool = False,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be >= 1.")
+        self.path = Path(path)
+        self.every = every
+        self.min_interval = min_interval
+        self.durable = durable  # fsync after every level record
+        self.bytes_written = 0
+        self.checkpoints = 0
+        self.seconds = 0.0      # time spent writing checkpoints
+        self._f: Optional[BinaryIO] = None
+        self._strings: Dict[str, int] = {}
+        self._written: Set[int] = set()
+        self._last = 0.0
+        self._last_depth: Optional[int] = None
+
+    # ----- writing -----
+
+    def _sid(self, s: str, new: List[str]) -> int:
+        i = self._strings.get(s)
+        if i is None:
+            i = self._strings[s] = len(self._strings)
+            new.append(s)
+        return i
+
+    def _encode_node(self, search: BeamSearch, node: SearchNode, new: List[str]) -> bytes:
+        parts = [_NODE.pack(node.seq, node.eu, len(node.actions))]
+        for a in node.actions:
+            if isinstance(a, TransformAction):
+                parts.append(_ACT_T.pack(ord("T"), self._sid(a.transform.name, new), self._sid(a.country, new), a.n))
+            else:
+                parts.append(_ACT_X.pack(
+                    ord("X"), self._sid(a.src, new), self._sid(a.dst, new), self._sid(a.resource, new), a.amount
+                ))
+        diffs = []
+        root = search.root.countries
+        for name, c in node.world.countries.items():
+            base = root[name].resources
+            if c.resources is base:
+                continue
+            for r, v in c.resources.items():
+                if r not in base or base[r] != v:
+                    diffs.append(_DIFF.pack(self._sid(name, new), self._sid(r, new), v))
+        parts.append(struct.pack("<I", len(diffs)))
+        parts.extend(diffs)
+        return b"".join(parts)
+
+    @staticmethod
+    def _record(kind: bytes, payload: bytes) -> bytes:
+        return _REC.pack(kind[0], len(payload)) + payload
+
+    @staticmethod
+    def _check_search(search: BeamSearch) -> None:
+        if isinstance(search, DepthFirstSearch):
+            raise ValueError("Only BeamSearch can be checkpointed.")
+
+    def begin(self, search: BeamSearch) -> None:
+        """Start a new checkpoint file for 'search'; call before its first step()."""
+        self._check_search(search)
+        self.close()
+        self._strings.clear()
+        self._written.clear()
+        self._last_depth = None
+        self._f = self.path.open("wb")
+        header = json.dumps(_header(search), separators=(",", ":")).encode("utf-8")
+        self._f.write(MAGIC + self._record(b"H", header))
+        if search.table is not None:
+            search.table.track_changes()
+
+    def write(self, search: BeamSearch) -> int:
+        """Append one level record (plus any new strings and nodes); returns bytes written."""
+        t = time.perf_counter()
+        if self._f is None:
+            raise ValueError("Call begin() or restore() before write().")
+        new_strings: List[str] = []
+        nodes = []
+        heap = search.heap_nodes()
+        for node in itertools.chain(search.beam, heap):
+            if node.seq not in self._written:
+                self._written.add(node.seq)
+                nodes.append(self._encode_node(search, node, new_strings))
+
+        nxt = search.peek_seq()
+        table = search.table
+        touched, evicted = table.drain_changes() if table is not None else ([], [])
+        level = [
+            _LEVEL.pack(
+                search.depth, search.nodes_expanded, search.nodes_generated, search.duplicates_pruned,
+                search.bounds_pruned, nxt, search.best.evicted,
+                table.hits if table is not None else 0, table.evictions if table is not None else 0,
+            ),
+            struct.pack(f"<I{len(search.beam)}q", len(search.beam), *(n.seq for n in search.beam)),
+            struct.pack(f"<I{len(heap)}q", len(heap), *(n.seq for n in heap)),
+            struct.pack(f"<I{len(evicted)}Q", len(evicted), *evicted),
+            struct.pack("<I", len(touched)),
+            b"".join(_TT.pack(h, e.eu, e.depth) for h, e in touched),
+        ]
+
+        out = []
+        if new_strings:
+            blob = [struct.pack("<I", len(new_strings))]
+            for s in new_strings:
+                b = s.encode("utf-8")
+                blob.append(struct.pack("<H", len(b)) + b)
+            out.append(self._record(b"S", b"".join(blob)))
+        out.extend(self._record(b"N", n) for n in nodes)
+        out.append(self._record(b"L", b"".join(level)))
+        data = b"".join(out)
+        self._f.write(data)
+        self._f.flush()
+        if self.durable:
+            os.fsync(self._f.fileno())
+
+        self.bytes_written += len(data)
+        self.checkpoints += 1
+        self._last_depth = search.depth
+        self._last = time.perf_counter()
+        self.seconds += self._last - t
+        return len(data)
+
+    def maybe_write(self, search: BeamSearch) -> None:
+        if search.depth % self.every == 0 and time.perf_counter() - self._last >= self.min_interval:
+            self.write(search)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    # ----- reading -----
+
+    def restore(self, search: BeamSearch) -> bool:
+        """
+        Load the last committed level from 'path' into a freshly constructed
+        search (same inputs as the checkpointed run) and reopen the file for
+        appending. Returns False (and leaves 'search' untouched) if there is no
+        usable checkpoint; raises ValueError if it belongs to a different search.
+        """
+        self._check_search(search)
+        try:
+            blob = self.path.read_bytes()
+        except OSError:
+            return False
+        if not blob.startswith(MAGIC):
+            return False
+
+        strings: List[str] = []
+        nodes: Dict[int, Tuple[float, list, list]] = {}
+        tt_log: List[Tuple[list, list]] = []
+        level: Optional[tuple] = None
+        committed = 0
+        header = None
+        pos = len(MAGIC)
+        while pos + _REC.size <= len(blob):
+            kind, n = _REC.unpack_from(blob, pos)
+            start, end = pos + _REC.size, pos + _REC.size + n
+            if end > len(blob):
+                break
+            payload = memoryview(blob)[start:end]
+            if kind == ord("H"):
+                header = json.loads(bytes(payload))
+                committed = end
+            elif kind == ord("S"):
+                (count,) = struct.unpack_from("<I", payload)
+                off = 4
+                for _ in range(count):
+                    (ln,) = struct.unpack_from("<H", payload, off)
+                    strings.append(bytes(payload[off + 2:off + 2 + ln]).decode("utf-8"))
+                    off += 2 + ln
+            elif kind == ord("N"):
+                seq, eu, acts, diffs = self._decode_node(payload, strings)
+                nodes[seq] = (eu, acts, diffs)
+            elif kind == ord("L"):
+                level, tt = self._decode_level(payload)
+                tt_log.append(tt)
+                committed = end
+                n_strings, n_nodes = len(strings), set(nodes)
+            pos = end
+
+        if header is None:
+            return False
+        if header != _header(search):
+            raise ValueError(f"{self.path}: checkpoint belongs to a different search.")
+        if level is None:
+            return False
+
+        self._load(search, level, tt_log, nodes, strings)
+        with self.path.open("r+b") as f:
+            f.truncate(committed)
+        self._strings = {s: i for i, s in enumerate(strings[:n_strings])}
+        self._written = n_nodes
+        self._last_depth = search.depth
+        self._f = self.path.open("ab")
+        if search.table is not None:
+            search.table.track_changes()
+        return True
+
+    @staticmethod
+    def _decode_node(payload: memoryview, strings: List[str]) -> Tuple[int, float, list, list]:
+        seq, eu, n_act = _NODE.unpack_from(payload)
+        off = _NODE.size
+        acts = []
+        for _ in range(n_act):
+            if payload[off] == ord("T"):
+                _, name, country, k = _ACT_T.unpack_from(payload, off)
+                acts.append(("T", strings[name], strings[country], k))
+                off += _ACT_T.size
+            else:
+                _, src, dst, res, amt = _ACT_X.unpack_from(payload, off)
+                acts.append(("X", strings[src], strings[dst], strings[res], amt))
+                off += _ACT_X.size
+        (n_diff,) = struct.unpack_from("<I", payload, off)
+        off += 4
+        diffs = [
+            (strings[c], strings[r], v)
+            for c, r, v in (_DIFF.unpack_from(payload, off + i * _DIFF.size) for i in range(n_diff))
+        ]
+        return seq, eu, acts, diffs
+
+    @staticmethod
+    def _decode_level(payload: memoryview) -> Tuple[tuple, Tuple[list, list]]:
+        head = _LEVEL.unpack_from(payload)
+        off = _LEVEL.size
+        out = []
+        for fmt in ("q", "q", "Q"):
+            (n,) = struct.unpack_from("<I", payload, off)
+            off += 4
+            out.append(list(struct.unpack_from(f"<{n}{fmt}", payload, off)))
+            off += n * 8
+        beam, heap, evicted = out
+        (n,) = struct.unpack_from("<I", payload, off)
+        off += 4
+        touched = [
+            (h, TTEntry(eu, d))
+            for h, eu, d in (_TT.unpack_from(payload, off + i * _TT.size) for i in range(n))
+        ]
+        return (head, beam, heap), (touched, evicted)
+
+    @staticmethod
+    def _load(
+        search: BeamSearch,
+        level: tuple,
+        tt_log: List[Tuple[list, list]],
+        nodes: Dict[int, Tuple[float, list, list]],
+        strings: List[str],
+    ) -> None:
+        (depth, expanded, generated, dup, bounds, nxt, heap_evicted, hits, evictions), beam, heap = level
+        transforms = {t.name: t for t in search.transforms}
+        built: Dict[int, SearchNode] = {}
+
+        def node(seq: int) -> SearchNode:
+            n = built.get(seq)
+            if n is None:
+                if seq == -1:
+                    n = SearchNode((), search.root, float("-inf"))
+                else:
+                    eu, acts, diffs = nodes[seq]
+                    world = search.root.copy()
+                    for c, r, v in diffs:
+                        world.get_country(c).set(r, v)
+                    n = SearchNode(tuple(decode_action(a, transforms) for a in acts), world, eu, seq)
+                built[seq] = n
+            return n
+
+        search.restore_state(
+            beam=[node(s) for s in beam],
+            heap=[node(s) for s in heap],
+            heap_evicted=heap_evicted,
+            depth=depth,
+            next_seq=nxt,
+            nodes_expanded=expanded,
+            nodes_generated=generated,
+            duplicates_pruned=dup,
+            bounds_pruned=bounds,
+        )
+        if search.table is not None:
+            for touched, evicted in tt_log:
+                search.table.apply_changes(touched, evicted)
+            search.table.hits = hits
+            search.table.evictions = evictions
+
+    # ----- driver -----
+
+    def run(self, search: BeamSearch) -> List[ScheduleResult]:
+        """BeamSearch.run with a checkpoint after every 'every' levels, resuming from 'path' if possible."""
+        if not self.restore(search):
+            self.begin(search)
+        search.start()
+        try:
+            while search.step():
+                self.maybe_write(search)
+            if self._last_depth != search.depth:
+                self.write(search)
+        finally:
+            self.close()
+        return search.results()
@@ -0,0 +1,248 @@
+"""
+Warm worker mode: keep parsed worlds, weights and compiled transforms in memory
+and answer requests over a local socket.
+
+    python -m source.daemon --unix /tmp/cs5260.sock
+    python -m source.daemon --port 8765            # localhost TCP
+
+The protocol is newline-delimited JSON. Each request line is the same object
+source.pipeline accepts ("evaluate", "quality", "search"), plus "ping",
+"stats" and "reload" (drop every cached file, in the search workers too).
+Each connection gets its responses in request order; a line longer than
+line_limit is skipped with an error reply. Evaluate/quality run on the event
+loop against the shared WorldStore, which re-reads a CSV when its size or
+mtime changes.
+Search is CPU-bound and runs in a process pool; each worker keeps its own
+WorldStore, so it also parses each file only once. Use several connections
+to run searches concurrently.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from source.pipeline import RequestContext, WorldStore, process_batch
+
+
+# Per-process (reload generation, context) for pool workers (created on first search)
+_WORKER: Dict[str, Tuple[int, RequestContext]] = {}
+
+
+def _run_search(base_dir: str, cache_size: int, generation: int, rid: Any, req: dict) -> dict:
+    entry = _WORKER.get(base_dir)
+    if entry is None or entry[0] != generation:
+        # First search here, or the daemon was reloaded since: start from an empty store
+        entry = _WORKER[base_dir] = (generation, RequestContext(WorldStore(cache_size), Path(base_dir)))
+    return process_batch([(rid, req)], entry[1])[0]
+
+
+class Daemon:
+    """asyncio server around a warm WorldStore and a search worker pool."""
+
+    def __init__(
+        self,
+        *,
+        base_dir: str | Path = ".",
+        cache_size: int = 32,
+        workers: Optional[int] = None,
+        snapshots: bool = False,
+        line_limit: int = 1 << 24,
+    ) -> None:
+        self.base_dir = Path(base_dir).resolve()
+        self.cache_size = cache_size
+        self.line_limit = line_limit
+        # Bumped by "reload"; each search carries it so workers drop their stale stores
+        self.generation = 0
+        self.store = WorldStore(cache_size, snapshots=snapshots)
+        self.ctx = RequestContext(self.store, self.base_dir)
+        # workers=0 runs searches on a thread instead of a process pool
+        self.executor: Executor = (
+            ThreadPoolExecutor(max_workers=1) if workers == 0
+            else ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        )
+        self.requests = 0
+        self.started = time.time()
+        self._servers: List[asyncio.AbstractServer] = []
+        self._connections: Set[asyncio.Task] = set()
+
+    async def dispatch(self, line: bytes) -> dict:
+        """Answer one request line; any failure becomes an {"ok": false} reply."""
+        self.requests += 1
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"ValueError: Invalid JSON: {e}"}
+        rid = req.get("id") if isinstance(req, dict) else None
+        try:
+            return await self._answer(rid, req)
+        except Exception as e:
+            return {"id": rid, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    async def _answer(self, rid: Any, req: Any) -> dict:
+        op = req.get("op", "evaluate") if isinstance(req, dict) else None
+
+        if op == "ping":
+            return {"id": rid, "ok": True}
+        if op == "stats":
+            return {
+                "id": rid, "ok": True, "requests": self.requests, "uptime_s": time.time() - self.started,
+                "cached": len(self.store), "hits": self.store.hits, "misses": self.store.misses,
+            }
+        if op == "reload":
+            self.store.invalidate()
+            self.generation += 1
+            return {"id": rid, "ok": True}
+        if op == "search":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, _run_search, str(self.base_dir), self.cache_size, self.generation, rid, req
+            )
+        return process_batch([(rid, req)], self.ctx)[0]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial  # last line without a newline (or EOF)
+                except asyncio.LimitOverrunError:
+                    self.requests += 1
+                    await self._skip_line(reader)
+                    error = f"ValueError: Request line longer than {self.line_limit} bytes"
+                    await self._send(writer, {"id": None, "ok": False, "error": error})
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await self._send(writer, await self.dispatch(line))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    async def _skip_line(reader: asyncio.StreamReader) -> None:
+        """Discard the rest of an over-long line (through its newline) in limit-sized pieces."""
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, result: dict) -> None:
+        writer.write(json.dumps(result, separators=(",", ":")).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def start_unix(self, path: str | Path) -> asyncio.AbstractServer:
+        path = Path(path)
+        if path.exists():
+            path.unlink()
+        server = await asyncio.start_unix_server(self.handle, path=str(path), limit=self.line_limit)
+        self._servers.append(server)
+        return server
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, host, port, limit=self.line_limit)
+        self._servers.append(server)
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+        connections = list(self._connections)
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class DaemonClient:
+    """Blocking client: one connection, one request/response at a time."""
+
+    def __init__(self, *, unix: Optional[str | Path] = None, address: Optional[Tuple[str, int]] = None) -> None:
+        if (unix is None) == (address is None):
+            raise ValueError("Pass exactly one of unix= or address=.")
+        if unix is not None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(str(unix))
+        else:
+            self.sock = socket.create_connection(address)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self.sock.makefile("rb")
+
+    def request(self, req: dict) -> dict:
+        self.sock.sendall(json.dumps(req, separators=(",", ":")).encode("utf-8") + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection.")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def serve(
+    *,
+    unix: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    **kwargs: Any,
+) -> None:
+    """Run a Daemon until cancelled."""
+    daemon = Daemon(**kwargs)
+    try:
+        if unix is not None:
+            await daemon.start_unix(unix)
+        if port is not None or unix is None:
+            server = await daemon.start_tcp(host, port or 0)
+            print(f"listening on {server.sockets[0].getsockname()}", flush=True)
+        await asyncio.Event().wait()
+    finally:
+        await daemon.close()
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--unix", help="Unix domain socket path")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, help="TCP port (default: TCP only if --unix is not given, any free port)")
+    ap.add_argument("--base-dir", type=Path, default=Path("."), help="directory request paths are relative to")
+    ap.add_argument("--cache-size", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=None, help="search processes (0 = thread, default: CPU count)")
+    ap.add_argument("--snapshots", action="store_true", help="also use binary .wcache snapshots next to CSVs")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(
+            unix=args.unix, host=args.host, port=args.port,
+            base_dir=args.base_dir, cache_size=args.cache_size, workers=args.workers, snapshots=args.snapshots,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from typing import Any, Iterable, Tuple
+
 from source.world_state import WorldState, ResourceWeights
-from source.score import discounted_reward
-from source.probability import acceptance_probability, schedule_success_probability
+from source.quality import state_qualities
+from source.score import check_discount, discounted_rewards, trajectory_rewards
+from source.probability import (
+    expected_utility_from_log,
+    log_acceptance_probabilities,
+    log_schedule_success_probability,
+)
 
 
 def expected_utility(
@@ -23,21 +30,100 @@ def expected_utility(
 
     where:
       - DR(self, s) = discounted_reward for the 'self_country'
-      - P(s) = product over participants of sigmoid(DR(country, s))
+      - P(s) = product over participants of sigmoid(DR(country, s)),
+        accumulated as a sum of logs (see expected_utility_from_log)
       - sigmoid(DR) = 1 / (1 + exp(-k*(DR-x0)))
       - C = utility if schedule fails (penalty / fallback)
+
+    Each distinct country (self included) is scored once via discounted_rewards.
     """
-    # 1) Compute discounted reward for each participant and convert to acceptance probability
-    probs: list[float] = []
-    for c in participant_countries:
-        dr_c = discounted_reward(world_start, world_end, c, weights, gamma=gamma, N=N)
-        probs.append(acceptance_probability(dr_c, k=k, x0=x0))
+    # 1) Discounted reward for self and every participant in one batch pass
+    dr = discounted_rewards(
+        world_start, world_end, weights,
+        gamma=gamma, N=N,
+        countries=[*participant_countries, self_country],
+    )
 
-    # 2) Multiply into schedule success probability
-    p_schedule = schedule_success_probability(probs)
+    # 2) Log acceptance probabilities summed into log P(s) (no underflow with many participants)
+    log_p = log_schedule_success_probability(
+        log_acceptance_probabilities((dr[c] for c in participant_countries), k=k, x0=x0)
+    )
 
-    # 3) Compute self discounted reward
-    dr_self = discounted_reward(world_start, world_end, self_country, weights, gamma=gamma, N=N)
+    # 3) Self discounted reward
+    dr_self = dr[self_country]
 
     # 4) Expected Utility
-    return (p_schedule * dr_self) + ((1.0 - p_schedule) * C)
\ No newline at end of file
+    return expected_utility_from_log(log_p, dr_self, C)
+
+
+def expected_utility_batch(
+    world_start: WorldState,
+    worlds_end: Iterable[WorldState],
+    *,
+    self_country: str,
+    participant_countries: list[str],
+    weights: ResourceWeights,
+    gamma: float,
+    N: int,
+    k: float,
+    x0: float,
+    C: float,
+) -> list[float]:
+    """
+    expected_utility for many candidate end states sharing one world_start.
+
+    Start-state qualities are computed once; each end state then costs one
+    state_qualities pass over the distinct participating countries. Results are
+    numerically identical to calling expected_utility per end state.
+    """
+    check_discount(gamma, N)
+    g = gamma ** N
+    names = list(dict.fromkeys([*participant_countries, self_country]))
+    q_start = state_qualities(world_start, weights, countries=names)
+
+    out: list[float] = []
+    for world_end in worlds_end:
+        q_end = state_qualities(world_end, weights, countries=names)
+        log_p = log_schedule_success_probability(log_acceptance_probabilities(
+            (g * (q_end[c] - q_start[c]) for c in participant_countries), k=k, x0=x0
+        ))
+        dr_self = g * (q_end[self_country] - q_start[self_country])
+        out.append(expected_utility_from_log(log_p, dr_self, C))
+    return out
+
+
+def expected_utility_trajectory(
+    world_start: WorldState,
+    steps: Iterable[Any],
+    *,
+    self_country: str,
+    participant_countries: list[str],
+    weights: ResourceWeights,
+    gamma: float,
+    k: float,
+    x0: float,
+    C: float,
+) -> list[float]:
+    """
+    EU(s[:n]) for every prefix n = 0..N of a schedule, from one
+    trajectory_rewards pass (see there for the accepted step forms).
+    """
+    traj = trajectory_rewards(
+        world_start, steps, weights,
+        gamma=gamma, countries=[*participant_countries, self_country],
+    )
+    out: list[float] = []
+    for dr in traj.rewards:
+        log_p = log_schedule_success_probability(
+            log_acceptance_probabilities((dr[c] for c in participant_countries), k=k, x0=x0)
+        )
+        out.append(expected_utility_from_log(log_p, dr[self_country], C))
+    return out
+
+
+def best_truncation(eus: list[float]) -> Tuple[int, float]:
+    """(n, EU) of the best non-empty prefix; ties go to the shorter prefix."""
+    if len(eus) < 2:
+        raise ValueError("Need at least one step.")
+    n = max(range(1, len(eus)), key=lambda i: (eus[i], -i))
+    return n, eus[n]
@@ -0,0 +1,199 @@
+"""
+Opt-in hot-path instrumentation.
+
+Disabled (the default) it costs nothing: the hot functions are the original
+objects. enable() swaps timing wrappers into every loaded source.* module
+(including names bound by 'from ... import'), disable() swaps the originals
+back. Search code bumps counters only behind an 'if instrument.ENABLED' check.
+
+    with instrument.profiling():
+        beam_search(...)
+    print(instrument.summary_table())
+"""
+from __future__ import annotations
+
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+ENABLED = False
+
+
+@dataclass(slots=True)
+class FunctionStats:
+    calls: int = 0
+    total_s: float = 0.0    # cumulative (inclusive of nested instrumented calls)
+    objects: int = 0        # objects copied / allocated, where measured
+    bytes: int = 0          # approximate bytes copied, where measured
+
+
+_stats: Dict[str, FunctionStats] = {}
+_counters: Dict[str, int] = {}
+_maxima: Dict[str, int] = {}
+
+
+def _copy_size(args: tuple, result: object) -> Tuple[int, int]:
+    # WorldState.copy: one CountryState wrapper per country (inventories are shared)
+    countries = result.countries  # type: ignore[attr-defined]
+    if not countries:
+        return 0, 0
+    return len(countries), len(countries) * sys.getsizeof(next(iter(countries.values())))
+
+
+def _own_size(args: tuple, result: object) -> Tuple[int, int]:
+    # CountryState._own: one inventory dict cloned
+    return 1, sys.getsizeof(args[0].resources)
+
+
+# (module, attribute path, optional (objects, bytes) measure)
+HOT_PATHS: List[Tuple[str, str, Optional[Callable[[tuple, object], Tuple[int, int]]]]] = [
+    ("source.world_state", "WorldState.copy", _copy_size),
+    ("source.world_state", "CountryState._own", _own_size),
+    ("source.world_state", "CountryState.apply_delta_map", None),
+    ("source.quality", "state_quality", None),
+    ("source.quality", "state_qualities", None),
+    ("source.score", "undiscounted_reward", None),
+    ("source.score", "discounted_reward", None),
+    ("source.score", "discounted_rewards", None),
+    ("source.probability", "log_acceptance_probabilities", None),
+    ("source.probability", "expected_utility_from_log", None),
+    ("source.expected_utility", "expected_utility", None),
+    ("source.expected_utility", "expected_utility_batch", None),
+    ("source.parse", "parse_world_and_weights_csv", None),
+    ("source.parse", "parse_world_and_weights_csv_fast", None),
+]
+
+# qualified name -> (owner object, attribute, original, wrapper)
+_installed: Dict[str, Tuple[object, str, Callable, Callable]] = {}
+
+
+def _wrap(name: str, fn: Callable, measure: Optional[Callable[[tuple, object], Tuple[int, int]]]) -> Callable:
+    st = _stats.setdefault(name, FunctionStats())
+    perf = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t = perf()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            st.total_s += perf() - t
+            st.calls += 1
+        if measure is not None:
+            objs, nbytes = measure(args, result)
+            st.objects += objs
+            st.bytes += nbytes
+        return result
+
+    return wrapper
+
+
+def _swap_aliases(old: Callable, new: Callable) -> None:
+    """Rebind every module-level name in source.* that refers to 'old'."""
+    for mod_name, mod in list(sys.modules.items()):
+        if mod is None or not (mod_name == "source" or mod_name.startswith("source.")):
+            continue
+        for attr, value in list(vars(mod).items()):
+            if value is old:
+                setattr(mod, attr, new)
+
+
+def enable() -> None:
+    """Install timing wrappers on HOT_PATHS (idempotent)."""
+    global ENABLED
+    import importlib
+
+    for mod_name, path, measure in HOT_PATHS:
+        name = f"{mod_name}.{path}"
+        if name in _installed:
+            continue
+        owner: object = importlib.import_module(mod_name)
+        *parents, attr = path.split(".")
+        for p in parents:
+            owner = getattr(owner, p)
+        original = getattr(owner, attr)
+        wrapper = _wrap(name, original, measure)
+        if isinstance(owner, type):
+            setattr(owner, attr, wrapper)
+        else:
+            _swap_aliases(original, wrapper)
+        _installed[name] = (owner, attr, original, wrapper)
+    ENABLED = True
+
+
+def disable() -> None:
+    """Restore the original functions; collected stats are kept until reset()."""
+    global ENABLED
+    for owner, attr, original, wrapper in _installed.values():
+        if isinstance(owner, type):
+            setattr(owner, attr, original)
+        else:
+            _swap_aliases(wrapper, original)
+    _installed.clear()
+    ENABLED = False
+
+
+def reset() -> None:
+    # Zero in place: installed wrappers hold references to their FunctionStats
+    for st in _stats.values():
+        st.calls, st.total_s, st.objects, st.bytes = 0, 0.0, 0, 0
+    _counters.clear()
+    _maxima.clear()
+
+
+@contextmanager
+def profiling(*, fresh: bool = True) -> Iterator[None]:
+    """enable() for the duration of a block (optionally starting from reset())."""
+    if fresh:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def count(name: str, n: int = 1) -> None:
+    """Bump a search-level counter (call behind 'if instrument.ENABLED')."""
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def observe_max(name: str, value: int) -> None:
+    """Track the maximum of a gauge such as frontier size."""
+    if value > _maxima.get(name, value - 1):
+        _maxima[name] = value
+
+
+def report() -> dict:
+    return {
+        "functions": {k: asdict(v) for k, v in _stats.items() if v.calls},
+        "counters": dict(_counters),
+        "maxima": dict(_maxima),
+    }
+
+
+def summary_table() -> str:
+    """Fixed-width table of function stats (by cumulative time) and counters."""
+    rows = sorted(((k, v) for k, v in _stats.items() if v.calls), key=lambda kv: kv[1].total_s, reverse=True)
+    width = max([len(k) for k, _ in rows] + [len(k) + 6 for k in [*_counters, *_maxima]] + [len("function")])
+    lines = [f"{'function':<{width}}  {'calls':>10}  {'total_s':>10}  {'us/call':>9}  {'objects':>9}  {'bytes':>11}"]
+    for k, v in rows:
+        lines.append(
+            f"{k:<{width}}  {v.calls:>10}  {v.total_s:>10.4f}  {1e6 * v.total_s / v.calls:>9.2f}  "
+            f"{v.objects:>9}  {v.bytes:>11}"
+        )
+    for k, n in sorted(_counters.items()):
+        lines.append(f"{k:<{width}}  {n:>10}")
+    for k, n in sorted(_maxima.items()):
+        lines.append(f"{k + ' (max)':<{width}}  {n:>10}")
+    return "\n".join(lines)
+
+
+def dump_json(path: str | Path) -> None:
+    Path(path).write_text(json.dumps(report(), indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.score import ScoreParams
+from source.transforms import TransformTemplate, compile_transforms
+from source import instrument
+from source.successors import Action, EncodedAction, apply_action, decode_action, encode_action, expanded, iter_actions
+from source.search import BeamSearch, ScheduleResult, SearchConfig, SearchNode, _BoundedHeap
+
+
+@dataclass(frozen=True, slots=True)
+class SharedWorldSpec:
+    """
+    Everything a worker needs to attach to a shared world snapshot.
+    The block holds len(countries) inventory rows followed by one weights row,
+    each len(resources) float64 values.
+    """
+    shm_name: str
+    countries: Tuple[str, ...]
+    resources: Tuple[str, ...]
+    weight_names: Tuple[str, ...] = ()  # weighted resources in their original order
+
+
+class SharedWorld:
+    """
+    A WorldState + ResourceWeights snapshot published in multiprocessing.shared_memory.
+    Use as a context manager; the block is unlinked on exit.
+    """
+
+    def __init__(self, world: WorldState, weights: ResourceWeights) -> None:
+        resources: Dict[str, None] = {}
+        for c in world.countries.values():
+            resources.update(dict.fromkeys(c.resources))
+        resources.update(dict.fromkeys(weights.weights))
+        countries = tuple(world.country_names())
+        cols = tuple(resources)
+
+        data = array("d")
+        for name in countries:
+            c = world.get_country(name)
+            data.extend(c.get(r) for r in cols)
+        data.extend(weights.get(r) for r in cols)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+        self._shm.buf[: len(data) * data.itemsize] = data.tobytes()
+        self.spec = SharedWorldSpec(self._shm.name, countries, cols, tuple(weights.weights))
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> SharedWorld:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach_shared_world(spec: SharedWorldSpec) -> Tuple[WorldState, ResourceWeights]:
+    """Rebuild the (WorldState, ResourceWeights) published by SharedWorld."""
+    shm = shared_memory.SharedMemory(name=spec.shm_name)
+    try:
+        ncols = len(spec.resources)
+        values = array("d")
+        values.frombytes(bytes(shm.buf[: (len(spec.countries) + 1) * ncols * 8]))
+    finally:
+        shm.close()
+
+    world = WorldState()
+    for i, name in enumerate(spec.countries):
+        row = values[i * ncols:(i + 1) * ncols]
+        world.countries[name] = CountryState(name, dict(zip(spec.resources, row)))
+    wrow = dict(zip(spec.resources, values[len(spec.countries) * ncols:]))
+    # Same order as the published weights, so weighted sums add up in the same order
+    weights = ResourceWeights({r: wrow[r] for r in spec.weight_names})
+    return world, weights
+
+
+# Per-process state installed by _init_worker (one attach per worker, not per task)
+_WORKER: dict = {}
+
+
+def _init_worker(
+    spec: SharedWorldSpec,
+    templates: Sequence[TransformTemplate],
+    self_country: str,
+    participant_countries: Optional[Sequence[str]],
+    params: ScoreParams,
+    config: SearchConfig,
+) -> None:
+    world, weights = attach_shared_world(spec)
+    transforms = compile_transforms(templates)
+    _WORKER.update(
+        transforms=transforms,
+        search=BeamSearch(
+            world, transforms.values(),
+            self_country=self_country,
+            weights=weights,
+            participant_countries=participant_countries,
+            params=params,
+            config=config,
+        ),
+    )
+
+
+def _score_ranges(
+    task: Tuple[int, List[Tuple[EncodedAction, ...]], Optional[int]],
+) -> Tuple[List[int], List[Tuple[int, int, EncodedAction, float]], bytes, bytes]:
+    """
+    Worker task: expand beam nodes lo, lo+1, ... (given as encoded schedules)
+    and score their successors in iter_actions order.
+
+    A successor whose state already occurred earlier in the task is not
+    scored. Only the task's 'keep' best successors by (EU, order) come back
+    with their encoded action (all of them if keep is None). With a
+    transposition table, the hash and EU (NaN if not scored) of every
+    successor come back too, as float64/uint64 bytes, so the parent can replay
+    its LRU table in serial order.
+
+    Returns (successor count per node, kept (beam index, successor index,
+    encoded action, EU) in serial order, hashes, EUs).
+    """
+    lo, prefixes, keep = task
+    transforms = _WORKER["transforms"]
+    search: BeamSearch = _WORKER["search"]
+    hashing = search.table is not None
+    counts: List[int] = []
+    best = _BoundedHeap(keep) if keep is not None else None
+    kept: List[Tuple[int, int, EncodedAction, float]] = []
+    hashes, eus = array("Q"), array("d")
+    seen: Set[int] = set()
+    pos = 0
+    for i, prefix in enumerate(prefixes, lo):
+        actions = tuple(decode_action(e, transforms) for e in prefix)
+        world = search.root.copy()
+        for a in actions:
+            apply_action(world, a)
+        n = 0
+        for j, action in enumerate(iter_actions(world, search.transforms, transfers=search.config.transfers)):
+            n += 1
+            pos += 1
+            child = actions + (action,)
+            with expanded(world, action) as w:
+                if hashing:
+                    h = search.node_hash(w, child)
+                    hashes.append(h)
+                    if h in seen:
+                        eus.append(math.nan)
+                        continue
+                    seen.add(h)
+                eu = search.score(w, child)
+            if hashing:
+                eus.append(eu)
+            entry = (i, j, encode_action(action), eu)
+            if best is None:
+                kept.append(entry)
+            elif best.admits(eu):
+                best.push(eu, pos, entry)
+        counts.append(n)
+    if best is not None:
+        kept = sorted(entry for _, _, entry in best.items)
+    return counts, kept, hashes.tobytes(), eus.tobytes()
+
+
+class _PooledBeamSearch(BeamSearch):
+    """BeamSearch whose levels are expanded and scored on a process pool."""
+
+    def __init__(self, *args, pool: ProcessPoolExecutor, tasks: int, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+        self.tasks = tasks
+        self._by_name = {t.name: t for t in self.transforms}
+
+    def _successor(
+        self, kept: Dict[Tuple[int, int], Tuple[EncodedAction, float]], i: int, j: int
+    ) -> Tuple[Tuple[Action, ...], WorldState]:
+        """Schedule and world of successor j of beam node i."""
+        node = self.beam[i]
+        hit = kept.get((i, j))
+        if hit is not None:
+            action = decode_action(hit[0], self._by_name)
+        else:  # not sent back by its worker: enumerate the node again
+            successors = iter_actions(node.world, self.transforms, transfers=self.config.transfers)
+            action = next(islice(successors, j, None))
+        world = node.world.copy()
+        apply_action(world, action)
+        return node.actions + (action,), world
+
+    def step(self) -> bool:
+        """
+        Expand one depth level. Workers expand contiguous runs of beam nodes;
+        this process replays their results in serial order through the
+        transposition table, bound and heaps, and builds worlds only for the
+        successors still kept at the end of the level.
+        """
+        cfg = self.config
+        if self.depth >= cfg.max_depth or not self.beam or self._out_of_time():
+            return False
+
+        beam = self.beam
+        # Without bound pruning a successor outside its task's best can never be kept
+        keep = None if self.bound is not None else max(min(cfg.beam_width, cfg.frontier_cap), cfg.top_k)
+        n_tasks = min(len(beam), self.tasks)
+        cuts = [len(beam) * t // n_tasks for t in range(n_tasks + 1)]
+        tasks = [
+            (lo, [tuple(encode_action(a) for a in n.actions) for n in beam[lo:hi]], keep)
+            for lo, hi in zip(cuts, cuts[1:])
+        ]
+        counts: List[int] = []
+        kept: Dict[Tuple[int, int], Tuple[EncodedAction, float]] = {}
+        hashes, eus = array("Q"), array("d")
+        for task_counts, task_kept, task_hashes, task_eus in self.pool.map(_score_ranges, tasks):
+            counts.extend(task_counts)
+            kept.update(((i, j), (e, eu)) for i, j, e, eu in task_kept)
+            hashes.frombytes(task_hashes)
+            eus.frombytes(task_eus)
+
+        table = self.table
+        depth = self.depth + 1
+        frontier = _BoundedHeap(cfg.frontier_cap)
+        pending: Dict[int, Tuple[int, int]] = {}  # seq -> (beam index, successor index), built after the level
+        base = 0
+        for i, (node, count) in enumerate(zip(beam, counts)):
+            base, first = base + count, base
+            if node.actions and self.hopeless(node.world, node.actions):
+                continue
+            self.nodes_expanded += 1
+            for j in range(count):
+                if self._out_of_time():
+                    break
+                built = None
+                if table is not None:
+                    h = hashes[first + j]
+                    if table.is_duplicate(h, depth):
+                        self.duplicates_pruned += 1
+                        if instrument.ENABLED:
+                            instrument.count("search.duplicates_pruned")
+                        continue
+                    eu = eus[first + j]
+                    if math.isnan(eu):
+                        # A repeat its worker skipped, but the table no longer has it
+                        # (evicted, or first reached under a hopeless node)
+                        built = self._successor(kept, i, j)
+                        eu = self.score(built[1], built[0])
+                else:
+                    hit = kept.get((i, j))
+                    eu = hit[1] if hit is not None else None
+                self.nodes_generated += 1
+                if instrument.ENABLED:
+                    instrument.count("search.nodes_generated")
+                if table is not None:
+                    table.store(h, eu, depth)
+                if eu is None:
+                    continue
+                keep_best = self.best.admits(eu)
+                keep_frontier = frontier.admits(eu)
+                if keep_frontier and self.bound is not None:
+                    built = built or self._successor(kept, i, j)
+                    keep_frontier = not self.hopeless(built[1], built[0])
+                if not (keep_frontier or keep_best):
+                    continue
+                seq = self._take_seq()
+                if built is not None:
+                    child_node = SearchNode(built[0], built[1], eu, seq)
+                else:
+                    child_node = SearchNode((), None, eu, seq)
+                    pending[seq] = (i, j)
+                if keep_frontier:
+                    frontier.push(eu, seq, child_node)
+                if keep_best:
+                    self.best.push(eu, seq, child_node)
+
+        if instrument.ENABLED:
+            instrument.count("search.nodes_expanded", len(beam))
+            instrument.count("search.frontier_evictions", frontier.evicted)
+            instrument.observe_max("search.frontier_size", len(frontier.items))
+        next_beam = frontier.best(cfg.beam_width)
+        for n in chain(next_beam, self.heap_nodes()):
+            where = pending.pop(n.seq, None)
+            if where is not None:
+                n.actions, n.world = self._successor(kept, *where)
+        self.beam = next_beam
+        self.depth += 1
+        return bool(self.beam)
+
+
+def parallel_beam_search(
+    world_start: WorldState,
+    templates: Iterable[TransformTemplate],
+    *,
+    self_country: str,
+    weights: ResourceWeights,
+    participant_countries: Optional[Sequence[str]] = None,
+    params: ScoreParams = ScoreParams(),
+    config: SearchConfig = SearchConfig(),
+    workers: Optional[int] = None,
+    chunks_per_worker: int = 1,
+) -> List[ScheduleResult]:
+    """
+    beam_search with each level's expansion and scoring split across a process pool.
+
+    This process keeps the single global beam, transposition table and top_k
+    exactly as BeamSearch does. Per level it splits the beam into
+    workers * chunks_per_worker contiguous runs of nodes; workers read the start
+    world and weights once from shared memory, expand and score their nodes'
+    successors (skipping repeats within the run) and return only the few that
+    could still be kept, plus each successor's hash and EU when the
+    transposition table is on. The search, and its results, are the same as
+    beam_search's for any workers / chunks_per_worker.
+    """
+    templates = list(templates)
+    transforms = compile_transforms(templates)
+    workers = workers or os.cpu_count() or 1
+
+    with SharedWorld(world_start, weights) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared.spec, templates, self_country, participant_countries, params, config),
+        ) as pool:
+            return _PooledBeamSearch(
+                world_start, transforms.values(),
+                self_country=self_country,
+                weights=weights,
+                participant_countries=participant_countries,
+                params=params,
+                config=config,
+                pool=pool,
+                tasks=workers * max(1, chunks_per_worker),
+            ).run()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import csv
+from array import array
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import Dict, Iterable, Optional, Tuple
 
 from source.world_state import WorldState, CountryState, ResourceWeights, Number
+from source.array_world import ArrayWorldState, ResourceIndex
 
 
 # Required (*) resources from the project spec.
@@ -47,7 +50,8 @@ def parse_world_and_weights_csv(
     *,
     required_resources: Optional[Iterable[str]] = None,
     weights_row_names: Iterable[str] = ("WEIGHTS", "Weights", "weights"),
-) -> Tuple[WorldState, ResourceWeights]:
+    cache: bool = False,
+) -> Tuple[WorldState | ArrayWorldState, ResourceWeights]:
     """
     Parse a CSV into (WorldState, ResourceWeights).
 
@@ -71,11 +75,22 @@ def parse_world_and_weights_csv(
     Notes:
     - Missing resources default to 0.
     - Weights default to 0 if not provided.
+    - cache=True loads through a binary snapshot next to the CSV
+      (see source.world_cache), re-parsing only when the CSV changed, and
+      returns the snapshot's ArrayWorldState as is (same world API, no
+      per-country dicts built at startup).
     """
     csv_path = Path(csv_path)
     if not csv_path.exists():
         raise FileNotFoundError(csv_path)
 
+    if cache:
+        from source.world_cache import load_world_cached
+
+        return load_world_cached(
+            csv_path, required_resources=required_resources, weights_row_names=weights_row_names
+        )
+
     req = set(required_resources) if required_resources is not None else set(REQUIRED_RESOURCES)
 
     with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
@@ -174,4 +189,220 @@ def parse_world_and_weights_csv(
         for r in req:
             weights.weights.setdefault(r, 0.0)
 
-        return world, weights
\ No newline at end of file
+        return world, weights
+
+
+def _fast_number(s: Optional[str]) -> Number:
+    """_to_number with a float() fast path (float() already strips whitespace)."""
+    try:
+        return float(s)
+    except (TypeError, ValueError):
+        return _to_number(s)
+
+
+def parse_world_and_weights_csv_fast(
+    csv_path: str | Path,
+    *,
+    required_resources: Optional[Iterable[str]] = None,
+    weights_row_names: Iterable[str] = ("WEIGHTS", "Weights", "weights"),
+    chunk_size: int = 65536,
+    cache: bool = False,
+) -> Tuple[ArrayWorldState, ResourceWeights]:
+    """
+    Same layouts and results as parse_world_and_weights_csv, but:
+
+    - column positions are resolved once from the header and rows are read as
+      plain lists (csv.reader) in chunks of 'chunk_size';
+    - LONG rows are collected as (row, column, amount) triples and written into
+      an ArrayWorldState matrix in one pass at the end;
+    - required resources are added as index columns (zero-filled) instead of a
+      setdefault per country;
+    - cache=True loads through a binary snapshot (see source.world_cache).
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+
+    if cache:
+        from source.world_cache import load_world_cached
+
+        return load_world_cached(
+            csv_path, required_resources=required_resources, weights_row_names=weights_row_names
+        )
+
+    req = set(required_resources) if required_resources is not None else set(REQUIRED_RESOURCES)
+    weights_rows = set(weights_row_names)
+
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("CSV has no header row / fieldnames.")
+
+        headers = [_normalize_header(h) for h in header]
+        lower = [h.lower() for h in headers]
+        header_set = set(lower)
+
+        long_resource_keys = {"resource", "resourcename", "resource_name"}
+        long_country_keys = {"country", "countryname", "country_name"}
+        long_amount_keys = {"amount", "qty", "quantity", "value"}
+        long_weight_keys = {"weight", "w"}
+
+        is_long = (header_set & long_resource_keys) and (header_set & long_country_keys) and (header_set & long_amount_keys)
+
+        index = ResourceIndex()
+        countries: Dict[str, int] = {}
+        weights = ResourceWeights()
+        chunks = iter(lambda: list(islice(reader, chunk_size)), [])
+
+        if is_long:
+            def pick(candidates: set[str]) -> int:
+                for j, h in enumerate(lower):
+                    if h in candidates:
+                        return j
+                raise ValueError(f"Missing expected column from {candidates} in LONG format CSV.")
+
+            jc, jr, ja = pick(long_country_keys), pick(long_resource_keys), pick(long_amount_keys)
+            jw = next((j for j, h in enumerate(lower) if h in long_weight_keys), None)
+            need = max(jc, jr, ja)
+            cells_row = array("l")
+            cells_col = array("l")
+            cells_val = array("d")
+            intern = index.intern
+            row_of = countries.get
+            add_row, add_col, add_val = cells_row.append, cells_col.append, cells_val.append
+
+            for chunk in chunks:
+                for row in chunk:
+                    if len(row) <= need:
+                        if len(row) <= max(jc, jr):
+                            continue
+                        row = row + [""] * (need + 1 - len(row))
+                    country = row[jc].strip()
+                    resource = row[jr].strip()
+                    if not country or not resource:
+                        continue
+                    ri = row_of(country)
+                    if ri is None:
+                        ri = countries[country] = len(countries)
+                    add_row(ri)
+                    add_col(intern(resource))
+                    try:
+                        add_val(float(row[ja]))
+                    except ValueError:
+                        add_val(_to_number(row[ja]))
+                    if jw is not None and jw < len(row):
+                        w_raw = row[jw].strip()
+                        if w_raw != "":
+                            weights.weights[resource] = _fast_number(w_raw)
+
+            for r in sorted(req):
+                intern(r)
+            world = ArrayWorldState(index, countries)
+            data, ncols = world.data, world.ncols
+            for ri, ci, v in zip(cells_row, cells_col, cells_val):
+                data[ri * ncols + ci] = v
+
+        else:
+            jc = next(
+                (j for j, h in enumerate(lower) if h in ("country", "countryname", "country_name", "name")),
+                0,
+            )
+            # Later duplicate headers win, as with csv.DictReader
+            res_pos = {h: j for j, h in enumerate(headers) if j != jc and h != headers[jc]}
+            res_cols = [(index.intern(h), j) for h, j in res_pos.items()]
+            for r in sorted(req):
+                index.intern(r)
+            ncols = len(index)
+            zero_row = array("d", bytes(8 * ncols))
+            rows: list[array] = []
+
+            for chunk in chunks:
+                for row in chunk:
+                    if jc >= len(row):
+                        continue
+                    country = row[jc].strip()
+                    if not country:
+                        continue
+                    n = len(row)
+
+                    if country in weights_rows:
+                        for h, j in res_pos.items():
+                            if j < n:
+                                cell = row[j].strip()
+                                if cell != "":
+                                    weights.weights[h] = _fast_number(cell)
+                        continue
+
+                    inv = array("d", zero_row)
+                    for ci, j in res_cols:
+                        if j < n:
+                            inv[ci] = _fast_number(row[j])
+                    ri = countries.get(country)
+                    if ri is None:
+                        countries[country] = len(rows)
+                        rows.append(inv)
+                    else:
+                        rows[ri] = inv
+
+            data = array("d")
+            for inv in rows:
+                data.extend(inv)
+            world = ArrayWorldState(index, countries, data)
+
+    for r in req:
+        weights.weights.setdefault(r, 0.0)
+
+    return world, weights
+
+
+def parse_weights_csv(
+    csv_path: str | Path,
+    *,
+    required_resources: Optional[Iterable[str]] = None,
+    cache: bool = False,
+) -> ResourceWeights:
+    """
+    Parse a standalone weights file (like resources.csv) into ResourceWeights:
+
+       Resource,Weight
+       Population,0
+       Timber,0.2
+
+    Last non-blank weight wins; required resources default to 0.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+
+    if cache:
+        from source.world_cache import load_weights_cached
+
+        return load_weights_cached(csv_path, required_resources=required_resources)
+
+    req = set(required_resources) if required_resources is not None else set(REQUIRED_RESOURCES)
+
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("CSV has no header row / fieldnames.")
+        lower = [_normalize_header(h).lower() for h in header]
+
+        jr = next((j for j, h in enumerate(lower) if h in ("resource", "resourcename", "resource_name")), None)
+        jw = next((j for j, h in enumerate(lower) if h in ("weight", "w")), None)
+        if jr is None or jw is None:
+            raise ValueError("Weights CSV needs Resource and Weight columns.")
+
+        weights = ResourceWeights()
+        for row in reader:
+            if max(jr, jw) >= len(row):
+                continue
+            resource = row[jr].strip()
+            cell = row[jw].strip()
+            if resource and cell != "":
+                weights.weights[resource] = _to_number(cell)
+
+    for r in req:
+        weights.weights.setdefault(r, 0.0)
+    return weights
@@ -0,0 +1,360 @@
+"""
+Batch JSONL pipeline: one evaluation or search request per input line, one
+result per output line, in input order.
+
+    python -m source.pipeline requests.jsonl -o results.jsonl
+    cat requests.jsonl | python -m source.pipeline --batch-size 512
+
+Request fields (paths are relative to --base-dir, default the current directory):
+
+    id            echoed back (default: 1-based line number)
+    op            "evaluate" (default), "quality" or "search"
+    world         world CSV (inventories, optionally a WEIGHTS row)
+    weights       optional standalone weights CSV (like resources.csv)
+    templates     transform templates (required for "search" and for "T" actions)
+    self          self country
+    participants  optional; default self plus every country the schedule touches
+    gamma, k, x0, C, N   scoring parameters (defaults from ScoreParams; N = len(schedule))
+    schedule      evaluate: encoded actions, ["T", transform, country, n] or
+                  ["X", src, dst, resource, amount]
+    deltas        evaluate: alternatively a list of {country: {resource: delta}} steps
+    countries     quality: countries to score (default all)
+    config        search: SearchConfig fields; "algorithm": "beam" (default) or "dfs"
+
+Results are {"id", "ok": true, ...} or {"id", "ok": false, "error"}. Parsed
+worlds, weights and compiled transforms are kept in a bounded WorldStore that
+re-reads a file when its size or mtime changes. Requests are read batch_size at
+a time, and evaluations that share world, weights, self, participants and
+parameters are scored together with expected_utility_batch.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from source.world_state import WorldState, ResourceWeights
+from source.parse import parse_world_and_weights_csv, parse_weights_csv
+from source.quality import state_qualities
+from source.score import ScoreParams
+from source.expected_utility import expected_utility_batch
+from source.transforms import CompiledTransform, compile_transforms, load_transform_templates
+from source.successors import decode_action, encode_action
+from source.search import BeamSearch, DepthFirstSearch, SearchConfig
+
+
+class WorldStore:
+    """
+    Bounded LRU cache of parsed inputs keyed by (kind, resolved path).
+    An entry is reused only while the file's size and mtime are unchanged.
+    """
+    __slots__ = ("capacity", "snapshots", "_entries", "hits", "misses")
+
+    def __init__(self, capacity: int = 32, *, snapshots: bool = False) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1.")
+        self.capacity = capacity
+        self.snapshots = snapshots  # also use source.world_cache binary snapshots on disk
+        self._entries: OrderedDict[Tuple[str, Path], Tuple[Tuple[int, int], Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, kind: str, path: str | Path, load: Callable[[Path], Any]) -> Any:
+        path = Path(path).resolve()
+        try:
+            st = path.stat()
+        except OSError:
+            raise FileNotFoundError(path) from None
+        stamp = (st.st_size, st.st_mtime_ns)
+        key = (kind, path)
+        e = self._entries.get(key)
+        if e is not None and e[0] == stamp:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return e[1]
+        self.misses += 1
+        value = load(path)
+        self._entries[key] = (stamp, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path: Optional[str | Path] = None) -> None:
+        """Drop every entry for 'path' (or everything)."""
+        if path is None:
+            self._entries.clear()
+            return
+        path = Path(path).resolve()
+        for key in [k for k in self._entries if k[1] == path]:
+            del self._entries[key]
+
+    def world(self, path: str | Path) -> Tuple[WorldState, ResourceWeights]:
+        """Parsed world CSV; callers must copy() before mutating."""
+        return self._get("world", path, lambda p: parse_world_and_weights_csv(p, cache=self.snapshots))
+
+    def weights(self, path: str | Path) -> ResourceWeights:
+        return self._get("weights", path, lambda p: parse_weights_csv(p, cache=self.snapshots))
+
+    def transforms(self, path: str | Path) -> Dict[str, CompiledTransform]:
+        return self._get("transforms", path, lambda p: compile_transforms(load_transform_templates(p)))
+
+
+def _params(req: dict) -> ScoreParams:
+    d = ScoreParams()
+    return ScoreParams(
+        gamma=float(req.get("gamma", d.gamma)),
+        x0=float(req.get("x0", d.x0)),
+        k=float(req.get("k", d.k)),
+        C=float(req.get("C", d.C)),
+    )
+
+
+def _require(req: dict, key: str) -> Any:
+    if key not in req:
+        raise ValueError(f"Missing field: {key}")
+    return req[key]
+
+
+class RequestContext:
+    """
+    Resolves a request's input files through the store. Lookups are memoized
+    per batch (files are checked for changes once per batch, not per request).
+    """
+    __slots__ = ("store", "base", "_memo")
+
+    def __init__(self, store: WorldStore, base: Path) -> None:
+        self.store = store
+        self.base = base
+        self._memo: Dict[tuple, Any] = {}
+
+    def new_batch(self) -> None:
+        self._memo.clear()
+
+    def inputs(self, req: dict) -> Tuple[WorldState, ResourceWeights]:
+        key = ("inputs", _require(req, "world"), req.get("weights"))
+        hit = self._memo.get(key)
+        if hit is None:
+            world, weights = self.store.world(self.base / key[1])
+            if key[2]:
+                weights = self.store.weights(self.base / key[2])
+            hit = self._memo[key] = (world, weights)
+        return hit
+
+    def transforms(self, req: dict) -> Dict[str, CompiledTransform]:
+        if not req.get("templates"):
+            return {}
+        key = ("transforms", req["templates"])
+        hit = self._memo.get(key)
+        if hit is None:
+            hit = self._memo[key] = self.store.transforms(self.base / key[1])
+        return hit
+
+
+def _deltas(raw: Any) -> List[Dict[str, Dict[str, float]]]:
+    """Validate a "deltas" field: a list of {country: {resource: delta}} steps."""
+    if not isinstance(raw, list):
+        raise ValueError("deltas must be a list of {country: {resource: delta}} objects.")
+    for n, step in enumerate(raw):
+        if not isinstance(step, dict) or not all(isinstance(d, dict) for d in step.values()):
+            raise ValueError(f"deltas[{n}] must be a {{country: {{resource: delta}}}} object.")
+    return raw
+
+
+def _failure(rid: Any, e: BaseException) -> dict:
+    return {"id": rid, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _prepare_evaluation(ctx: RequestContext, req: dict) -> Tuple[tuple, Tuple[WorldState, ResourceWeights], WorldState, dict]:
+    """(group key, start inputs, end world, result fields) for one evaluate request."""
+    world, weights = ctx.inputs(req)
+    self_country = str(_require(req, "self"))
+    if "schedule" in req:
+        transforms = ctx.transforms(req)
+        steps: List[Any] = [decode_action(tuple(e), transforms) for e in req["schedule"]]
+    else:
+        steps = _deltas(_require(req, "deltas"))
+    end = world.copy()
+    end.replay(steps)
+    end.release()
+
+    if req.get("participants") is not None:
+        participants = [str(c) for c in req["participants"]]
+    else:
+        touched = {self_country}
+        for s in steps:
+            touched.update(s.deltas() if hasattr(s, "deltas") else s)
+        participants = sorted(touched)
+    params = _params(req)
+    N = int(req.get("N", len(steps)))
+    key = (id(world), id(weights), self_country, tuple(participants), params, N)
+    return key, (world, weights), end, {"N": N, "participants": participants}
+
+
+def _search(ctx: RequestContext, req: dict) -> dict:
+    world, weights = ctx.inputs(req)
+    transforms = ctx.transforms(req)
+    cfg = dict(req.get("config") or {})
+    algorithm = cfg.pop("algorithm", "beam")
+    if "transfers" in cfg:
+        cfg["transfers"] = tuple((str(r), float(a)) for r, a in cfg["transfers"])
+    try:
+        config = SearchConfig(**cfg)
+    except TypeError as e:
+        raise ValueError(f"Invalid search config: {e}") from None
+    cls = {"beam": BeamSearch, "dfs": DepthFirstSearch}.get(algorithm)
+    if cls is None:
+        raise ValueError(f"Unknown search algorithm: {algorithm!r}")
+    participants = req.get("participants")
+    search = cls(
+        world, transforms.values(),
+        self_country=str(_require(req, "self")),
+        weights=weights,
+        participant_countries=[str(c) for c in participants] if participants is not None else None,
+        params=_params(req),
+        config=config,
+    )
+    return {
+        "results": [
+            {"eu": r.eu, "actions": r.describe(), "schedule": [list(encode_action(a)) for a in r.actions]}
+            for r in search.run()
+        ],
+        "nodes_generated": search.nodes_generated,
+    }
+
+
+def process_batch(requests: List[Tuple[Any, Any]], ctx: RequestContext) -> List[dict]:
+    """Results for (id, request-or-exception) pairs, in the same order."""
+    ctx.new_batch()
+    out: List[Optional[dict]] = [None] * len(requests)
+    groups: Dict[tuple, List[Tuple[int, WorldState]]] = {}
+    # Holding the start inputs also keeps the id()s in the group keys unique
+    group_inputs: Dict[tuple, Tuple[WorldState, ResourceWeights]] = {}
+
+    for i, (rid, req) in enumerate(requests):
+        try:
+            if isinstance(req, Exception):
+                raise req
+            if not isinstance(req, dict):
+                raise ValueError("Request must be a JSON object.")
+            op = req.get("op", "evaluate")
+            if op == "evaluate":
+                key, inputs, end, fields = _prepare_evaluation(ctx, req)
+                groups.setdefault(key, []).append((i, end))
+                group_inputs.setdefault(key, inputs)
+                out[i] = {"id": rid, "ok": True, **fields}
+            elif op == "quality":
+                world, weights = ctx.inputs(req)
+                countries = req.get("countries")
+                out[i] = {"id": rid, "ok": True, "qualities": state_qualities(
+                    world, weights, countries=[str(c) for c in countries] if countries is not None else None
+                )}
+            elif op == "search":
+                out[i] = {"id": rid, "ok": True, **_search(ctx, req)}
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except Exception as e:
+            # Any failure is confined to its own request; the rest of the batch still answers
+            out[i] = _failure(rid, e)
+
+    for key, members in groups.items():
+        world, weights = group_inputs[key]
+        _, _, self_country, participants, params, N = key
+        try:
+            eus = expected_utility_batch(
+                world, [end for _, end in members],
+                self_country=self_country,
+                participant_countries=list(participants),
+                weights=weights,
+                gamma=params.gamma, N=N, k=params.k, x0=params.x0, C=params.C,
+            )
+        except Exception as e:
+            for i, _ in members:
+                out[i] = _failure(out[i]["id"], e)
+            continue
+        for (i, _), eu in zip(members, eus):
+            out[i]["eu"] = eu
+    return out  # type: ignore[return-value]
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[Tuple[Any, Any]]:
+    for n, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            yield n, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield (req.get("id", n) if isinstance(req, dict) else n), req
+
+
+def iter_results(
+    lines: Iterable[str],
+    store: Optional[WorldStore] = None,
+    *,
+    batch_size: int = 256,
+    base_dir: str | Path = ".",
+) -> Iterator[dict]:
+    """Stream JSONL request lines to result dicts, holding at most one batch in memory."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1.")
+    ctx = RequestContext(store if store is not None else WorldStore(), Path(base_dir))
+    batch: List[Tuple[Any, Any]] = []
+    for item in _parse_lines(lines):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from process_batch(batch, ctx)
+            batch = []
+    if batch:
+        yield from process_batch(batch, ctx)
+
+
+def run_pipeline(
+    lines: Iterable[str],
+    out: TextIO,
+    store: Optional[WorldStore] = None,
+    *,
+    batch_size: int = 256,
+    base_dir: str | Path = ".",
+) -> int:
+    """Write one JSON result line per request; returns the number of failed requests."""
+    failed = 0
+    dumps = json.dumps
+    for result in iter_results(lines, store, batch_size=batch_size, base_dir=base_dir):
+        failed += not result["ok"]
+        out.write(dumps(result, separators=(",", ":")) + "\n")
+    return failed
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", nargs="?", default="-", help="JSONL requests (default: stdin)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL results (default: stdout)")
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--base-dir", type=Path, default=Path("."), help="directory request paths are relative to")
+    ap.add_argument("--cache-size", type=int, default=32, help="parsed files kept in memory")
+    ap.add_argument("--snapshots", action="store_true", help="also use binary .wcache snapshots next to CSVs")
+    args = ap.parse_args(argv)
+
+    store = WorldStore(args.cache_size, snapshots=args.snapshots)
+    fin = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        failed = run_pipeline(fin, fout, store, batch_size=args.batch_size, base_dir=args.base_dir)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+from typing import Iterable, Optional, Sequence, Tuple
 
 
 def acceptance_probability(dr: float, *, k: float = 1.0, x0: float = 0.0) -> float:
@@ -27,4 +28,101 @@ def schedule_success_probability(country_probs: list[float]) -> float:
         if x < 0.0 or x > 1.0:
             raise ValueError(f"Invalid probability: {x}")
         p *= x
-    return p
\ No newline at end of file
+    return p
+
+
+def log_acceptance_probability(dr: float, *, k: float = 1.0, x0: float = 0.0) -> float:
+    """
+    log P(c, s) = log sigmoid(z) = -softplus(-z),  z = k*(dr - x0)
+    Finite for any z (no underflow to log(0)).
+    """
+    z = k * (dr - x0)
+    if z >= 0:
+        return -math.log1p(math.exp(-z))
+    return z - math.log1p(math.exp(z))
+
+
+def log_acceptance_probabilities(drs: Iterable[float], *, k: float = 1.0, x0: float = 0.0) -> list[float]:
+    """log_acceptance_probability over a whole batch of DR values."""
+    exp, log1p = math.exp, math.log1p
+    out: list[float] = []
+    for dr in drs:
+        z = k * (dr - x0)
+        out.append(-log1p(exp(-z)) if z >= 0 else z - log1p(exp(z)))
+    return out
+
+
+def log_schedule_success_probability(
+    log_probs: Iterable[float],
+    *,
+    stop_below: Optional[float] = None,
+) -> float:
+    """
+    log P(s) = sum_i log P(c_i, s)
+
+    Each term is <= 0, so the running sum only decreases. If it drops below
+    'stop_below' the remaining terms are skipped and -inf is returned
+    (the schedule cannot reach the required probability).
+    """
+    total = 0.0
+    for lp in log_probs:
+        if lp > 0.0:
+            raise ValueError(f"Invalid log probability: {lp}")
+        total += lp
+        if stop_below is not None and total < stop_below:
+            return -math.inf
+    return total
+
+
+def schedule_success_probabilities(
+    dr_batches: Iterable[Sequence[float]],
+    *,
+    k: float = 1.0,
+    x0: float = 0.0,
+    log: bool = False,
+) -> list[float]:
+    """
+    P(s) (or log P(s) if log=True) for many schedules at once; each item is the
+    sequence of participant DR values for one schedule.
+    """
+    out: list[float] = []
+    for drs in dr_batches:
+        lp = sum(log_acceptance_probabilities(drs, k=k, x0=x0))
+        out.append(lp if log else math.exp(lp))
+    return out
+
+
+def expected_utility_from_log(log_p: float, dr_self: float, C: float) -> float:
+    """
+    EU = P(s) * DR_self + (1 - P(s)) * C = C + P(s) * (DR_self - C), from log P(s).
+
+    The term P(s) * (DR_self - C) is formed as exp(log P + log|DR_self - C|),
+    so a P(s) too small for a float (many participants) still contributes
+    whenever the product itself is representable.
+    """
+    gain = dr_self - C
+    if gain == 0.0 or log_p == -math.inf:
+        return C
+    term = math.exp(log_p + math.log(abs(gain)))
+    return C + term if gain > 0.0 else C - term
+
+
+def log_probability_interval_to_beat(best_eu: float, dr_self: float, C: float) -> Tuple[float, float]:
+    """
+    (lo, hi) such that EU = C + P(s) * (DR_self - C) > best_eu exactly when
+    lo < log P(s) < hi. With DR_self > C a larger P helps (hi = +inf), with
+    DR_self < C a smaller one does (lo = -inf); (+inf, +inf) if no P(s) can.
+    """
+    never = (math.inf, math.inf)
+    gain = dr_self - C
+    need = best_eu - C
+    if gain == 0.0:
+        return (-math.inf, math.inf) if need < 0.0 else never
+    if gain > 0.0:
+        if need <= 0.0:
+            return -math.inf, math.inf
+        return (math.log(need / gain), math.inf) if need < gain else never
+    # gain < 0: EU > best_eu  <=>  P(s) < need / gain
+    if need >= 0.0:
+        return never
+    return -math.inf, math.log(need / gain)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from operator import mul
+from typing import Dict, Iterable, List, Optional
 
-from source.world_state import WorldState, ResourceWeights
+from source.world_state import WorldState, ResourceWeights, FrozenWeights
+from source.array_world import ArrayWorldState
 
 
 def state_quality(
@@ -21,12 +23,25 @@ def state_quality(
     - Uses all resources present in the country's inventory.
     - Missing weights default to 0 via ResourceWeights.get().
     - 'exclude' omits resources from scoring.
+    - With FrozenWeights (ResourceWeights.freeze()) only the nonzero-weight
+      resources are visited.
+    - On an ArrayWorldState the sum is taken straight over the country's
+      matrix row (see _row_quality).
     """
+    if isinstance(world, ArrayWorldState):
+        return _row_quality(world, country_name, weights, exclude, pop_floor)
+
     c = world.get_country(country_name)
 
     population = c.get("Population")
     denom = max(population, pop_floor)  # avoid division by zero
 
+    if isinstance(weights, FrozenWeights):
+        total = 0.0
+        for r, _, w in weights.terms(exclude):
+            total += w * (c.get(r) / denom)
+        return float(total)
+
     exclude_set = set(exclude) if exclude is not None else set()
 
     total = 0.0
@@ -36,4 +51,128 @@ def state_quality(
         w = weights.get(r)
         total += w * (float(amt) / denom)
 
-    return float(total)
\ No newline at end of file
+    return float(total)
+
+
+def _row_quality(
+    world: ArrayWorldState,
+    country_name: str,
+    weights: ResourceWeights,
+    exclude: Optional[Iterable[str]],
+    pop_floor: float,
+) -> float:
+    """state_quality on one matrix row, without going through per-resource get() calls."""
+    c = world._views.get(country_name) or world.get_country(country_name)
+    data, start, ncols, cols = c._data, c.offset, c._ncols, c._cols
+    pop_col = cols.get("Population")
+    population = data[start + pop_col] if pop_col is not None and pop_col < ncols else 0.0
+    denom = max(population, pop_floor)
+
+    if isinstance(weights, FrozenWeights):
+        total = 0.0
+        if weights.index is world.index:
+            for _, col, w in weights.terms(exclude):
+                if col < ncols:
+                    total += w * (data[start + col] / denom)
+        else:
+            for r, _, w in weights.terms(exclude):
+                col = cols.get(r)
+                if col is not None and col < ncols:
+                    total += w * (data[start + col] / denom)
+        return float(total)
+
+    exclude_set = set(exclude) if exclude is not None else set()
+    wget = weights.weights.get
+    total = 0.0
+    for r, amt in zip(world.index.names[:ncols], data[start:start + ncols]):
+        if r in exclude_set:
+            continue
+        w = wget(r)
+        if w:
+            total += w * (amt / denom)
+    return float(total)
+
+
+def check_incremental_quality(
+    world: WorldState,
+    country_name: str,
+    weights: ResourceWeights,
+    *,
+    exclude: Optional[Iterable[str]] = None,
+    pop_floor: float = 1.0,
+    tol: float = 1e-9,
+) -> float:
+    """
+    Consistency check for CountryState.bind_weights(): compare the incrementally
+    maintained quality against a full state_quality recomputation.
+    Returns the recomputed Q; raises ValueError if they differ by more than tol
+    (relative to max(1, |Q|)).
+    """
+    c = world.get_country(country_name)
+    fast = c.quality()
+    full = state_quality(world, country_name, weights, exclude=exclude, pop_floor=pop_floor)
+    if abs(fast - full) > tol * max(1.0, abs(full)):
+        raise ValueError(
+            f"{country_name}: incremental quality {fast} drifted from recomputed {full}."
+        )
+    return full
+
+
+def _weight_vector(world: ArrayWorldState, weights: ResourceWeights, exclude_set: set) -> List[float]:
+    """Weights aligned to the world's columns, with excluded resources zeroed."""
+    return [
+        0.0 if r in exclude_set else weights.get(r)
+        for r in world.index.names[: world.ncols]
+    ]
+
+
+def state_qualities(
+    world: WorldState,
+    weights: ResourceWeights,
+    *,
+    countries: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    pop_floor: float = 1.0,
+) -> Dict[str, float]:
+    """
+    Per-capita State Quality for many countries in one call (all of them by default):
+
+        Q[c] = (X[c, :] . w) / max(Population[c], pop_floor)
+
+    On an ArrayWorldState this is a single pass of row-by-weight dot products
+    over the inventory matrix; dict-backed worlds fall back to state_quality.
+    Same 'exclude' / 'pop_floor' semantics as state_quality.
+    """
+    names = list(world.country_names()) if countries is None else list(countries)
+    exclude_set = set(exclude) if exclude is not None else set()
+
+    if not isinstance(world, ArrayWorldState):
+        return {
+            n: state_quality(world, n, weights, exclude=exclude_set, pop_floor=pop_floor)
+            for n in names
+        }
+
+    data = world.data
+    ncols = world.ncols
+    pop_col = world.index.get("Population")
+    if pop_col is not None and pop_col >= ncols:
+        pop_col = None
+
+    out: Dict[str, float] = {}
+    if isinstance(weights, FrozenWeights) and weights.index is world.index:
+        # Sparse: only nonzero-weight columns present in this matrix
+        terms = [(col, w) for _, col, w in weights.terms(exclude_set) if col < ncols]
+        for n in names:
+            start = world.get_country(n).offset
+            population = data[start + pop_col] if pop_col is not None else 0.0
+            denom = max(population, pop_floor)
+            out[n] = sum([w * data[start + col] for col, w in terms]) / denom
+        return out
+
+    wvec = _weight_vector(world, weights, exclude_set)
+    for n in names:
+        start = world.get_country(n).offset
+        population = data[start + pop_col] if pop_col is not None else 0.0
+        denom = max(population, pop_floor)
+        out[n] = sum(map(mul, wvec, data[start:start + ncols])) / denom
+    return out
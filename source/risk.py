@@ -0,0 +1,238 @@
+"""
+Monte Carlo risk profiles of a schedule's acceptance.
+
+expected_utility only gives the mean P(s)*DR_self + (1-P(s))*C. Here each
+participant accepts independently with acceptance_probability(DR_c), and
+many samples are drawn at once as bit-packed integers: bit i of a country's
+mask says whether it accepts in sample i. A mask with P(bit) = p is built from
+the binary expansion of p, one getrandbits(n) per bit:
+
+    x <- x | r   for a 1 bit,   x <- x & r   for a 0 bit   (LSB first)
+
+so all n samples cost O(bits) big-int operations per country. The number of
+rejecters per sample is kept in a bit-sliced counter (one mask per binary
+digit) so its histogram needs no per-sample loop either.
+"""
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from source.world_state import WorldState, ResourceWeights
+from source.score import ScoreParams, discounted_rewards
+from source.probability import acceptance_probability
+from source.search import ScheduleResult, schedule_participants
+
+
+def bernoulli_mask(rng: random.Random, p: float, n: int, *, bits: int = 32) -> int:
+    """n-bit integer whose bits are independently 1 with probability p (to 2^-bits)."""
+    if not (0.0 <= p <= 1.0):
+        raise ValueError(f"Invalid probability: {p}")
+    q = round(p * (1 << bits))
+    if q >= 1 << bits:
+        return (1 << n) - 1
+    if q == 0 or n == 0:
+        return 0
+    low = (q & -q).bit_length() - 1  # zero bits below the lowest 1 would only AND into 0
+    x = rng.getrandbits(n)
+    for j in range(low + 1, bits):
+        r = rng.getrandbits(n)
+        x = (x | r) if (q >> j) & 1 else (x & r)
+    return x
+
+
+def _count_planes(masks: Iterable[int]) -> List[int]:
+    """Bit-sliced per-sample counter: plane i holds bit i of how many masks had each bit set."""
+    planes: List[int] = []
+    for carry in masks:
+        for i, plane in enumerate(planes):
+            if not carry:
+                break
+            planes[i], carry = plane ^ carry, plane & carry
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def _histogram(planes: Sequence[int], n: int, max_count: int) -> Tuple[int, ...]:
+    full = (1 << n) - 1
+    out = []
+    for k in range(max_count + 1):
+        sel = full
+        for i, plane in enumerate(planes):
+            sel &= plane if (k >> i) & 1 else ~plane
+        if k >> len(planes):
+            sel = 0
+        out.append(sel.bit_count())
+    return tuple(out)
+
+
+@dataclass(frozen=True, slots=True)
+class RiskProfile:
+    """
+    Sampled outcome distribution of one schedule. Utility per sample is
+    DR_self if every participant accepts, else C.
+    """
+    samples: int
+    countries: Tuple[str, ...]
+    acceptance: Tuple[float, ...]          # model P(c, s) per participant
+    dr_self: float
+    C: float
+    successes: int                          # samples where all participants accept
+    rejection_rates: Dict[str, float]       # sampled fraction of samples c rejects
+    rejecter_histogram: Tuple[int, ...]     # [k] = samples with exactly k rejecters
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.samples
+
+    @property
+    def mean(self) -> float:
+        return self.success_rate * self.dr_self + (1.0 - self.success_rate) * self.C
+
+    @property
+    def variance(self) -> float:
+        p = self.success_rate
+        return p * (1.0 - p) * (self.dr_self - self.C) ** 2
+
+    def _sorted_outcomes(self) -> Tuple[float, int, float]:
+        """(low value, how many samples have it, high value)."""
+        if self.C <= self.dr_self:
+            return self.C, self.samples - self.successes, self.dr_self
+        return self.dr_self, self.successes, self.C
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank q-quantile of the sampled utility."""
+        if not (0.0 <= q <= 1.0):
+            raise ValueError("q must be in [0, 1].")
+        lo, n_lo, hi = self._sorted_outcomes()
+        rank = max(1, math.ceil(q * self.samples))
+        return lo if rank <= n_lo else hi
+
+    def cvar(self, alpha: float) -> float:
+        """Mean utility of the worst ceil(alpha * samples) samples (expected shortfall)."""
+        if not (0.0 < alpha <= 1.0):
+            raise ValueError("alpha must be in (0, 1].")
+        lo, n_lo, hi = self._sorted_outcomes()
+        m = max(1, math.ceil(alpha * self.samples))
+        k = min(m, n_lo)
+        return (k * lo + (m - k) * hi) / m
+
+    def quantiles(self, qs: Iterable[float] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> Dict[float, float]:
+        return {q: self.quantile(q) for q in qs}
+
+
+def simulate_acceptance(
+    participant_drs: Mapping[str, float],
+    dr_self: float,
+    *,
+    k: float = 1.0,
+    x0: float = 0.0,
+    C: float = -1.0,
+    samples: int = 1_000_000,
+    seed: Optional[int] = 0,
+    bits: int = 32,
+) -> RiskProfile:
+    """Draw 'samples' independent accept/reject outcomes for every participant."""
+    if samples < 1:
+        raise ValueError("samples must be >= 1.")
+    rng = random.Random(seed)
+    full = (1 << samples) - 1
+    countries = tuple(participant_drs)
+    probs = tuple(acceptance_probability(participant_drs[c], k=k, x0=x0) for c in countries)
+
+    all_accept = full
+    rejections: List[int] = []
+    for p in probs:
+        acc = bernoulli_mask(rng, p, samples, bits=bits)
+        all_accept &= acc
+        rejections.append(acc ^ full)
+
+    rates = {c: r.bit_count() / samples for c, r in zip(countries, rejections)}
+    hist = _histogram(_count_planes(rejections), samples, len(countries))
+    return RiskProfile(samples, countries, probs, dr_self, C, all_accept.bit_count(), rates, hist)
+
+
+def schedule_risk(
+    world_start: WorldState,
+    world_end: WorldState,
+    *,
+    self_country: str,
+    participant_countries: Sequence[str],
+    weights: ResourceWeights,
+    N: int,
+    params: ScoreParams = ScoreParams(),
+    samples: int = 1_000_000,
+    seed: Optional[int] = 0,
+) -> RiskProfile:
+    """simulate_acceptance for one schedule, scored like expected_utility."""
+    dr = discounted_rewards(
+        world_start, world_end, weights,
+        gamma=params.gamma, N=N, countries=[*participant_countries, self_country],
+    )
+    return simulate_acceptance(
+        {c: dr[c] for c in participant_countries}, dr[self_country],
+        k=params.k, x0=params.x0, C=params.C, samples=samples, seed=seed,
+    )
+
+
+def result_risks(
+    world_start: WorldState,
+    results: Iterable[ScheduleResult],
+    *,
+    self_country: str,
+    weights: ResourceWeights,
+    participant_countries: Optional[Sequence[str]] = None,
+    params: ScoreParams = ScoreParams(),
+    samples: int = 1_000_000,
+    seed: Optional[int] = 0,
+) -> List[RiskProfile]:
+    """schedule_risk for each search result (participants derived per schedule unless given)."""
+    out: List[RiskProfile] = []
+    for r in results:
+        participants = (
+            list(participant_countries) if participant_countries is not None
+            else schedule_participants(self_country, r.actions)
+        )
+        out.append(schedule_risk(
+            world_start, r.world,
+            self_country=self_country, participant_countries=participants,
+            weights=weights, N=len(r.actions), params=params, samples=samples, seed=seed,
+        ))
+    return out
+
+
+def rejecter_count_distribution(probs: Sequence[float]) -> List[float]:
+    """Exact P(exactly k participants reject) given acceptance probabilities (Poisson-binomial)."""
+    dist = [1.0]
+    for p in probs:
+        q = 1.0 - p
+        nxt = [0.0] * (len(dist) + 1)
+        for i, v in enumerate(dist):
+            nxt[i] += v * p
+            nxt[i + 1] += v * q
+        dist = nxt
+    return dist
+
+
+def rejection_subset_probabilities(
+    acceptance: Mapping[str, float],
+    *,
+    max_countries: int = 16,
+) -> Dict[FrozenSet[str], float]:
+    """Exact probability that precisely each subset of participants rejects (2^P entries)."""
+    names = list(acceptance)
+    if len(names) > max_countries:
+        raise ValueError(f"{len(names)} participants exceeds max_countries={max_countries}.")
+    out: Dict[FrozenSet[str], float] = {}
+    for size in range(len(names) + 1):
+        for subset in combinations(names, size):
+            rejected = frozenset(subset)
+            p = 1.0
+            for c in names:
+                p *= (1.0 - acceptance[c]) if c in rejected else acceptance[c]
+            out[rejected] = p
+    return out
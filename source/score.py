@@ -1,18 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from source.world_state import WorldState, ResourceWeights
-from source.quality import state_quality
+from source.quality import state_quality, state_qualities
 
 
 @dataclass(frozen=True, slots=True)
 class ScoreParams:
     gamma: float = 0.9  # discount factor in [0, 1)
-    x0: float = 0.0     # reserved for later (logistic), not used here
-    k: float = 1.0      # reserved for later (logistic), not used here
-    C: float = -1.0     # reserved for later (EU failure cost), not used here
+    x0: float = 0.0     # logistic midpoint (acceptance_probability)
+    k: float = 1.0      # logistic steepness (acceptance_probability)
+    C: float = -1.0     # EU failure cost (expected_utility)
 
 
 def undiscounted_reward(
@@ -41,10 +41,116 @@ def discounted_reward(
     """
     DR(c, s) = gamma^N * (Q_end - Q_start)
     """
+    check_discount(gamma, N)
+
+    r = undiscounted_reward(world_start, world_end, country_name, weights)
+    return (gamma ** N) * r
+
+
+def check_discount(gamma: float, N: int) -> None:
+    """Raise ValueError unless gamma is in [0, 1) and N >= 0."""
     if not (0.0 <= gamma < 1.0):
         raise ValueError("gamma must be in [0, 1).")
     if N < 0:
         raise ValueError("N must be >= 0.")
 
-    r = undiscounted_reward(world_start, world_end, country_name, weights)
-    return (gamma ** N) * r
\ No newline at end of file
+
+def undiscounted_rewards(
+    world_start: WorldState,
+    world_end: WorldState,
+    weights: ResourceWeights,
+    *,
+    countries: Optional[Iterable[str]] = None,
+) -> Dict[str, float]:
+    """
+    R(c, s) = Q_end(c) - Q_start(c) for many countries at once (all by default).
+    """
+    names = list(world_start.country_names()) if countries is None else list(dict.fromkeys(countries))
+    q_start = state_qualities(world_start, weights, countries=names)
+    q_end = state_qualities(world_end, weights, countries=names)
+    return {c: q_end[c] - q_start[c] for c in names}
+
+
+def discounted_rewards(
+    world_start: WorldState,
+    world_end: WorldState,
+    weights: ResourceWeights,
+    *,
+    gamma: float,
+    N: int,
+    countries: Optional[Iterable[str]] = None,
+) -> Dict[str, float]:
+    """
+    DR(c, s) = gamma^N * (Q_end(c) - Q_start(c)) for many countries at once.
+    """
+    check_discount(gamma, N)
+    g = gamma ** N
+    r = undiscounted_rewards(world_start, world_end, weights, countries=countries)
+    return {c: g * v for c, v in r.items()}
+
+
+@dataclass(frozen=True, slots=True)
+class TrajectoryRewards:
+    """
+    Per-prefix scores of one schedule; index n is the prefix of length n
+    (n = 0 is the start state, where every DR is 0).
+    """
+    countries: Tuple[str, ...]
+    qualities: List[Dict[str, float]]   # Q_n(c): quality after n steps
+    discounts: List[float]              # gamma^n, as running products
+    rewards: List[Dict[str, float]]     # DR_n(c) = gamma^n * (Q_n(c) - Q_0(c))
+
+    def __len__(self) -> int:
+        return len(self.rewards)
+
+
+def trajectory_rewards(
+    world_start: WorldState,
+    steps: Iterable[Any],
+    weights: ResourceWeights,
+    *,
+    gamma: float,
+    countries: Optional[Iterable[str]] = None,
+) -> TrajectoryRewards:
+    """
+    DR(c, s[:n]) for every prefix n of a schedule and every country, in one pass.
+
+    Each step is either the WorldState reached after it, or something
+    WorldState.replay accepts (an action with deltas(), or a
+    {country: {resource: delta}} mapping) applied to a working copy of
+    the world reached so far (world_start or the latest WorldState
+    step). For delta steps only the countries the step touches are re-scored;
+    the others reuse the previous step's quality.
+    """
+    check_discount(gamma, 0)
+    names = list(world_start.country_names()) if countries is None else list(dict.fromkeys(countries))
+    q = state_qualities(world_start, weights, countries=names)
+    q0 = q
+    g = 1.0
+
+    qualities = [q]
+    discounts = [g]
+    rewards = [{c: 0.0 for c in names}]
+    current = world_start
+    work: Optional[WorldState] = None
+    for step in steps:
+        if hasattr(step, "countries"):
+            q = state_qualities(step, weights, countries=names)
+            work = None  # later delta steps continue from this world (copied on demand)
+            current = step
+        else:
+            if work is None:
+                work = current.copy()
+            if hasattr(step, "deltas"):
+                if hasattr(step, "feasible") and not step.feasible(work):
+                    raise ValueError(f"Infeasible step: {step}")
+                step = step.deltas()
+            for name, deltas in step.items():
+                work.get_country(name).apply_delta_map(deltas)
+            touched = [c for c in names if c in step]
+            q = {**q, **state_qualities(work, weights, countries=touched)} if touched else q
+        g *= gamma
+        qualities.append(q)
+        discounts.append(g)
+        rewards.append({c: g * (q[c] - q0[c]) for c in names})
+    return TrajectoryRewards(tuple(names), qualities, discounts, rewards)
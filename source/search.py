@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from source import instrument
+from source.world_state import WorldState, ResourceWeights, Number
+from source.array_world import ArrayWorldState
+from source.score import ScoreParams
+from source.expected_utility import expected_utility
+from source.transforms import CompiledTransform
+from source.successors import Action, apply_action, expanded, iter_actions
+from source.state_hash import TranspositionTable, ZobristKeys
+from source.bounds import EUBound
+
+
+@dataclass(frozen=True, slots=True)
+class SearchConfig:
+    beam_width: int = 8             # nodes kept per depth level
+    max_depth: int = 5              # longest schedule (N)
+    frontier_cap: int = 10_000      # hard bound on candidate nodes held at once
+    top_k: int = 5                  # schedules returned
+    time_budget: Optional[float] = None  # wall-clock seconds, None = unlimited
+    transfers: Tuple[Tuple[str, Number], ...] = ()  # (resource, amount) moves allowed between countries
+    transposition_capacity: int = 0  # LRU transposition table size, 0 = no duplicate detection
+    hash_quantum: float = 1e-6      # amounts closer than this hash equal
+    bound_pruning: bool = False     # branch-and-bound via source.bounds (ignored with transfers)
+
+    def __post_init__(self) -> None:
+        if self.beam_width < 1 or self.top_k < 1 or self.frontier_cap < 1:
+            raise ValueError("beam_width, top_k and frontier_cap must be >= 1.")
+        if self.max_depth < 0:
+            raise ValueError("max_depth must be >= 0.")
+        if self.transposition_capacity < 0:
+            raise ValueError("transposition_capacity must be >= 0.")
+
+
+@dataclass(slots=True)
+class SearchNode:
+    actions: Tuple[Action, ...]
+    world: WorldState
+    eu: float
+    seq: int = -1  # creation order; -1 for the root
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleResult:
+    actions: Tuple[Action, ...]
+    eu: float
+    world: WorldState = field(repr=False, compare=False)
+
+    def describe(self) -> List[str]:
+        return [str(a) for a in self.actions]
+
+
+def schedule_participants(self_country: str, actions: Iterable[Action]) -> List[str]:
+    """self_country plus every country an action in the schedule touches (sorted)."""
+    touched = {self_country}
+    for a in actions:
+        touched.update(a.deltas())
+    return sorted(touched)
+
+
+class _BoundedHeap:
+    """Min-heap of (eu, -seq, node) that evicts its worst entry beyond 'cap'."""
+    __slots__ = ("cap", "items", "evicted")
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self.items: List[Tuple[float, int, SearchNode]] = []
+        self.evicted = 0
+
+    def admits(self, eu: float) -> bool:
+        return len(self.items) < self.cap or eu > self.items[0][0]
+
+    def push(self, eu: float, seq: int, node: SearchNode) -> None:
+        if len(self.items) < self.cap:
+            heapq.heappush(self.items, (eu, -seq, node))
+        else:
+            heapq.heapreplace(self.items, (eu, -seq, node))
+            self.evicted += 1
+
+    def best(self, n: int) -> List[SearchNode]:
+        return [node for _, _, node in heapq.nlargest(n, self.items)]
+
+
+class BeamSearch:
+    """
+    Depth-limited beam search for the schedule with the highest expected_utility.
+
+    Each level expands every node in the beam with iter_actions, scores the
+    successor in place (expanded) and only copies the world when the successor
+    makes it into the bounded candidate heap. The best beam_width candidates
+    become the next level; the best top_k schedules seen at any depth are kept.
+
+    With transposition_capacity > 0, successors whose state (and participant
+    set) was already reached at the same depth are dropped before scoring,
+    using incrementally maintained Zobrist hashes (see node_hash).
+    """
+
+    def __init__(
+        self,
+        world_start: WorldState,
+        transforms: Iterable[CompiledTransform],
+        *,
+        self_country: str,
+        weights: ResourceWeights,
+        participant_countries: Optional[Sequence[str]] = None,
+        params: ScoreParams = ScoreParams(),
+        config: SearchConfig = SearchConfig(),
+    ) -> None:
+        self.world_start = world_start
+        self.transforms = list(transforms)
+        self.self_country = self_country
+        # Sparse scoring: only nonzero-weight resources are visited per node
+        # (on an array world, by column of its shared ResourceIndex)
+        if isinstance(weights, ResourceWeights):
+            weights = weights.freeze(world_start.index if isinstance(world_start, ArrayWorldState) else None)
+        self.weights = weights
+        self.participant_countries = list(participant_countries) if participant_countries is not None else None
+        self.params = params
+        self.config = config
+
+        self.keys: Optional[ZobristKeys] = None
+        self.table: Optional[TranspositionTable] = None
+        root = world_start.copy()
+        if config.transposition_capacity:
+            self.keys = ZobristKeys(quantum=config.hash_quantum)
+            self.table = TranspositionTable(config.transposition_capacity)
+            root.enable_hashing(self.keys)
+        self._root = root
+        self.bound: Optional[EUBound] = None
+        if config.bound_pruning and not config.transfers:
+            self.bound = EUBound(
+                world_start, self.transforms, self.weights, params=params, max_depth=config.max_depth
+            )
+
+        self.beam: List[SearchNode] = [SearchNode((), root, float("-inf"))]
+        self.best = _BoundedHeap(config.top_k)
+        self.depth = 0
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.duplicates_pruned = 0
+        self.bounds_pruned = 0
+        self._next_seq = 0
+        self._deadline: Optional[float] = None
+
+    @property
+    def root(self) -> WorldState:
+        """The search's copy of world_start; node worlds are copy-on-write copies of it."""
+        return self._root
+
+    def _take_seq(self) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def peek_seq(self) -> int:
+        """The seq the next new node will get (does not consume it)."""
+        return self._next_seq
+
+    def heap_nodes(self) -> List[SearchNode]:
+        """Nodes in the best-so-far (top_k) heap, in heap layout order."""
+        return [node for _, _, node in self.best.items]
+
+    def restore_state(
+        self,
+        *,
+        beam: Sequence[SearchNode],
+        heap: Sequence[SearchNode],
+        heap_evicted: int,
+        depth: int,
+        next_seq: int,
+        nodes_expanded: int,
+        nodes_generated: int,
+        duplicates_pruned: int,
+        bounds_pruned: int,
+    ) -> None:
+        """
+        Resume from a saved level: beam, top_k heap (in the heap_nodes() order it
+        was saved in), seq counter and statistics. The transposition table is
+        restored separately (TranspositionTable.apply_changes).
+        """
+        self.beam = list(beam)
+        self.best.items = [(n.eu, -n.seq, n) for n in heap]
+        self.best.evicted = heap_evicted
+        self.depth = depth
+        self._next_seq = next_seq
+        self.nodes_expanded = nodes_expanded
+        self.nodes_generated = nodes_generated
+        self.duplicates_pruned = duplicates_pruned
+        self.bounds_pruned = bounds_pruned
+
+    def score(self, world: WorldState, actions: Tuple[Action, ...]) -> float:
+        p = self.params
+        participants = (
+            self.participant_countries
+            if self.participant_countries is not None
+            else schedule_participants(self.self_country, actions)
+        )
+        return expected_utility(
+            self.world_start, world,
+            self_country=self.self_country,
+            participant_countries=participants,
+            weights=self.weights,
+            gamma=p.gamma, N=len(actions), k=p.k, x0=p.x0, C=p.C,
+        )
+
+    def node_hash(self, world: WorldState, actions: Tuple[Action, ...]) -> int:
+        """
+        Transposition key: world state, schedule length and (if derived per
+        schedule) the participant set. The length is part of the key because
+        EU depends on N through gamma^N: the same state reached deeper can
+        score higher (when its DR is negative), so it is not a duplicate.
+        """
+        h = world.state_hash() ^ self.keys.tag_hash("depth", (str(len(actions)),))
+        if self.participant_countries is None:
+            h ^= self.keys.tag_hash("participants", schedule_participants(self.self_country, actions))
+        return h
+
+    def hopeless(self, world: WorldState, actions: Tuple[Action, ...]) -> bool:
+        """Branch-and-bound: True if no extension of this node can enter the top_k."""
+        if self.bound is None or len(self.best.items) < self.best.cap:
+            return False
+        participants = (
+            self.participant_countries
+            if self.participant_countries is not None
+            else schedule_participants(self.self_country, actions)
+        )
+        if self.bound.node(world, participants, self.self_country, len(actions)) > self.best.items[0][0]:
+            return False
+        self.bounds_pruned += 1
+        if instrument.ENABLED:
+            instrument.count("search.bounds_pruned")
+        return True
+
+    def seed(self, schedules: Iterable[Sequence[Action]]) -> None:
+        """
+        Restart the beam from the given (equal-length) schedule prefixes instead of
+        the empty schedule. Prefixes are scored like any other candidates: they
+        count towards the top_k results and the best beam_width form the beam.
+        """
+        frontier = _BoundedHeap(self.config.frontier_cap)
+        depth = None
+        for actions in schedules:
+            actions = tuple(actions)
+            if depth is not None and len(actions) != depth:
+                raise ValueError("Seed schedules must all have the same length.")
+            depth = len(actions)
+            world = self._root.copy()
+            for a in actions:
+                apply_action(world, a)
+            eu = self.score(world, actions) if actions else float("-inf")
+            if self.table is not None:
+                self.table.store(self.node_hash(world, actions), eu, depth)
+            seq = self._take_seq()
+            node = SearchNode(actions, world, eu, seq)
+            if frontier.admits(eu):
+                frontier.push(eu, seq, node)
+            if actions and self.best.admits(eu):
+                self.best.push(eu, seq, node)
+        self.beam = frontier.best(self.config.beam_width)
+        self.depth = depth or 0
+
+    def _out_of_time(self) -> bool:
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def step(self) -> bool:
+        """Expand one depth level. Returns False when the search is finished."""
+        cfg = self.config
+        if self.depth >= cfg.max_depth or not self.beam or self._out_of_time():
+            return False
+
+        frontier = _BoundedHeap(cfg.frontier_cap)
+        for node in self.beam:
+            if node.actions and self.hopeless(node.world, node.actions):
+                continue
+            self.nodes_expanded += 1
+            for action in iter_actions(node.world, self.transforms, transfers=cfg.transfers):
+                if self._out_of_time():
+                    break
+                actions = node.actions + (action,)
+                with expanded(node.world, action) as w:
+                    if self.table is not None:
+                        h = self.node_hash(w, actions)
+                        if self.table.is_duplicate(h, len(actions)):
+                            self.duplicates_pruned += 1
+                            if instrument.ENABLED:
+                                instrument.count("search.duplicates_pruned")
+                            continue
+                    eu = self.score(w, actions)
+                    self.nodes_generated += 1
+                    if instrument.ENABLED:
+                        instrument.count("search.nodes_generated")
+                    if self.table is not None:
+                        self.table.store(h, eu, len(actions))
+                    keep_best = self.best.admits(eu)
+                    keep_frontier = frontier.admits(eu) and not self.hopeless(w, actions)
+                    child = w.copy() if (keep_frontier or keep_best) else None
+                if child is None:
+                    continue
+                seq = self._take_seq()
+                child_node = SearchNode(actions, child, eu, seq)
+                if keep_frontier:
+                    frontier.push(eu, seq, child_node)
+                if keep_best:
+                    self.best.push(eu, seq, child_node)
+
+        if instrument.ENABLED:
+            instrument.count("search.nodes_expanded", len(self.beam))
+            instrument.count("search.frontier_evictions", frontier.evicted)
+            instrument.observe_max("search.frontier_size", len(frontier.items))
+        self.beam = frontier.best(cfg.beam_width)
+        self.depth += 1
+        return bool(self.beam)
+
+    def start(self) -> None:
+        """Start the time_budget clock; run() calls this before its first step()."""
+        if self.config.time_budget is not None:
+            self._deadline = time.perf_counter() + self.config.time_budget
+
+    def run(self) -> List[ScheduleResult]:
+        self.start()
+        while self.step():
+            pass
+        return self.results()
+
+    def results(self) -> List[ScheduleResult]:
+        """Best schedules found so far, highest EU first."""
+        return [
+            ScheduleResult(n.actions, n.eu, n.world)
+            for n in self.best.best(self.config.top_k)
+        ]
+
+
+class DepthFirstSearch(BeamSearch):
+    """
+    Exhaustive depth-limited search on a single mutable world.
+
+    Each action is applied in place through WorldState.replay (undo log) and
+    rolled back after its subtree is explored, so the only copies made are
+    snapshots of schedules entering the top_k. beam_width and frontier_cap do
+    not apply; time_budget, transfers, the transposition table and bound_pruning do.
+
+    The recursion is kept on an explicit stack of open nodes, so step() scores
+    one successor (or closes one exhausted node) per call.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._path: List[Action] = []
+        # Open nodes, root first: (their successor iterator, undo mark of the action that reached them)
+        self._stack: Optional[List[Tuple[Iterator[Action], int]]] = None
+
+    def run(self) -> List[ScheduleResult]:
+        self.start()
+        try:
+            while self.step():
+                pass
+        finally:
+            self._finish()
+        return self.results()
+
+    def step(self) -> bool:
+        """Score one successor of the deepest open node. Returns False when the search is finished."""
+        world = self._root
+        if self._stack is None:
+            self._stack = []
+            self._open(world, world.checkpoint())
+        if not self._stack or self._out_of_time():
+            self._finish()
+            return False
+
+        successors, mark = self._stack[-1]
+        action = next(successors, None)
+        if action is None:
+            self._stack.pop()
+            world.rollback(mark)
+            if not self._stack:
+                self._finish()
+                return False
+            self._path.pop()
+            return True
+
+        mark = world.replay((action,))
+        self._path.append(action)
+        actions = tuple(self._path)
+        if self.table is not None:
+            h = self.node_hash(world, actions)
+            if self.table.is_duplicate(h, len(actions)):
+                self.duplicates_pruned += 1
+                if instrument.ENABLED:
+                    instrument.count("search.duplicates_pruned")
+                self._path.pop()
+                world.rollback(mark)
+                return True
+        eu = self.score(world, actions)
+        self.nodes_generated += 1
+        if instrument.ENABLED:
+            instrument.count("search.nodes_generated")
+        if self.table is not None:
+            self.table.store(h, eu, len(actions))
+        if self.best.admits(eu):
+            seq = self._take_seq()
+            self.best.push(eu, seq, SearchNode(actions, world.copy(), eu, seq))
+        if self.hopeless(world, actions) or not self._open(world, mark):
+            self._path.pop()
+            world.rollback(mark)
+        return True
+
+    def _open(self, world: WorldState, mark: int) -> bool:
+        """Push the node just reached unless it is at max_depth."""
+        if len(self._path) >= self.config.max_depth:
+            return False
+        self.nodes_expanded += 1
+        if instrument.ENABLED:
+            instrument.count("search.nodes_expanded")
+        self._stack.append((iter_actions(world, self.transforms, transfers=self.config.transfers), mark))
+        return True
+
+    def _finish(self) -> None:
+        """Roll the world back to the root and stop its undo log (also after a timeout or error)."""
+        if self._stack:
+            self._root.rollback(self._stack[0][1])
+        self._stack = []
+        self._path.clear()
+        self._root.release()
+
+
+def beam_search(
+    world_start: WorldState,
+    transforms: Iterable[CompiledTransform],
+    *,
+    self_country: str,
+    weights: ResourceWeights,
+    participant_countries: Optional[Sequence[str]] = None,
+    params: ScoreParams = ScoreParams(),
+    config: SearchConfig = SearchConfig(),
+) -> List[ScheduleResult]:
+    """
+    Return the top_k schedules (highest expected_utility first) found by BeamSearch.
+
+    If participant_countries is None, each schedule's participants are self
+    plus every country its actions touch.
+    """
+    return BeamSearch(
+        world_start, transforms,
+        self_country=self_country,
+        weights=weights,
+        participant_countries=participant_countries,
+        params=params,
+        config=config,
+    ).run()
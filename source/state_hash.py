@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from source.world_state import CountryState, WorldState, Number
+
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK
+    return x ^ (x >> 31)
+
+
+class ZobristKeys:
+    """
+    Zobrist keys over (country, resource, quantized amount).
+
+    Amounts are quantized to multiples of 'quantum' so float noise below it
+    does not change the hash. A zero amount contributes no key, so a missing
+    resource and an explicit 0 hash the same (matching CountryState.get).
+    Keys are derived deterministically from the names and seed, so hashes are
+    stable across processes.
+    """
+    __slots__ = ("quantum", "seed", "_base")
+
+    def __init__(self, *, quantum: float = 1e-6, seed: int = 0) -> None:
+        if quantum <= 0:
+            raise ValueError("quantum must be > 0.")
+        self.quantum = quantum
+        self.seed = seed
+        self._base: Dict[Tuple[str, str], int] = {}
+
+    def base(self, country: str, resource: str) -> int:
+        b = self._base.get((country, resource))
+        if b is None:
+            digest = hashlib.blake2b(
+                f"{country}\0{resource}".encode("utf-8"),
+                digest_size=8,
+                key=self.seed.to_bytes(8, "little"),
+            ).digest()
+            b = self._base[(country, resource)] = int.from_bytes(digest, "little")
+        return b
+
+    def key(self, country: str, resource: str, amount: Number) -> int:
+        q = round(amount / self.quantum)
+        if q == 0:
+            return 0
+        return _mix64(self.base(country, resource) ^ (q * _GOLDEN & _MASK))
+
+    def country_hash(self, country: CountryState) -> int:
+        """Full (non-incremental) hash of one country's inventory."""
+        h = 0
+        for r, amt in country.resources.items():
+            h ^= self.key(country.name, r, float(amt))
+        return h
+
+    def world_hash(self, world: WorldState) -> int:
+        """Full (non-incremental) hash of a world; equals WorldState.state_hash()."""
+        h = 0
+        for c in world.countries.values():
+            h ^= self.country_hash(c)
+        return h
+
+    def tag_hash(self, tag: str, items: Iterable[str]) -> int:
+        """Hash of an unordered set of names (e.g. a schedule's participants) to XOR into a state hash."""
+        h = 0
+        for item in set(items):
+            h ^= _mix64(self.base(f"\0{tag}", item))
+        return h
+
+
+@dataclass(slots=True)
+class TTEntry:
+    eu: float
+    depth: int
+
+
+class TranspositionTable:
+    """
+    Bounded LRU map from state hash to the best-known (EU, depth).
+
+    A state is a duplicate if it was already reached at the same or a smaller
+    depth; is_duplicate() reports that in O(1), and store() records a newly
+    scored state. That rule assumes a deeper visit is never worth more. EU is
+    not like that (gamma^N shrinks a negative DR too), so BeamSearch folds the
+    depth into the key and only same-depth repeats are pruned.
+
+    track_changes() starts recording which entries were touched (in last-touch
+    order) or evicted, so a checkpoint can persist just the difference
+    (drain_changes) and a reload can reproduce the exact LRU order
+    (apply_changes).
+    """
+    __slots__ = ("capacity", "_entries", "hits", "evictions", "_touched", "_evicted")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1.")
+        self.capacity = capacity
+        self._entries: OrderedDict[int, TTEntry] = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+        self._touched: Optional[OrderedDict[int, None]] = None
+        self._evicted: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, h: object) -> bool:
+        return h in self._entries
+
+    def get(self, h: int) -> Optional[TTEntry]:
+        e = self._entries.get(h)
+        if e is not None:
+            self._entries.move_to_end(h)
+            self._touch(h)
+        return e
+
+    def _touch(self, h: int) -> None:
+        touched = self._touched
+        if touched is not None:
+            touched[h] = None
+            touched.move_to_end(h)
+
+    def store(self, h: int, eu: float, depth: int) -> None:
+        """Record (eu, depth) for h, keeping the shallowest depth and the best EU seen."""
+        e = self._entries.get(h)
+        self._touch(h)
+        if e is None:
+            self._entries[h] = TTEntry(eu, depth)
+            if len(self._entries) > self.capacity:
+                old, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                if self._evicted is not None:
+                    self._evicted.add(old)
+                    self._touched.pop(old, None)
+            return
+        self._entries.move_to_end(h)
+        e.eu = max(e.eu, eu)
+        e.depth = min(e.depth, depth)
+
+    def is_duplicate(self, h: int, depth: int) -> bool:
+        e = self.get(h)
+        if e is not None and e.depth <= depth:
+            self.hits += 1
+            return True
+        return False
+
+    def items(self) -> Iterable[Tuple[int, TTEntry]]:
+        return self._entries.items()
+
+    def track_changes(self) -> None:
+        """
+        Start recording touched/evicted entries for drain_changes(). Entries
+        already present count as touched, so the first drain is a full snapshot.
+        """
+        if self._touched is None:
+            self._touched = OrderedDict.fromkeys(self._entries)
+            self._evicted = set()
+
+    def drain_changes(self) -> Tuple[List[Tuple[int, TTEntry]], List[int]]:
+        """
+        (touched entries in last-touch order, evicted hashes) since the last
+        drain, then start over. Requires track_changes().
+        """
+        if self._touched is None:
+            raise ValueError("drain_changes() requires track_changes() first.")
+        entries = self._entries
+        touched = [(h, entries[h]) for h in self._touched]
+        evicted = list(self._evicted)
+        self._touched.clear()
+        self._evicted.clear()
+        return touched, evicted
+
+    def apply_changes(self, touched: Iterable[Tuple[int, TTEntry]], evicted: Iterable[int]) -> None:
+        """Replay a drain_changes() result: drop 'evicted', then (re)insert 'touched' at the MRU end."""
+        entries = self._entries
+        for h in evicted:
+            entries.pop(h, None)
+        for h, e in touched:
+            entries[h] = TTEntry(e.eu, e.depth)
+            entries.move_to_end(h)
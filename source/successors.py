@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from source.world_state import WorldState, CountryState, ResourceWeights, Number
+from source.transforms import CompiledTransform
+
+
+@dataclass(frozen=True, slots=True)
+class TransformAction:
+    """Apply a compiled transform n times in one country."""
+    transform: CompiledTransform
+    country: str
+    n: int = 1
+
+    def feasible(self, world: WorldState) -> bool:
+        return self.transform.max_multiplier(world.get_country(self.country), limit=self.n) >= self.n
+
+    def deltas(self) -> Dict[str, Dict[str, Number]]:
+        return {self.country: self.transform.delta_map(self.n)}
+
+    def __str__(self) -> str:
+        return f"{self.transform.name}({self.country}" + (f", x{self.n})" if self.n != 1 else ")")
+
+
+@dataclass(frozen=True, slots=True)
+class TransferAction:
+    """Move 'amount' of a resource from one country to another."""
+    src: str
+    dst: str
+    resource: str
+    amount: Number
+
+    def feasible(self, world: WorldState) -> bool:
+        return world.get_country(self.src).get(self.resource) >= self.amount
+
+    def deltas(self) -> Dict[str, Dict[str, Number]]:
+        return {self.src: {self.resource: -self.amount}, self.dst: {self.resource: self.amount}}
+
+    def __str__(self) -> str:
+        return f"TRANSFER({self.src} -> {self.dst}, {self.resource} {self.amount})"
+
+
+Action = Union[TransformAction, TransferAction]
+
+# (country, {resource: previous amount or None if absent}) pairs, restored in reverse order by undo_action
+UndoToken = List[Tuple[CountryState, Dict[str, Optional[Number]]]]
+
+
+def apply_action(world: WorldState, action: Action) -> UndoToken:
+    """
+    Apply an action in place and return what undo_action needs to restore the
+    exact previous amounts. Raises ValueError (leaving the world unchanged) if
+    the action is not feasible.
+    """
+    if not action.feasible(world):
+        raise ValueError(f"Infeasible action: {action}")
+    undo: UndoToken = []
+    try:
+        for name, deltas in action.deltas().items():
+            c = world.get_country(name)
+            saved = {r: c.resources.get(r) for r in deltas}
+            c.apply_delta_map(deltas)
+            undo.append((c, saved))
+    except ValueError:
+        undo_action(undo)
+        raise
+    return undo
+
+
+def undo_action(undo: UndoToken) -> None:
+    """Restore the amounts recorded by apply_action."""
+    for c, saved in reversed(undo):
+        for r, amt in saved.items():
+            c.restore(r, amt)
+
+
+@contextmanager
+def expanded(world: WorldState, action: Action) -> Iterator[WorldState]:
+    """
+    Temporarily apply an action in place:
+
+        with expanded(world, action) as w:
+            score(w)
+
+    The world is restored exactly when the block exits.
+    """
+    undo = apply_action(world, action)
+    try:
+        yield world
+    finally:
+        undo_action(undo)
+
+
+def delta_quality(
+    world: WorldState,
+    action: Action,
+    weights: ResourceWeights,
+    *,
+    pop_floor: float = 1.0,
+) -> Dict[str, float]:
+    """
+    Exact per-country change in state_quality the action would cause,
+    computed from its deltas without applying it.
+    """
+    out: Dict[str, float] = {}
+    for name, deltas in action.deltas().items():
+        c = world.get_country(name)
+        pop0 = max(c.get("Population"), pop_floor)
+        pop1 = max(c.get("Population") + deltas.get("Population", 0.0), pop_floor)
+        if pop0 == pop1:
+            out[name] = sum(weights.get(r) * d for r, d in deltas.items()) / pop0
+        else:
+            wsum = sum(weights.get(r) * amt for r, amt in c.resources.items())
+            dsum = sum(weights.get(r) * d for r, d in deltas.items())
+            out[name] = (wsum + dsum) / pop1 - wsum / pop0
+    return out
+
+
+Estimator = Callable[[WorldState, Action], float]
+
+
+def iter_actions(
+    world: WorldState,
+    transforms: Iterable[CompiledTransform],
+    *,
+    countries: Optional[Sequence[str]] = None,
+    transfers: Iterable[Tuple[str, Number]] = (),
+) -> Iterator[Action]:
+    """
+    Lazily enumerate every legal next action from 'world'.
+
+    - One TransformAction per (country, transform) whose inputs the country has.
+    - One TransferAction per ordered (src, dst) pair and (resource, amount) in
+      'transfers' where src holds at least that amount.
+
+    Infeasible actions are rejected before any action object is created.
+    """
+    names = list(world.country_names()) if countries is None else list(countries)
+    transforms = list(transforms)
+    transfers = list(transfers)
+
+    for name in names:
+        c = world.get_country(name)
+        for t in transforms:
+            if t.max_multiplier(c, limit=1) >= 1:
+                yield TransformAction(t, name)
+
+    for src in names:
+        c = world.get_country(src)
+        for resource, amount in transfers:
+            if c.get(resource) < amount:
+                continue
+            for dst in names:
+                if dst != src:
+                    yield TransferAction(src, dst, resource, amount)
+
+
+def iter_successors(
+    world: WorldState,
+    transforms: Iterable[CompiledTransform],
+    *,
+    countries: Optional[Sequence[str]] = None,
+    transfers: Iterable[Tuple[str, Number]] = (),
+    weights: Optional[ResourceWeights] = None,
+    self_country: Optional[str] = None,
+    estimate: Optional[Estimator] = None,
+) -> Iterator[Tuple[Action, float]]:
+    """
+    Stream (action, ΔEU estimate) pairs without materializing successor worlds.
+
+    The default estimate is the first-order change in self_country's quality
+    (EU rises with DR(self), which is proportional to ΔQ(self)); with no
+    self_country it is the summed ΔQ of the countries the action touches.
+    Pass 'estimate' to plug in anything else. Use expanded() to actually
+    visit a successor.
+    """
+    for action in iter_actions(world, transforms, countries=countries, transfers=transfers):
+        if estimate is not None:
+            score = estimate(world, action)
+        elif weights is None:
+            score = 0.0
+        else:
+            dq = delta_quality(world, action, weights)
+            score = dq.get(self_country, 0.0) if self_country is not None else sum(dq.values())
+        yield action, score
+
+
+# Compact, picklable action encoding: ("T", transform, country, n) or ("X", src, dst, resource, amount)
+EncodedAction = Tuple
+
+
+def encode_action(action: Action) -> EncodedAction:
+    if isinstance(action, TransformAction):
+        return ("T", action.transform.name, action.country, action.n)
+    return ("X", action.src, action.dst, action.resource, action.amount)
+
+
+def decode_action(encoded: EncodedAction, transforms: Dict[str, CompiledTransform]) -> Action:
+    """Inverse of encode_action; 'transforms' maps names to compiled transforms."""
+    kind = encoded[0]
+    if kind == "T":
+        _, name, country, n = encoded
+        if name not in transforms:
+            raise KeyError(f"Unknown transform: {name}")
+        return TransformAction(transforms[name], country, n)
+    if kind == "X":
+        _, src, dst, resource, amount = encoded
+        return TransferAction(src, dst, resource, amount)
+    raise ValueError(f"Unknown action kind: {kind!r}")
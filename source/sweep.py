@@ -0,0 +1,165 @@
+"""
+Parameter sweeps of EU over (gamma, k, x0, C).
+
+The undiscounted dQ per country does not depend on any of the four
+parameters, so each schedule is reduced once (prepare_schedule) and EU is then
+evaluated over the full grid with the loops factored by what each axis
+affects:
+
+    gamma -> DR = gamma^N * dQ            (once per gamma)
+    k, x0 -> log P = sum log sigmoid(k*(DR-x0))  (once per gamma, k, x0)
+    C     -> EU = C + P * (DR_self - C)          (expected_utility_from_log per point)
+
+Values are identical to expected_utility at each grid point.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from source.world_state import WorldState, ResourceWeights
+from source.score import ScoreParams, check_discount, undiscounted_rewards
+from source.probability import expected_utility_from_log, log_acceptance_probabilities
+
+
+@dataclass(frozen=True, slots=True)
+class SweepInput:
+    """A schedule reduced to what EU needs: its length and per-country dQ."""
+    label: str
+    N: int
+    dq_self: float
+    dq_participants: Tuple[float, ...]
+
+
+def prepare_schedule(
+    world_start: WorldState,
+    world_end: WorldState,
+    weights: ResourceWeights,
+    *,
+    self_country: str,
+    participant_countries: Sequence[str],
+    N: int,
+    label: str = "",
+) -> SweepInput:
+    """Q_end - Q_start for self and every participant, computed once."""
+    check_discount(0.0, N)
+    dq = undiscounted_rewards(
+        world_start, world_end, weights, countries=[*participant_countries, self_country]
+    )
+    return SweepInput(label, N, dq[self_country], tuple(dq[c] for c in participant_countries))
+
+
+@dataclass(frozen=True, slots=True)
+class ParameterGrid:
+    """Cartesian product of parameter values; C varies fastest."""
+    gamma: Tuple[float, ...]
+    k: Tuple[float, ...]
+    x0: Tuple[float, ...]
+    C: Tuple[float, ...]
+
+    def __post_init__(self) -> None:
+        for name in ("gamma", "k", "x0", "C"):
+            if not getattr(self, name):
+                raise ValueError(f"{name} grid is empty.")
+        for g in self.gamma:
+            check_discount(g, 0)
+
+    @classmethod
+    def around(cls, params: ScoreParams = ScoreParams(), **axes: Iterable[float]) -> ParameterGrid:
+        """Grid over the given axes; the others are fixed at 'params'."""
+        unknown = set(axes) - {"gamma", "k", "x0", "C"}
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+        return cls(**{
+            name: tuple(axes[name]) if name in axes else (getattr(params, name),)
+            for name in ("gamma", "k", "x0", "C")
+        })
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int]:
+        return len(self.gamma), len(self.k), len(self.x0), len(self.C)
+
+    def __len__(self) -> int:
+        g, k, x, c = self.shape
+        return g * k * x * c
+
+
+class SweepRow(NamedTuple):
+    schedule: str
+    gamma: float
+    k: float
+    x0: float
+    C: float
+    eu: float
+
+
+@dataclass(frozen=True, slots=True)
+class SweepTable:
+    """
+    EU for every (schedule, gamma, k, x0, C), stored row-major in that order.
+    """
+    schedules: Tuple[str, ...]
+    grid: ParameterGrid
+    eu: array
+
+    COLUMNS = SweepRow._fields
+
+    def __len__(self) -> int:
+        return len(self.eu)
+
+    def _offset(self, schedule: int, gamma: int, k: int, x0: int, C: int) -> int:
+        _, nk, nx, nc = self.grid.shape
+        return (((schedule * len(self.grid.gamma) + gamma) * nk + k) * nx + x0) * nc + C
+
+    def value(self, schedule: str, *, gamma: float, k: float, x0: float, C: float) -> float:
+        """EU at one grid point (KeyError if any coordinate is not on the grid)."""
+        try:
+            idx = (
+                self.schedules.index(schedule),
+                self.grid.gamma.index(gamma),
+                self.grid.k.index(k),
+                self.grid.x0.index(x0),
+                self.grid.C.index(C),
+            )
+        except ValueError:
+            raise KeyError((schedule, gamma, k, x0, C)) from None
+        return self.eu[self._offset(*idx)]
+
+    def rows(self) -> Iterator[SweepRow]:
+        it = iter(self.eu)
+        g = self.grid
+        for s in self.schedules:
+            for gamma in g.gamma:
+                for k in g.k:
+                    for x0 in g.x0:
+                        for C in g.C:
+                            yield SweepRow(s, gamma, k, x0, C, next(it))
+
+    def best(self, schedule: Optional[str] = None) -> SweepRow:
+        """Row with the highest EU (first in table order on ties), optionally for one schedule."""
+        rows = self.rows() if schedule is None else (r for r in self.rows() if r.schedule == schedule)
+        best: Optional[SweepRow] = None
+        for r in rows:
+            if best is None or r.eu > best.eu:
+                best = r
+        if best is None:
+            raise KeyError(schedule)
+        return best
+
+
+def parameter_sweep(schedules: Iterable[SweepInput], grid: ParameterGrid) -> SweepTable:
+    """EU of every prepared schedule at every grid point."""
+    schedules = list(schedules)
+    Cs = grid.C
+    out = array("d")
+    for s in schedules:
+        for gamma in grid.gamma:
+            g = gamma ** s.N
+            dr_self = g * s.dq_self
+            drs = [g * dq for dq in s.dq_participants]
+            for k in grid.k:
+                for x0 in grid.x0:
+                    log_p = sum(log_acceptance_probabilities(drs, k=k, x0=x0))
+                    out.extend([expected_utility_from_log(log_p, dr_self, C) for C in Cs])
+    return SweepTable(tuple(s.label for s in schedules), grid, out)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from source.world_state import CountryState, Number
+from source.array_world import ArrayCountryView, ResourceIndex
+
+
+_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+SExpr = Union[str, List["SExpr"]]
+
+
+@dataclass(frozen=True, slots=True)
+class TransformTemplate:
+    """
+    One (TRANSFORM NAME (INPUTS (r amt) ...) (OUTPUTS (r amt) ...)) definition.
+    """
+    name: str
+    inputs: Tuple[Tuple[str, Number], ...]
+    outputs: Tuple[Tuple[str, Number], ...]
+
+    def net(self) -> Dict[str, Number]:
+        """Net change per resource for one application (outputs - inputs)."""
+        out: Dict[str, Number] = {}
+        for r, amt in self.inputs:
+            out[r] = out.get(r, 0.0) - amt
+        for r, amt in self.outputs:
+            out[r] = out.get(r, 0.0) + amt
+        return out
+
+
+def _read_sexprs(text: str) -> List[SExpr]:
+    """Tokenize and nest an S-expression document (';' starts a comment)."""
+    text = "\n".join(line.split(";", 1)[0] for line in text.splitlines())
+    stack: List[List[SExpr]] = [[]]
+    for tok in _TOKEN.findall(text):
+        if tok == "(":
+            stack.append([])
+        elif tok == ")":
+            if len(stack) == 1:
+                raise ValueError("Unbalanced ')' in transform template.")
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            stack[-1].append(tok)
+    if len(stack) != 1:
+        raise ValueError("Unbalanced '(' in transform template.")
+    return stack[0]
+
+
+def _read_amounts(section: SExpr, tag: str, name: str) -> Tuple[Tuple[str, Number], ...]:
+    if not isinstance(section, list) or not section or section[0] != tag:
+        raise ValueError(f"{name}: expected ({tag} ...) section.")
+    out = []
+    for entry in section[1:]:
+        if not (isinstance(entry, list) and len(entry) == 2 and all(isinstance(x, str) for x in entry)):
+            raise ValueError(f"{name}: malformed {tag} entry {entry!r}.")
+        amt = float(entry[1])
+        if amt < 0:
+            raise ValueError(f"{name}: negative amount for {entry[0]} in {tag}.")
+        out.append((entry[0], amt))
+    return tuple(out)
+
+
+def parse_transform_templates(text: str) -> List[TransformTemplate]:
+    """
+    Parse template.txt-style text into TransformTemplate objects (in file order).
+    """
+    out: List[TransformTemplate] = []
+    for form in _read_sexprs(text):
+        if not (isinstance(form, list) and len(form) == 4 and form[0] == "TRANSFORM" and isinstance(form[1], str)):
+            raise ValueError(f"Expected (TRANSFORM NAME (INPUTS ...) (OUTPUTS ...)), got {form!r}.")
+        name = form[1]
+        out.append(TransformTemplate(
+            name,
+            _read_amounts(form[2], "INPUTS", name),
+            _read_amounts(form[3], "OUTPUTS", name),
+        ))
+    return out
+
+
+def load_transform_templates(path: str | Path) -> List[TransformTemplate]:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(path)
+    return parse_transform_templates(path.read_text(encoding="utf-8"))
+
+
+def _fits(a: Number, need: Number, d: Number, k: int) -> bool:
+    """k applications of a net change d < 0 to amount a: inputs covered before the last, result >= 0."""
+    return a + (k - 1) * d >= need and a + k * d >= 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTransform:
+    """
+    Immutable transform with per-resource vectors aligned to a ResourceIndex.
+
+    resources[i] lives in column cols[i]; need[i] is the input amount that
+    CountryState.has() must see before each application, net[i] the change
+    one application makes.
+    """
+    name: str
+    resources: Tuple[str, ...]
+    cols: Tuple[int, ...]
+    need: Tuple[Number, ...]
+    net: Tuple[Number, ...]
+    index: ResourceIndex
+
+    @property
+    def inputs(self) -> Dict[str, Number]:
+        return {r: a for r, a in zip(self.resources, self.need) if a > 0}
+
+    def delta_map(self, n: int = 1) -> Dict[str, Number]:
+        """Net deltas for n applications, in apply_delta_map form."""
+        return {r: n * d for r, d in zip(self.resources, self.net) if d != 0.0}
+
+    def _amounts(self, country: CountryState) -> List[Number]:
+        if isinstance(country, ArrayCountryView) and country.world.index is self.index:
+            w = country.world
+            data, ncols, off = w.data, w.ncols, country.offset
+            return [data[off + c] if c < ncols else 0.0 for c in self.cols]
+        return [country.get(r) for r in self.resources]
+
+    def max_multiplier(self, country: CountryState, limit: Optional[int] = None) -> int:
+        """
+        Largest n such that applying this transform n times in a row passes
+        CountryState.has(inputs) before every application (capped at 'limit').
+        """
+        best = limit
+        for a, need, d in zip(self._amounts(country), self.need, self.net):
+            if need <= 0.0:
+                continue
+            if a < need:
+                return 0
+            if d < 0.0:
+                # Estimate by division, then settle k exactly with the same float
+                # expressions apply() uses: a + (k-1)*d must still cover 'need'
+                # and the amount written, a + k*d, must not be negative.
+                k = math.floor((a - need) / -d) + 1
+                while _fits(a, need, d, k + 1):
+                    k += 1
+                while k > 1 and not _fits(a, need, d, k):
+                    k -= 1
+                if best is None or k < best:
+                    best = k
+        if best is None:
+            raise ValueError(f"{self.name}: no consumed input bounds the multiplier; pass limit.")
+        return best
+
+    def apply(self, country: CountryState, n: int = 1) -> None:
+        """
+        Apply this transform n times as one update.
+        Raises ValueError (and changes nothing) if n applications are not feasible.
+        """
+        if n <= 0:
+            if n < 0:
+                raise ValueError(f"{self.name}: multiplier must be >= 0, got {n}.")
+            return
+        m = self.max_multiplier(country, limit=n)
+        if m < n:
+            raise ValueError(f"{country.name}: cannot apply {self.name} x{n} (max {m}).")
+
+        if isinstance(country, ArrayCountryView) and country.world.index is self.index:
+            w = country.world
+            if self.cols and max(self.cols) >= w.ncols:
+                w._resize()
+            data, off = w.data, country.offset
+            for c, d in zip(self.cols, self.net):
+                if d != 0.0:
+                    data[off + c] += n * d
+            return
+        country.apply_delta_map(self.delta_map(n))
+
+
+def compile_transform(template: TransformTemplate, index: ResourceIndex) -> CompiledTransform:
+    """Intern the template's resources into index and precompute its vectors."""
+    need: Dict[str, Number] = {}
+    for r, amt in template.inputs:
+        need[r] = need.get(r, 0.0) + amt
+    net = template.net()
+    resources = tuple(dict.fromkeys([*need, *net]))
+    return CompiledTransform(
+        name=template.name,
+        resources=resources,
+        cols=tuple(index.intern(r) for r in resources),
+        need=tuple(need.get(r, 0.0) for r in resources),
+        net=tuple(net.get(r, 0.0) for r in resources),
+        index=index,
+    )
+
+
+def compile_transforms(
+    templates: Iterable[TransformTemplate],
+    index: Optional[ResourceIndex] = None,
+) -> Dict[str, CompiledTransform]:
+    """Compile templates against a (shared) ResourceIndex, keyed by transform name."""
+    index = index if index is not None else ResourceIndex()
+    out: Dict[str, CompiledTransform] = {}
+    for t in templates:
+        if t.name in out:
+            raise ValueError(f"Duplicate transform: {t.name}")
+        out[t.name] = compile_transform(t, index)
+    return out
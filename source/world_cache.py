@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from source.world_state import ResourceWeights
+from source.array_world import ArrayWorldState, ResourceIndex
+from source.parse import REQUIRED_RESOURCES, parse_world_and_weights_csv_fast, parse_weights_csv
+
+
+# File layout (little-endian):
+#   8 bytes  MAGIC
+#   8 bytes  header length H (uint64)
+#   H bytes  UTF-8 JSON header: source fingerprint, kind, resources, countries, weights
+#   padding  to an 8-byte boundary
+#   float64  countries x resources matrix, row-major
+MAGIC = b"CSWCACH1"
+SUFFIX = ".wcache"
+
+
+def cache_path_for(csv_path: str | Path) -> Path:
+    """Snapshot location for a CSV: next to it, with '.wcache' appended."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + SUFFIX)
+
+
+def file_fingerprint(path: str | Path, *, with_hash: bool = True) -> dict:
+    """Size, mtime (ns) and optionally a blake2b content digest of a file."""
+    path = Path(path)
+    st = path.stat()
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_hash:
+        h = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        fp["blake2b"] = h.hexdigest()
+    return fp
+
+
+def write_cache(
+    cache_path: str | Path,
+    *,
+    kind: str,
+    source: dict,
+    options: dict,
+    world: Optional[ArrayWorldState],
+    weights: ResourceWeights,
+) -> None:
+    """Write a snapshot atomically (temp file + rename)."""
+    cache_path = Path(cache_path)
+    header = {
+        "kind": kind,
+        "source": source,
+        "options": options,
+        "resources": list(world.index.names[: world.ncols]) if world is not None else [],
+        "countries": list(world.country_names()) if world is not None else [],
+        "weights": weights.weights,
+    }
+    blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    pad = (-(len(MAGIC) + 8 + len(blob))) % 8
+
+    data = array("d", world.data) if world is not None else array("d")
+    if sys.byteorder != "little":
+        data.byteswap()
+
+    tmp = cache_path.with_name(cache_path.name + f".tmp{os.getpid()}")
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        f.write(b"\0" * pad)
+        f.write(data.tobytes())
+    os.replace(tmp, cache_path)
+
+
+def _is_str_list(value: object) -> bool:
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _valid_header(header: object, kind: str) -> bool:
+    """True if 'header' is a dict of the given kind with every field read_cache uses, correctly typed."""
+    if not isinstance(header, dict) or header.get("kind") != kind:
+        return False
+    if not isinstance(header.get("source"), dict) or not isinstance(header.get("options"), dict):
+        return False
+    weights = header.get("weights")
+    if not isinstance(weights, dict) or not all(
+        isinstance(w, (int, float)) and not isinstance(w, bool) for w in weights.values()
+    ):
+        return False
+    return kind != "world" or (_is_str_list(header.get("resources")) and _is_str_list(header.get("countries")))
+
+
+def read_cache(
+    cache_path: str | Path,
+    *,
+    kind: str,
+    source: Optional[dict] = None,
+    options: Optional[dict] = None,
+) -> Optional[Tuple[Optional[ArrayWorldState], ResourceWeights]]:
+    """
+    Read a snapshot and rebuild (world, weights): the JSON header, then the
+    matrix in one read straight into the ArrayWorldState's array.
+    Returns None if the file is missing, malformed, of another kind, or its
+    recorded source fingerprint / options differ from the ones given (only the
+    fingerprint fields present in 'source' are compared).
+    """
+    cache_path = Path(cache_path)
+    try:
+        f = cache_path.open("rb")
+    except OSError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        start = len(MAGIC) + 8
+        prefix = f.read(start)
+        if len(prefix) < start or prefix[: len(MAGIC)] != MAGIC:
+            return None
+        (hlen,) = struct.unpack_from("<Q", prefix, len(MAGIC))
+        if start + hlen > size:
+            return None
+        try:
+            header = json.loads(f.read(hlen).decode("utf-8"))
+        except ValueError:
+            return None
+        if not _valid_header(header, kind):
+            return None
+        recorded = header["source"]
+        if source is not None and any(recorded.get(k) != v for k, v in source.items()):
+            return None
+        if options is not None and header.get("options") != options:
+            return None
+
+        weights = ResourceWeights({r: float(w) for r, w in header["weights"].items()})
+        if kind != "world":
+            return None, weights
+
+        offset = start + hlen + ((-(start + hlen)) % 8)
+        n = len(header["countries"]) * len(header["resources"])
+        if size - offset != n * 8:
+            return None
+        f.seek(offset)
+        data = array("d")
+        try:
+            data.fromfile(f, n)
+        except EOFError:  # truncated since the size check
+            return None
+
+    if sys.byteorder != "little":
+        data.byteswap()
+    world = ArrayWorldState(ResourceIndex(header["resources"]), header["countries"], data)
+    return world, weights
+
+
+def _options(required_resources: Optional[Iterable[str]], **extra) -> dict:
+    req = set(required_resources) if required_resources is not None else set(REQUIRED_RESOURCES)
+    return {"required_resources": sorted(req), **extra}
+
+
+def load_world_cached(
+    csv_path: str | Path,
+    *,
+    required_resources: Optional[Iterable[str]] = None,
+    weights_row_names: Iterable[str] = ("WEIGHTS", "Weights", "weights"),
+    cache_path: Optional[str | Path] = None,
+    verify_hash: bool = True,
+) -> Tuple[ArrayWorldState, ResourceWeights]:
+    """
+    parse_world_and_weights_csv_fast with a binary snapshot next to the CSV.
+
+    The snapshot is used only if the CSV's size, mtime and (unless
+    verify_hash=False) content hash, plus the parse options, match what was
+    recorded; otherwise the CSV is parsed and the snapshot rewritten.
+    Failing to write the snapshot (e.g. read-only directory) is not an error.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+    cache_path = Path(cache_path) if cache_path is not None else cache_path_for(csv_path)
+    source = file_fingerprint(csv_path, with_hash=verify_hash)
+    options = _options(required_resources, weights_row_names=sorted(set(weights_row_names)))
+
+    hit = read_cache(cache_path, kind="world", source=source, options=options)
+    if hit is not None:
+        return hit  # type: ignore[return-value]
+
+    if not verify_hash:
+        source = file_fingerprint(csv_path)
+    world, weights = parse_world_and_weights_csv_fast(
+        csv_path, required_resources=required_resources, weights_row_names=weights_row_names
+    )
+    try:
+        write_cache(cache_path, kind="world", source=source, options=options, world=world, weights=weights)
+    except OSError:
+        pass
+    return world, weights
+
+
+def load_weights_cached(
+    csv_path: str | Path,
+    *,
+    required_resources: Optional[Iterable[str]] = None,
+    cache_path: Optional[str | Path] = None,
+    verify_hash: bool = True,
+) -> ResourceWeights:
+    """parse_weights_csv with the same snapshot/invalidation rules as load_world_cached."""
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(csv_path)
+    cache_path = Path(cache_path) if cache_path is not None else cache_path_for(csv_path)
+    source = file_fingerprint(csv_path, with_hash=verify_hash)
+    options = _options(required_resources)
+
+    hit = read_cache(cache_path, kind="weights", source=source, options=options)
+    if hit is not None:
+        return hit[1]
+
+    if not verify_hash:
+        source = file_fingerprint(csv_path)
+    weights = parse_weights_csv(csv_path, required_resources=required_resources)
+    try:
+        write_cache(cache_path, kind="weights", source=source, options=options, world=None, weights=weights)
+    except OSError:
+        pass
+    return weights
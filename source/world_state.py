@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Mapping, Iterable
-import copy
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from source.state_hash import ZobristKeys
+    from source.array_world import ResourceIndex
 
 
 Number = float 
@@ -13,9 +16,24 @@ class CountryState:
     """
     Stores the resource inventory for a single country at a single point in time.
     Missing resources are treated as 0.
+
+    After WorldState.copy() the inventory dict may be shared with another
+    world; it is cloned the first time add/apply_delta_map writes to it, so
+    mutate through those methods rather than through 'resources' directly.
+
+    bind_weights() opts into incremental scoring: the running sum
+    sum_r w[r] * amount[r] is updated by every add/apply_delta_map, and
+    quality() returns it divided by max(Population, pop_floor) in O(1).
+    enable_hashing() likewise keeps an incremental Zobrist hash (state_hash).
     """
     name: str
     resources: Dict[str, Number] = field(default_factory=dict)
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)
+    _qweights: Optional[Dict[str, Number]] = field(default=None, init=False, repr=False, compare=False)
+    _wsum: Number = field(default=0.0, init=False, repr=False, compare=False)
+    _pop_floor: Number = field(default=1.0, init=False, repr=False, compare=False)
+    _zkeys: Optional[ZobristKeys] = field(default=None, init=False, repr=False, compare=False)
+    _zhash: int = field(default=0, init=False, repr=False, compare=False)
 
     def get(self, resource: str) -> Number:
         """Return amount of resource (defaults to 0)."""
@@ -42,31 +60,143 @@ class CountryState:
                 f"{self.name}: insufficient {resource}. "
                 f"current={cur}, delta={delta}, would_be={nxt}"
             )
-        # Store 0s sparsely if you want (optional). Here we keep it simple:
-        self.resources[resource] = nxt
+        self._write(resource, cur, nxt)
+
+    def set(self, resource: str, amount: Number) -> None:
+        """
+        Overwrite a resource amount (used to restore exact values on undo).
+        Raises ValueError if amount is negative.
+        """
+        nxt = float(amount)
+        if nxt < 0:
+            raise ValueError(f"{self.name}: negative {resource}={nxt}.")
+        self._write(resource, self.get(resource), nxt)
+
+    def restore(self, resource: str, previous: Optional[Number]) -> None:
+        """
+        Undo helper: put back a value saved as resources.get(resource)
+        (None means the entry did not exist and is removed again).
+        """
+        if previous is not None:
+            self.set(resource, previous)
+            return
+        if resource not in self.resources:
+            return
+        cur = self.get(resource)
+        self._write(resource, cur, 0.0)
+        del self.resources[resource]
 
     def apply_delta_map(self, deltas: Mapping[str, Number]) -> None:
         """
         Apply multiple resource deltas as one atomic update.
         If any would go negative, raise and do not partially apply.
         """
-        # First check all
+        # First check all (one read per resource), then write
+        plan = []
         for r, d in deltas.items():
-            if self.get(r) + float(d) < 0:
+            cur = self.get(r)
+            nxt = cur + float(d)
+            if nxt < 0:
                 raise ValueError(
-                    f"{self.name}: insufficient {r} for delta {d}. current={self.get(r)}"
+                    f"{self.name}: insufficient {r} for delta {d}. current={cur}"
                 )
-        # Then apply
-        for r, d in deltas.items():
-            self.add(r, d)
+            plan.append((r, cur, nxt))
+        for r, cur, nxt in plan:
+            self._write(r, cur, nxt)
+
+    def _write(self, resource: str, cur: Number, nxt: Number) -> None:
+        """Single store path: copy-on-write, running weighted sum and state hash."""
+        if self._shared:
+            self._own()
+        # Store 0s sparsely if you want (optional). Here we keep it simple:
+        self.resources[resource] = nxt
+        if self._qweights is not None:
+            w = self._qweights.get(resource)
+            if w:
+                self._wsum += w * (nxt - cur)
+        if self._zkeys is not None:
+            self._zhash ^= self._zkeys.key(self.name, resource, cur) ^ self._zkeys.key(self.name, resource, nxt)
+
+    def enable_hashing(self, keys: ZobristKeys) -> None:
+        """Start maintaining a Zobrist hash of this inventory (see source.state_hash)."""
+        self._zkeys = keys
+        self._zhash = keys.country_hash(self)
+
+    @property
+    def state_hash(self) -> int:
+        if self._zkeys is None:
+            raise ValueError(f"{self.name}: state_hash requires enable_hashing() first.")
+        return self._zhash
+
+    def bind_weights(
+        self,
+        weights: ResourceWeights,
+        *,
+        exclude: Optional[Iterable[str]] = None,
+        pop_floor: float = 1.0,
+    ) -> None:
+        """
+        Start maintaining sum_r w[r] * amount[r] incrementally.
+        Weights (minus 'exclude') are snapshotted; rebind after changing them.
+        """
+        exclude_set = set(exclude) if exclude is not None else set()
+        self._qweights = {
+            r: float(w) for r, w in weights.weights.items()
+            if w and r not in exclude_set
+        }
+        self._pop_floor = pop_floor
+        self._wsum = sum(w * self.get(r) for r, w in self._qweights.items())
+
+    def unbind_weights(self) -> None:
+        self._qweights = None
+        self._wsum = 0.0
+
+    @property
+    def is_bound(self) -> bool:
+        return self._qweights is not None
+
+    def quality(self) -> Number:
+        """
+        Per-capita State Quality from the running weighted sum (see bind_weights):
+
+            Q = sum_r w[r] * amount[r] / max(Population, pop_floor)
+        """
+        if self._qweights is None:
+            raise ValueError(f"{self.name}: quality() requires bind_weights() first.")
+        return self._wsum / max(self.get("Population"), self._pop_floor)
+
+    def _share(self) -> CountryState:
+        """Return a new CountryState sharing this inventory copy-on-write."""
+        self._shared = True
+        out = CountryState(self.name, self.resources)
+        out._shared = True
+        out._qweights = self._qweights
+        out._wsum = self._wsum
+        out._pop_floor = self._pop_floor
+        out._zkeys = self._zkeys
+        out._zhash = self._zhash
+        return out
+
+    def _own(self) -> None:
+        """Clone a shared inventory so this CountryState can write to it."""
+        self.resources = dict(self.resources)
+        self._shared = False
 
 
 @dataclass(slots=True)
 class WorldState:
     """
     Stores the state of the world at a single time: multiple countries with inventories.
+
+    For in-place search, checkpoint() turns on an undo log: every apply_delta /
+    replay records the previous amounts it overwrites, and rollback(mark)
+    restores them exactly, so one mutable world can be explored depth-first
+    without per-step copies. (Direct CountryState mutations are not logged.)
     """
     countries: Dict[str, CountryState] = field(default_factory=dict)
+    _journal: Optional[List[Tuple[CountryState, str, Optional[Number]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def get_country(self, name: str) -> CountryState:
         if name not in self.countries:
@@ -74,12 +204,132 @@ class WorldState:
         return self.countries[name]
 
     def copy(self) -> WorldState:
-        """Deep copy so schedules can be simulated without mutating the original."""
-        return copy.deepcopy(self)
+        """
+        Copy-on-write copy so schedules can be simulated without mutating the original.
+        Inventories are shared until either side first mutates a country, so a copy
+        costs one small object per country plus one dict per country actually changed.
+        """
+        return WorldState({name: c._share() for name, c in self.countries.items()})
 
     def country_names(self) -> Iterable[str]:
         return self.countries.keys()
 
+    def checkpoint(self) -> int:
+        """Start (or continue) the undo log and return a mark for rollback()."""
+        if self._journal is None:
+            self._journal = []
+        return len(self._journal)
+
+    def rollback(self, mark: int = 0) -> None:
+        """Undo every logged change made after checkpoint() returned 'mark'."""
+        journal = self._journal
+        if journal is None:
+            raise ValueError("rollback() requires checkpoint() first.")
+        if not 0 <= mark <= len(journal):
+            raise ValueError(f"Invalid checkpoint mark: {mark}")
+        while len(journal) > mark:
+            c, r, old = journal.pop()
+            c.restore(r, old)
+
+    def release(self) -> None:
+        """Stop logging and keep the current state (drops all marks)."""
+        self._journal = None
+
+    def apply_delta(self, country_name: str, deltas: Mapping[str, Number]) -> None:
+        """CountryState.apply_delta_map on one country, recorded in the undo log if active."""
+        c = self.get_country(country_name)
+        journal = self._journal
+        if journal is None:
+            c.apply_delta_map(deltas)
+            return
+        mark = len(journal)
+        for r in deltas:
+            journal.append((c, r, c.resources.get(r)))
+        try:
+            c.apply_delta_map(deltas)
+        except ValueError:
+            del journal[mark:]
+            raise
+
+    def apply_batch(self, entries: Iterable[Tuple[str, str, Number]]) -> None:
+        """
+        Apply many (country, resource, delta) entries as one atomic transaction.
+
+        Entries for the same (country, resource) accumulate in order, and only
+        the final amounts must be non-negative, so a multi-country trade is
+        one call. Everything is validated first (KeyError for an unknown
+        country, ValueError for a negative result) and nothing is written
+        unless all entries pass. Logged in the undo log if active.
+        """
+        countries = self.countries
+        plan: Dict[Tuple[str, str], List[Any]] = {}
+        for name, r, d in entries:
+            p = plan.get((name, r))
+            if p is None:
+                c = countries.get(name)
+                if c is None:
+                    raise KeyError(f"Unknown country: {name}")
+                cur = c.get(r)
+                p = plan[(name, r)] = [c, r, cur, cur]
+            p[3] += float(d)
+        for c, r, cur, nxt in plan.values():
+            if nxt < 0:
+                raise ValueError(
+                    f"{c.name}: insufficient {r} for batch delta {nxt - cur}. current={cur}"
+                )
+        journal = self._journal
+        for c, r, cur, nxt in plan.values():
+            if journal is not None:
+                journal.append((c, r, c.resources.get(r)))
+            c._write(r, cur, nxt)
+
+    def replay(self, steps: Iterable[Any]) -> int:
+        """
+        Apply a schedule in place. Each step is either an action with deltas()
+        (and optionally feasible(world), e.g. source.successors actions) or a
+        {country: {resource: delta}} mapping. All-or-nothing: if a step fails,
+        the steps already applied are rolled back before the error (ValueError, or
+        KeyError for an unknown country) propagates.
+        Returns the checkpoint mark taken before the first step.
+        """
+        mark = self.checkpoint()
+        try:
+            for step in steps:
+                if hasattr(step, "deltas"):
+                    if hasattr(step, "feasible") and not step.feasible(self):
+                        raise ValueError(f"Infeasible step: {step}")
+                    step = step.deltas()
+                self.apply_batch(
+                    (name, r, d) for name, deltas in step.items() for r, d in deltas.items()
+                )
+        except (KeyError, ValueError):
+            self.rollback(mark)
+            raise
+        return mark
+
+    def bind_weights(
+        self,
+        weights: ResourceWeights,
+        *,
+        exclude: Optional[Iterable[str]] = None,
+        pop_floor: float = 1.0,
+    ) -> None:
+        """Enable incremental quality (CountryState.bind_weights) for every country."""
+        for c in self.countries.values():
+            c.bind_weights(weights, exclude=exclude, pop_floor=pop_floor)
+
+    def enable_hashing(self, keys: ZobristKeys) -> None:
+        """Enable incremental Zobrist hashing for every country (copies inherit it)."""
+        for c in self.countries.values():
+            c.enable_hashing(keys)
+
+    def state_hash(self) -> int:
+        """XOR of the per-country hashes; equal worlds hash equal regardless of history."""
+        h = 0
+        for c in self.countries.values():
+            h ^= c.state_hash
+        return h
+
 
 @dataclass(slots=True)
 class ResourceWeights:
@@ -89,4 +339,60 @@ class ResourceWeights:
     weights: Dict[str, Number] = field(default_factory=dict)
 
     def get(self, resource: str) -> Number:
-        return float(self.weights.get(resource, 0.0))
\ No newline at end of file
+        return float(self.weights.get(resource, 0.0))
+
+    def freeze(self, index: Optional[ResourceIndex] = None) -> FrozenWeights:
+        """
+        Compile into an immutable FrozenWeights that keeps only nonzero weights,
+        with resource names interned into integer ids (columns of 'index' if given).
+        """
+        items = [(r, float(w)) for r, w in self.weights.items() if w]
+        if index is not None:
+            ids = tuple(index.intern(r) for r, _ in items)
+        else:
+            ids = tuple(range(len(items)))
+        return FrozenWeights(
+            names=tuple(r for r, _ in items),
+            ids=ids,
+            values=tuple(w for _, w in items),
+            index=index,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenWeights:
+    """
+    Immutable, sparse form of ResourceWeights (see ResourceWeights.freeze).
+
+    Only nonzero weights are kept, so scoring touches only resources that can
+    change Q. Per-'exclude' term lists are computed once and cached. It offers
+    the same get()/weights read API as ResourceWeights.
+    """
+    names: Tuple[str, ...]
+    ids: Tuple[int, ...]
+    values: Tuple[Number, ...]
+    index: Optional[ResourceIndex] = field(default=None, compare=False)
+    _lookup: Dict[str, Number] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _terms: Dict[frozenset, Tuple[Tuple[str, int, Number], ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._lookup.update(zip(self.names, self.values))
+
+    @property
+    def weights(self) -> Dict[str, Number]:
+        return dict(self._lookup)
+
+    def get(self, resource: str) -> Number:
+        return self._lookup.get(resource, 0.0)
+
+    def terms(self, exclude: Optional[Iterable[str]] = None) -> Tuple[Tuple[str, int, Number], ...]:
+        """(name, id, weight) for every nonzero weight not in 'exclude' (cached per exclude set)."""
+        key = frozenset(exclude) if exclude is not None else frozenset()
+        out = self._terms.get(key)
+        if out is None:
+            out = self._terms[key] = tuple(
+                t for t in zip(self.names, self.ids, self.values) if t[0] not in key
+            )
+        return out
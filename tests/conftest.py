@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from source.world_state import WorldState, CountryState
+from source.parse import parse_weights_csv
+from source.transforms import load_transform_templates, compile_transforms
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def weights():
+    """The project's resource weights (resources.csv)."""
+    return parse_weights_csv(ROOT / "resources.csv")
+
+
+@pytest.fixture
+def templates():
+    """The project's transform templates (template.txt), uncompiled."""
+    return load_transform_templates(ROOT / "template.txt")
+
+
+@pytest.fixture
+def transforms(templates):
+    return compile_transforms(templates)
+
+
+@pytest.fixture
+def world():
+    """A small two-country world: A can make alloys, B has spare Timber."""
+    return WorldState({
+        "A": CountryState("A", {"Population": 10, "MetallicElements": 12, "Timber": 10}),
+        "B": CountryState("B", {"Population": 10, "MetallicElements": 2, "Timber": 30}),
+    })
@@ -0,0 +1,147 @@
+import pytest
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.array_world import ArrayWorldState, ResourceIndex
+from source.quality import state_quality
+from source.expected_utility import expected_utility
+from source.state_hash import ZobristKeys
+from source.search import BeamSearch, DepthFirstSearch, SearchConfig
+
+
+def _world(**countries):
+    return WorldState({n: CountryState(n, dict(inv)) for n, inv in countries.items()})
+
+
+def test_resource_index_interns_once():
+    idx = ResourceIndex(["Population", "Timber"])
+    assert idx.intern("Timber") == 1
+    assert idx.intern("Housing") == 2
+    assert idx.get("Missing") is None
+    assert list(idx) == ["Population", "Timber", "Housing"]
+
+
+def test_views_match_country_state_api():
+    w = ArrayWorldState.from_world_state(_world(
+        A={"Population": 10, "Timber": 5},
+        B={"Housing": 2},
+    ))
+
+    a = w.get_country("A")
+    assert a.get("Timber") == 5.0
+    assert a.get("Housing") == 0.0  # column exists, row is zero
+    assert a.get("Nonexistent") == 0.0
+    assert a.has({"Timber": 5})
+    assert not a.has({"Timber": 6})
+
+    a.add("Timber", -2)
+    assert a.get("Timber") == 3.0
+    with pytest.raises(ValueError):
+        a.add("Timber", -10)
+
+    with pytest.raises(ValueError):
+        a.apply_delta_map({"Timber": -1, "Population": -11})
+    assert a.get("Timber") == 3.0
+    assert a.get("Population") == 10.0
+
+    with pytest.raises(KeyError):
+        w.get_country("Unknown")
+
+
+def test_new_resource_widens_matrix():
+    w = ArrayWorldState.from_world_state(_world(A={"Timber": 1}, B={"Timber": 2}))
+    w.get_country("B").apply_delta_map({"Electronics": 3})
+    assert w.get_country("A").get("Electronics") == 0.0
+    assert w.get_country("B").get("Electronics") == 3.0
+    assert w.get_country("B").get("Timber") == 2.0
+    assert len(w.data) == 2 * len(w.index)
+
+
+def test_copy_is_independent_but_shares_index():
+    w = ArrayWorldState.from_world_state(_world(A={"Timber": 10}))
+    w2 = w.copy()
+    w2.get_country("A").add("Timber", -5)
+    assert w.get_country("A").get("Timber") == 10.0
+    assert w2.get_country("A").get("Timber") == 5.0
+    assert w2.index is w.index
+
+
+def test_scoring_unchanged_on_array_backend():
+    weights = ResourceWeights({"Population": 0.0, "Food": 1.0, "Pollution": -1.0})
+    w0 = _world(
+        A={"Population": 100, "Food": 0, "Pollution": 0},
+        B={"Population": 80, "Food": 5, "Pollution": 0},
+    )
+    w1 = _world(
+        A={"Population": 100, "Food": 50, "Pollution": 10},
+        B={"Population": 80, "Food": 20, "Pollution": 4},
+    )
+    idx = ResourceIndex()
+    a0 = ArrayWorldState.from_world_state(w0, idx)
+    a1 = ArrayWorldState.from_world_state(w1, idx)
+
+    for name in ("A", "B"):
+        for ws in (weights, weights.freeze(), weights.freeze(idx)):
+            for exclude in (None, ["Pollution"]):
+                expected = state_quality(w1, name, weights, exclude=exclude)
+                assert abs(state_quality(a1, name, ws, exclude=exclude) - expected) < 1e-12
+
+    kwargs = dict(self_country="A", participant_countries=["A", "B"], weights=weights,
+                  gamma=0.9, N=2, k=1.0, x0=0.0, C=-1.0)
+    assert abs(expected_utility(a0, a1, **kwargs) - expected_utility(w0, w1, **kwargs)) < 1e-12
+
+    back = a1.to_world_state()
+    assert back.get_country("B").get("Food") == 20.0
+
+
+def test_undo_log_batch_hashing_and_incremental_quality():
+    weights = ResourceWeights({"Timber": 1.0, "Housing": 2.0})
+    w = ArrayWorldState.from_world_state(_world(
+        A={"Population": 10, "Timber": 10},
+        B={"Population": 5, "Timber": 1},
+    ))
+    keys = ZobristKeys()
+    w.enable_hashing(keys)
+    w.bind_weights(weights)
+    start_hash = w.state_hash()
+
+    mark = w.checkpoint()
+    w.apply_batch([("A", "Timber", -4), ("B", "Timber", 4), ("B", "Electronics", 2)])  # widens the matrix
+    assert w.get_country("B").get("Electronics") == 2.0
+    with pytest.raises(ValueError):
+        w.apply_batch([("A", "Timber", -3), ("B", "Timber", -6)])  # nothing written
+    with pytest.raises(KeyError):
+        w.apply_batch([("Z", "Timber", 1)])
+    with pytest.raises(ValueError):
+        w.replay([{"A": {"Housing": 1}}, {"B": {"Timber": -100}}])  # first step rolled back too
+    assert w.get_country("A").get("Housing") == 0.0
+
+    for name in ("A", "B"):
+        c = w.get_country(name)
+        assert c.state_hash == keys.country_hash(c)
+        assert abs(c.quality() - state_quality(w, name, weights)) < 1e-12
+    copy = w.copy()
+    assert copy.state_hash() == w.state_hash() != start_hash
+
+    w.rollback(mark)
+    w.release()
+    assert w.state_hash() == start_hash == keys.world_hash(_world(
+        A={"Population": 10, "Timber": 10},
+        B={"Population": 5, "Timber": 1},
+    ))
+    assert w.get_country("A").quality() == state_quality(w, "A", weights)
+    assert copy.get_country("A").get("Timber") == 6.0  # copies keep their own state
+
+    c = w.add_country("C", {"Population": 2, "Housing": 3})
+    assert c.quality() == 3.0 and c.state_hash == keys.country_hash(c)
+
+
+def test_search_and_transposition_table_on_array_world(world, transforms, weights):
+    cfg = SearchConfig(beam_width=6, max_depth=3, top_k=5, transfers=(("Timber", 5),),
+                       transposition_capacity=1000)
+    for cls in (BeamSearch, DepthFirstSearch):
+        ref = cls(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+        arr = cls(ArrayWorldState.from_world_state(world), transforms.values(), self_country="A", weights=weights, config=cfg)
+        expected, got = ref.run(), arr.run()
+        assert [r.describe() for r in got] == [r.describe() for r in expected]
+        assert [r.eu for r in got] == pytest.approx([r.eu for r in expected], rel=0, abs=1e-12)
+        assert arr.duplicates_pruned == ref.duplicates_pruned > 0
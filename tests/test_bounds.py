@@ -0,0 +1,64 @@
+import math
+
+from source.world_state import CountryState, ResourceWeights
+from source.quality import state_quality
+from source.score import ScoreParams
+from source.transforms import TransformTemplate, compile_transforms
+from source.successors import apply_action, iter_actions
+from source.bounds import EUBound, quality_bound
+from source.search import DepthFirstSearch, SearchConfig
+
+
+def _max_reachable(world, transforms, weights, name, depth):
+    best = state_quality(world, name, weights)
+    if depth == 0:
+        return best
+    for a in iter_actions(world, transforms, countries=[name]):
+        w = world.copy()
+        apply_action(w, a)
+        best = max(best, _max_reachable(w, transforms, weights, name, depth - 1))
+    return best
+
+
+def test_quality_bound_is_admissible(world, transforms, weights):
+    ts = list(transforms.values())
+    qb = quality_bound(ts, weights)
+    assert not qb.population_changes and qb.prices is not None
+    assert set(qb.prices) <= {"MetallicElements", "Timber"}  # only non-renewables are priced
+
+    for name in ("A", "B"):
+        c = world.get_country(name)
+        q = state_quality(world, name, weights)
+        for steps in (1, 2, 4):
+            reachable = _max_reachable(world, ts, weights, name, steps)
+            assert reachable <= q + qb.gain(c, steps) / c.get("Population") + 1e-12
+
+
+def test_quality_bound_unbounded_cases():
+    grow = TransformTemplate("GROW", (("Food", 1.0),), (("Population", 2.0),))
+    free = TransformTemplate("FREE", (), (("Gold", 1.0),))
+    w = ResourceWeights({"Gold": 1.0, "Food": 0.1})
+    c = CountryState("A", {"Population": 1.0, "Food": 3.0})
+
+    assert quality_bound(compile_transforms([grow]).values(), w).gain(c, 3) == math.inf
+    qb = quality_bound(compile_transforms([free]).values(), w)
+    assert qb.prices is None and qb.gain(c) == math.inf and qb.gain(c, 3) == 3.0
+
+
+def test_branch_and_bound_keeps_dfs_results_and_prunes(world, transforms, weights):
+    params = ScoreParams(gamma=0.8, k=5.0, x0=0.0, C=-0.5)
+    kwargs = dict(self_country="A", weights=weights, participant_countries=["A"], params=params)
+
+    plain = DepthFirstSearch(world, transforms.values(), config=SearchConfig(max_depth=4, top_k=2), **kwargs)
+    pruned = DepthFirstSearch(
+        world, transforms.values(), config=SearchConfig(max_depth=4, top_k=2, bound_pruning=True), **kwargs
+    )
+    expected = [(r.describe(), r.eu) for r in plain.run()]
+    assert [(r.describe(), r.eu) for r in pruned.run()] == expected
+    assert pruned.bounds_pruned > 0
+    assert pruned.nodes_generated < plain.nodes_generated
+
+    # The bound dominates the EU of every node the plain search scored
+    bound = EUBound(world, transforms.values(), weights, params=params, max_depth=4)
+    assert bound.node(world, ["A"], "A", 0) >= expected[0][1]
+    assert bound.node(world, ["A"], "A", 4) == -math.inf
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+
+from source.world_state import WorldState, CountryState
+from source.score import ScoreParams
+from source.search import BeamSearch, DepthFirstSearch, SearchConfig
+from source.checkpoint import SearchCheckpoint
+
+
+@pytest.fixture
+def make_search(transforms, weights):
+    """Build a fresh BeamSearch; the third country makes the transposition table evict."""
+    def build(**cfg):
+        world = WorldState({
+            "A": CountryState("A", {"Population": 10, "MetallicElements": 12, "Timber": 10}),
+            "B": CountryState("B", {"Population": 10, "MetallicElements": 8, "Timber": 30}),
+            "C": CountryState("C", {"Population": 5, "MetallicElements": 20, "Timber": 2}),
+        })
+        config = SearchConfig(**{
+            "beam_width": 4, "max_depth": 5, "top_k": 4, "transfers": (("Timber", 2), ("MetallicElements", 1)),
+            "transposition_capacity": 40, **cfg,
+        })
+        return BeamSearch(world, transforms.values(), self_country="A", weights=weights,
+                          params=ScoreParams(gamma=0.9, k=3.0), config=config)
+    return build
+
+
+def _summary(results):
+    return [(r.describe(), r.eu, r.world) for r in results]
+
+
+def test_resume_from_every_level_matches_uninterrupted_run(tmp_path: Path, make_search):
+    plain = make_search()
+    expected = _summary(plain.run())
+    assert plain.table.evictions > 0  # LRU order matters for this run
+
+    path = tmp_path / "run.ckpt"
+    ckpt = SearchCheckpoint(path)
+    assert _summary(ckpt.run(make_search())) == expected
+    assert ckpt.checkpoints == 5
+
+    # "Kill" the run after each level by replaying its steps into a fresh file
+    for stop in range(1, 5):
+        part = tmp_path / f"part{stop}.ckpt"
+        s = make_search()
+        c = SearchCheckpoint(part)
+        c.begin(s)
+        for _ in range(stop):
+            s.step()
+            c.write(s)
+        c.close()
+        with part.open("ab") as f:
+            f.write(b"N\x40\x00")  # torn trailing record
+
+        resumed = make_search()
+        c2 = SearchCheckpoint(part)
+        results = c2.run(resumed)
+        assert _summary(results) == expected
+        assert c2.checkpoints == 5 - stop  # continued from the checkpoint, not from scratch
+        assert resumed.nodes_generated == plain.nodes_generated
+        assert resumed.duplicates_pruned == plain.duplicates_pruned
+        assert list(resumed.table.items()) == list(plain.table.items())
+
+
+def test_checkpoint_is_incremental_and_checks_inputs(tmp_path: Path, make_search, weights):
+    path = tmp_path / "run.ckpt"
+    s = make_search()
+    c = SearchCheckpoint(path)
+    with pytest.raises(ValueError):
+        c.write(s)  # no file started yet
+    c.begin(s)
+    sizes = []
+    while s.step():
+        seq = s.peek_seq()
+        sizes.append(c.write(s))
+        assert s.peek_seq() == seq  # writing does not consume node seqs
+    c.close()
+    # A level only adds its new nodes / table entries, far less than the whole file
+    assert max(sizes) < path.stat().st_size
+    assert c.seconds >= 0.0
+
+    with pytest.raises(ValueError):
+        SearchCheckpoint(path).restore(make_search(beam_width=3))
+    assert not SearchCheckpoint(tmp_path / "missing.ckpt").restore(make_search())
+    dfs = DepthFirstSearch(make_search().world_start, [], self_country="A", weights=weights)
+    with pytest.raises(ValueError):
+        SearchCheckpoint(tmp_path / "dfs.ckpt").begin(dfs)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from source.daemon import _WORKER, Daemon, DaemonClient
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def _running(daemon, *, unix=None):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        if unix is not None:
+            asyncio.run_coroutine_threadsafe(daemon.start_unix(unix), loop).result()
+            yield DaemonClient(unix=unix)
+        else:
+            server = asyncio.run_coroutine_threadsafe(daemon.start_tcp(), loop).result()
+            yield DaemonClient(address=server.sockets[0].getsockname()[:2])
+    finally:
+        asyncio.run_coroutine_threadsafe(daemon.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def _write_world(path: Path, timber: int) -> None:
+    path.write_text(f"Country,Population,Timber\nA,10,{timber}\nB,10,5\nWEIGHTS,0,1\n", encoding="utf-8")
+
+
+def test_daemon_answers_queries_and_reloads_changed_csv(tmp_path: Path):
+    world = tmp_path / "world.csv"
+    _write_world(world, 10)
+    daemon = Daemon(base_dir=tmp_path, workers=0)
+    with _running(daemon) as client:
+        assert client.request({"op": "ping", "id": 1}) == {"id": 1, "ok": True}
+
+        q = client.request({"op": "quality", "world": "world.csv", "countries": ["A"]})
+        assert q["ok"] and q["qualities"] == {"A": 1.0}
+
+        ev = {"id": "e", "world": "world.csv", "self": "A", "deltas": [{"A": {"Timber": 5}}]}
+        first = client.request(ev)
+        assert first["ok"] and first["id"] == "e"
+        assert client.request(ev) == first
+        assert daemon.store.misses == 1  # parsed once, then served warm
+
+        _write_world(world, 20)
+        os.utime(world, ns=(1, 1))
+        assert client.request({"op": "quality", "world": "world.csv", "countries": ["A"]})["qualities"] == {"A": 2.0}
+
+        bad = client.request({"world": "missing.csv", "self": "A", "deltas": []})
+        assert not bad["ok"] and "FileNotFoundError" in bad["error"]
+
+        found = client.request({
+            "op": "search", "world": "world.csv", "templates": str(ROOT / "template.txt"),
+            "self": "A", "config": {"max_depth": 1, "transfers": [["Timber", 1]]},
+        })
+        assert found["ok"] and found["results"]
+
+        stats = client.request({"op": "stats"})
+        assert stats["requests"] == 8
+        client.close()
+
+
+def test_daemon_unix_socket_and_process_pool():
+    with tempfile.TemporaryDirectory() as d:
+        world = Path(d) / "w.csv"
+        _write_world(world, 10)
+        daemon = Daemon(base_dir=d, workers=1)
+        with _running(daemon, unix=Path(d) / "s.sock") as client:
+            found = client.request({
+                "op": "search", "world": "w.csv", "self": "A",
+                "config": {"max_depth": 1, "transfers": [["Timber", 1]]},
+            })
+            assert found["ok"] and found["results"][0]["actions"] == ["TRANSFER(B -> A, Timber 1.0)"]
+            client.close()
+
+
+def test_daemon_replies_to_unexpected_errors(tmp_path: Path, monkeypatch):
+    _write_world(tmp_path / "world.csv", 10)
+    daemon = Daemon(base_dir=tmp_path, workers=0)
+
+    def broken(requests, ctx):
+        raise AttributeError("boom")
+
+    with _running(daemon) as client:
+        monkeypatch.setattr("source.daemon.process_batch", broken)
+        for req in ({"id": 1, "world": "world.csv"}, {"id": 2, "op": "search", "world": "world.csv"}):
+            assert client.request(req) == {"id": req["id"], "ok": False, "error": "AttributeError: boom"}
+        monkeypatch.undo()
+        malformed = client.request({"id": 3, "world": "world.csv", "self": "A", "deltas": [5]})
+        assert not malformed["ok"] and malformed["error"].startswith("ValueError")
+        assert client.request({"op": "ping", "id": 4}) == {"id": 4, "ok": True}  # connection still usable
+        client.close()
+
+
+def test_daemon_reload_reaches_search_workers_and_skips_long_lines(tmp_path: Path):
+    _write_world(tmp_path / "world.csv", 10)
+    daemon = Daemon(base_dir=tmp_path, workers=0, line_limit=256)
+    search = {"op": "search", "world": "world.csv", "self": "A", "config": {"max_depth": 1}}
+    with _running(daemon) as client:
+        assert client.request(search)["ok"]
+        _, before = _WORKER[str(daemon.base_dir)]
+        assert client.request({"op": "reload"})["ok"]
+        assert client.request(search)["ok"]
+        _, after = _WORKER[str(daemon.base_dir)]
+        assert after is not before and after.store.misses == 1  # the worker re-parsed after reload
+
+        long = client.request({"id": 1, "op": "ping", "pad": "x" * 1000})
+        assert long == {"id": None, "ok": False, "error": "ValueError: Request line longer than 256 bytes"}
+        assert client.request({"op": "ping", "id": 2}) == {"id": 2, "ok": True}  # next line still parsed
+        client.close()
+
+
+def test_daemon_close_cancels_open_connections(tmp_path: Path):
+    daemon = Daemon(base_dir=tmp_path, workers=0)
+    with _running(daemon) as client:
+        assert client.request({"op": "ping", "id": 1})["ok"]
+        connections = list(daemon._connections)
+    assert connections and all(task.cancelled() for task in connections)
+    client.close()
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from source import instrument
+from source import score
+from source.quality import state_quality
+from source.expected_utility import expected_utility
+from source.search import SearchConfig, beam_search
+
+
+def test_disabled_is_untouched_and_enable_restores():
+    original = score.state_quality
+    assert not instrument.ENABLED
+    with instrument.profiling():
+        assert score.state_quality is not original
+        assert instrument.ENABLED
+    assert score.state_quality is original
+    assert state_quality is original
+    assert not instrument.ENABLED
+
+
+def test_profiling_records_calls_copies_and_search_counters(tmp_path: Path, world, transforms, weights):
+    with instrument.profiling():
+        expected_utility(world, world.copy(), self_country="A", participant_countries=["A", "B"],
+                         weights=weights, gamma=0.9, N=1, k=1.0, x0=0.0, C=-1.0)
+        beam_search(world, transforms.values(), self_country="A", weights=weights,
+                    config=SearchConfig(beam_width=2, max_depth=2, transfers=(("Timber", 5),),
+                                        transposition_capacity=100))
+
+    rep = instrument.report()
+    fns = rep["functions"]
+    assert fns["source.expected_utility.expected_utility"]["calls"] >= 1
+    assert fns["source.probability.log_acceptance_probabilities"]["calls"] >= 1
+    assert fns["source.probability.expected_utility_from_log"]["calls"] >= 1
+    assert fns["source.world_state.WorldState.copy"]["objects"] >= 2
+    assert fns["source.world_state.CountryState._own"]["bytes"] > 0
+    assert rep["counters"]["search.nodes_expanded"] >= 1
+    assert rep["counters"]["search.nodes_generated"] >= 1
+    assert rep["maxima"]["search.frontier_size"] >= 1
+
+    table = instrument.summary_table()
+    assert "source.quality.state_qualities" in table
+    out = tmp_path / "profile.json"
+    instrument.dump_json(out)
+    assert json.loads(out.read_text())["counters"] == rep["counters"]
+
+    # Disabled again: nothing more is recorded
+    before = fns["source.expected_utility.expected_utility"]["calls"]
+    expected_utility(world, world, self_country="A", participant_countries=["A"],
+                     weights=weights, gamma=0.9, N=1, k=1.0, x0=0.0, C=-1.0)
+    assert instrument.report()["functions"]["source.expected_utility.expected_utility"]["calls"] == before
+    instrument.reset()
@@ -0,0 +1,35 @@
+from source.search import SearchConfig, beam_search
+from source.parallel import SharedWorld, attach_shared_world, parallel_beam_search
+
+
+def test_shared_world_roundtrip(world, weights):
+    with SharedWorld(world, weights) as shared:
+        w2, weights2 = attach_shared_world(shared.spec)
+    for n in ("A", "B"):
+        for r in ("Population", "MetallicElements", "Timber", "Housing"):
+            assert w2.get_country(n).get(r) == world.get_country(n).get(r)
+    for r in ("Timber", "HousingWaste", "Population"):
+        assert weights2.get(r) == weights.get(r)
+
+
+def _summary(results):
+    return [(r.describe(), r.eu, r.world) for r in results]
+
+
+def test_parallel_matches_serial_for_any_split(world, templates, transforms, weights):
+    configs = [
+        SearchConfig(beam_width=3, max_depth=3, top_k=4, transfers=(("Timber", 5),), transposition_capacity=64),
+        SearchConfig(beam_width=3, max_depth=3, top_k=4, transfers=(("Timber", 5),)),  # no table: kept successors only
+        SearchConfig(beam_width=4, max_depth=3, top_k=2, transfers=(("Timber", 5),), transposition_capacity=5),
+        SearchConfig(beam_width=2, max_depth=4, top_k=3, bound_pruning=True),
+    ]
+    for cfg in configs:
+        serial = beam_search(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+        for workers, chunks in ((1, 1), (2, 1), (2, 3)):
+            par = parallel_beam_search(world, templates, self_country="A", weights=weights,
+                                       config=cfg, workers=workers, chunks_per_worker=chunks)
+            # Same beam, same nodes, same scores: the split only changes who computes them
+            assert _summary(par) == _summary(serial)
+
+    assert parallel_beam_search(world, templates, self_country="A", weights=weights,
+                                config=SearchConfig(max_depth=0), workers=1) == []
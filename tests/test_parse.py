@@ -1,7 +1,12 @@
 from pathlib import Path
 import pytest
 
-from source.parse import parse_world_and_weights_csv, REQUIRED_RESOURCES
+from source.parse import (
+    REQUIRED_RESOURCES,
+    parse_weights_csv,
+    parse_world_and_weights_csv,
+    parse_world_and_weights_csv_fast,
+)
 
 
 def _write(tmp_path: Path, name: str, text: str) -> Path:
@@ -84,4 +89,56 @@ Carpania,Timber,6,
 
 def test_parse_missing_file_raises():
     with pytest.raises(FileNotFoundError):
-        parse_world_and_weights_csv("does_not_exist.csv")
\ No newline at end of file
+        parse_world_and_weights_csv("does_not_exist.csv")
+
+
+def _assert_same(path):
+    world, weights = parse_world_and_weights_csv(path)
+    fast_world, fast_weights = parse_world_and_weights_csv_fast(path, chunk_size=2)
+
+    assert list(fast_world.country_names()) == list(world.countries.keys())
+    for cname, c in world.countries.items():
+        fc = fast_world.get_country(cname)
+        for r, amt in c.resources.items():
+            assert fc.get(r) == amt
+        for r, amt in fc.resources.items():
+            assert c.get(r) == amt
+    assert fast_weights.weights == weights.weights
+
+
+@pytest.mark.parametrize("csv_text", [
+    """
+Country,Population,MetallicElements,Timber,Housing,HousingWaste
+Atlantis,100,5,10,1,0
+Carpania,50,0,,0,0
+Brobdingnag,"1,200",3
+WEIGHTS,0.2,0.5,1.0,2.0,-2.0
+Atlantis,101,6,11,2,1
+""",
+    """
+Country,Resource,Amount,Weight
+Atlantis,Population,100,0.2
+Atlantis,Timber,10,1.0
+Carpania,Population,50,
+Carpania,Timber,5,2.0
+Carpania,Timber,6,
+,Timber,9,9
+Dis,Electronics
+Dis,Water, 7 ,0.3
+""",
+])
+def test_fast_parser_matches_reference(tmp_path: Path, csv_text: str):
+    _assert_same(_write(tmp_path, "world.csv", csv_text))
+
+
+def test_fast_parser_on_repo_world():
+    _assert_same(Path(__file__).resolve().parent.parent / "init_world.csv")
+
+
+def test_parse_weights_csv_repo_file():
+    weights = parse_weights_csv(Path(__file__).resolve().parent.parent / "resources.csv")
+    assert weights.get("Population") == 0.0
+    assert weights.get("Electronics") == 1.0
+    assert weights.get("HousingWaste") == -0.8
+    for r in REQUIRED_RESOURCES:
+        assert r in weights.weights
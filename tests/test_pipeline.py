@@ -0,0 +1,120 @@
+import io
+import json
+import os
+from pathlib import Path
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.parse import parse_world_and_weights_csv
+from source.successors import decode_action
+from source.expected_utility import expected_utility
+from source.pipeline import WorldStore, iter_results, main, run_pipeline
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _write_world(path: Path, metallic: int = 12) -> Path:
+    path.write_text(
+        "Country,Population,MetallicElements,Timber\n"
+        f"A,10,{metallic},10\n"
+        "B,10,2,30\n"
+        "WEIGHTS,0,0.2,0.2\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_pipeline_evaluates_in_order_and_matches_expected_utility(tmp_path: Path, transforms):
+    world_csv = _write_world(tmp_path / "world.csv")
+    (tmp_path / "template.txt").write_text((ROOT / "template.txt").read_text())
+    reqs = [
+        {"id": "r1", "world": "world.csv", "templates": "template.txt", "self": "A",
+         "schedule": [["T", "MAKE_ALLOYS", "A", 2]], "gamma": 0.8},
+        {"world": "world.csv", "self": "A", "participants": ["A", "B"],
+         "deltas": [{"A": {"Timber": -5}, "B": {"Timber": 5}}], "k": 2.0},
+        {"id": "bad", "world": "world.csv", "self": "A", "deltas": [{"A": {"Timber": -50}}]},
+        {"id": "r4", "world": "world.csv", "templates": "template.txt", "self": "A",
+         "schedule": [["T", "MAKE_ALLOYS", "A", 1]], "gamma": 0.8},
+    ]
+    lines = [json.dumps(r) for r in reqs] + ["", "{not json"]
+    store = WorldStore()
+    results = list(iter_results(lines, store, batch_size=3, base_dir=tmp_path))
+
+    assert [r["id"] for r in results] == ["r1", 2, "bad", "r4", 6]
+    assert [r["ok"] for r in results] == [True, True, False, True, False]
+    assert "insufficient Timber" in results[2]["error"]
+    assert store.misses == 2 and store.hits > 0  # world + templates parsed once
+
+    world, weights = parse_world_and_weights_csv(world_csv)
+    end = world.copy()
+    end.replay([decode_action(("T", "MAKE_ALLOYS", "A", 2), transforms)])
+    assert results[0]["participants"] == ["A"]
+    assert results[0]["eu"] == expected_utility(
+        world, end, self_country="A", participant_countries=["A"], weights=weights,
+        gamma=0.8, N=1, k=1.0, x0=0.0, C=-1.0,
+    )
+
+
+def test_pipeline_malformed_requests_fail_alone(tmp_path: Path):
+    _write_world(tmp_path / "world.csv")
+    good = {"id": "ok", "world": "world.csv", "self": "A", "deltas": [{"A": {"Timber": -1}}]}
+    reqs = [
+        good,
+        {"id": "int", "world": "world.csv", "self": "A", "deltas": [5]},
+        {"id": "str", "world": "world.csv", "self": "A", "deltas": "abc"},
+        {"id": "flat", "world": "world.csv", "self": "A", "deltas": [{"A": 3}]},
+        {"id": "amount", "world": "world.csv", "self": "A", "deltas": [{"A": {"Timber": "x"}}]},
+        dict(good, id="ok2"),
+    ]
+    results = list(iter_results([json.dumps(r) for r in reqs], batch_size=16, base_dir=tmp_path))
+    assert [r["id"] for r in results] == ["ok", "int", "str", "flat", "amount", "ok2"]
+    assert [r["ok"] for r in results] == [True, False, False, False, False, True]
+    assert results[1]["error"].startswith("ValueError: deltas[0]")
+    assert results[2]["error"].startswith("ValueError: deltas must be a list")
+    assert results[0]["eu"] == results[5]["eu"]
+
+
+def test_pipeline_search_and_store_invalidation(tmp_path: Path):
+    world_csv = _write_world(tmp_path / "world.csv")
+    req = {"op": "search", "world": str(world_csv), "templates": str(ROOT / "template.txt"),
+           "self": "A", "config": {"max_depth": 2, "top_k": 2, "algorithm": "dfs"}}
+    store = WorldStore(capacity=4)
+    out = io.StringIO()
+    assert run_pipeline([json.dumps(req)], out, store) == 0
+    result = json.loads(out.getvalue())
+    assert result["ok"] and len(result["results"]) == 2
+    assert result["results"][0]["schedule"][0][0] == "T"
+
+    before = store.world(world_csv)
+    assert store.world(world_csv) is before
+    _write_world(world_csv, metallic=40)
+    os.utime(world_csv, ns=(1, 1))
+    after = store.world(world_csv)
+    assert after is not before and after[0].get_country("A").get("MetallicElements") == 40.0
+
+
+def test_pipeline_cli(tmp_path: Path):
+    _write_world(tmp_path / "world.csv")
+    src = tmp_path / "in.jsonl"
+    src.write_text(json.dumps({"world": "world.csv", "self": "B", "deltas": [{"B": {"Timber": 1}}]}) + "\n")
+    dst = tmp_path / "out.jsonl"
+    assert main([str(src), "-o", str(dst), "--base-dir", str(tmp_path)]) == 0
+    (line,) = dst.read_text().splitlines()
+    assert json.loads(line)["eu"] > -1.0
+
+
+def test_pipeline_on_snapshot_worlds(tmp_path: Path):
+    _write_world(tmp_path / "world.csv")
+    reqs = [
+        {"id": "e", "world": "world.csv", "self": "A", "participants": ["A", "B"],
+         "deltas": [{"A": {"Timber": -5}, "B": {"Timber": 5}}]},
+        {"id": "s", "op": "search", "world": "world.csv", "templates": str(ROOT / "template.txt"),
+         "self": "A", "config": {"max_depth": 2, "top_k": 2, "algorithm": "dfs", "transposition_capacity": 100}},
+    ]
+    lines = [json.dumps(r) for r in reqs]
+    plain = list(iter_results(lines, WorldStore(), base_dir=tmp_path))
+    for _ in range(2):  # writes the snapshot, then loads from it
+        snap = list(iter_results(lines, WorldStore(snapshots=True), base_dir=tmp_path))
+        assert all(r["ok"] for r in snap)
+        assert abs(snap[0]["eu"] - plain[0]["eu"]) < 1e-12
+        assert [r["schedule"] for r in snap[1]["results"]] == [r["schedule"] for r in plain[1]["results"]]
+    assert (tmp_path / "world.csv.wcache").exists()
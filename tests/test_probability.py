@@ -1,4 +1,14 @@
-from source.probability import acceptance_probability, schedule_success_probability
+import math
+
+from source.probability import (
+    acceptance_probability,
+    log_acceptance_probabilities,
+    log_acceptance_probability,
+    log_probability_interval_to_beat,
+    log_schedule_success_probability,
+    schedule_success_probabilities,
+    schedule_success_probability,
+)
 
 
 def test_sigmoid_zero():
@@ -6,4 +16,46 @@ def test_sigmoid_zero():
 
 
 def test_schedule_product():
-    assert schedule_success_probability([0.5, 0.5]) == 0.25
\ No newline at end of file
+    assert schedule_success_probability([0.5, 0.5]) == 0.25
+
+
+def test_log_acceptance_matches_and_never_underflows():
+    for dr in (-30.0, -1.0, 0.0, 0.3, 12.0):
+        assert abs(math.exp(log_acceptance_probability(dr, k=2.0, x0=0.1))
+                   - acceptance_probability(dr, k=2.0, x0=0.1)) < 1e-15
+    assert log_acceptance_probabilities([-1.0, 2.0], k=2.0) == [
+        log_acceptance_probability(-1.0, k=2.0), log_acceptance_probability(2.0, k=2.0)
+    ]
+    # Linear sigmoid underflows here, the log form stays finite
+    assert acceptance_probability(-1000.0) == 0.0
+    assert log_acceptance_probability(-1000.0) == -1000.0
+
+
+def test_log_schedule_product_and_early_exit():
+    drs = [-20.0] * 60
+    lp = log_schedule_success_probability(log_acceptance_probabilities(drs))
+    assert schedule_success_probability([acceptance_probability(d) for d in drs]) == 0.0
+    assert abs(lp - 60 * -20.000000002061154) < 1e-6
+
+    assert log_schedule_success_probability([-1.0, -1.0, -1.0], stop_below=-1.5) == -math.inf
+    assert log_schedule_success_probability([-1.0], stop_below=-1.5) == -1.0
+
+    ps = schedule_success_probabilities([[0.0, 0.0], [0.0]])
+    assert abs(ps[0] - 0.25) < 1e-15 and abs(ps[1] - 0.5) < 1e-15
+
+
+def test_log_probability_interval_to_beat():
+    # EU = C + P*(DR - C) = -1 + 2P; beating 0.0 needs P > 0.5
+    lo, hi = log_probability_interval_to_beat(0.0, 1.0, -1.0)
+    assert abs(lo - math.log(0.5)) < 1e-15 and hi == math.inf
+    assert log_probability_interval_to_beat(2.0, 1.0, -1.0) == (math.inf, math.inf)
+    assert log_probability_interval_to_beat(-2.0, 1.0, -1.0) == (-math.inf, math.inf)
+
+    # DR < C: EU = 1 - 2P; beating 0.0 needs P < 0.5, beating 1.0 is impossible
+    lo, hi = log_probability_interval_to_beat(0.0, -1.0, 1.0)
+    assert lo == -math.inf and abs(hi - math.log(0.5)) < 1e-15
+    assert log_probability_interval_to_beat(1.0, -1.0, 1.0) == (math.inf, math.inf)
+
+    # DR == C: EU is always C
+    assert log_probability_interval_to_beat(0.0, 1.0, 1.0) == (-math.inf, math.inf)
+    assert log_probability_interval_to_beat(1.0, 1.0, 1.0) == (math.inf, math.inf)
@@ -1,5 +1,10 @@
-from source.world_state import WorldState, CountryState, ResourceWeights
-from source.quality import state_quality
+import random
+
+import pytest
+
+from source.world_state import WorldState, CountryState, ResourceWeights, FrozenWeights
+from source.array_world import ArrayWorldState
+from source.quality import state_quality, state_qualities, check_incremental_quality
 
 
 def test_state_quality_basic():
@@ -19,4 +24,94 @@ def test_state_quality_basic():
     q = state_quality(world, "A", weights)
 
     # (50/100) - (10/100) = 0.5 - 0.1 = 0.4
-    assert abs(q - 0.4) < 1e-9
\ No newline at end of file
+    assert abs(q - 0.4) < 1e-9
+
+
+def test_state_qualities_matches_scalar_on_both_backends():
+    world = WorldState({
+        "A": CountryState("A", {"Population": 100, "MetallicElements": 50, "MetallicAlloysWaste": 10}),
+        "B": CountryState("B", {"Population": 0, "MetallicElements": 3}),
+        "C": CountryState("C", {"Population": 40, "Housing": 4, "HousingWaste": 1}),
+    })
+    weights = ResourceWeights({
+        "MetallicElements": 1.0,
+        "MetallicAlloysWaste": -1.0,
+        "Housing": 2.0,
+        "HousingWaste": -2.0,
+    })
+    aw = ArrayWorldState.from_world_state(world)
+
+    for kwargs in ({}, {"exclude": ["Housing"]}, {"pop_floor": 10.0}):
+        expected = {n: state_quality(world, n, weights, **kwargs) for n in "ABC"}
+        for w in (world, aw):
+            got = state_qualities(w, weights, **kwargs)
+            assert set(got) == {"A", "B", "C"}
+            for n in "ABC":
+                assert abs(got[n] - expected[n]) < 1e-12
+
+    assert list(state_qualities(aw, weights, countries=["C"])) == ["C"]
+
+
+def test_incremental_quality_tracks_deltas():
+    weights = ResourceWeights({
+        "Population": 0.0,
+        "MetallicElements": 0.2,
+        "MetallicAlloys": 0.6,
+        "MetallicAlloysWaste": -0.6,
+    })
+    world = WorldState({
+        "A": CountryState("A", {"Population": 100, "MetallicElements": 500}),
+        "B": CountryState("B", {"Population": 0}),
+    })
+    world.bind_weights(weights)
+
+    rng = random.Random(7)
+    a = world.get_country("A")
+    for _ in range(200):
+        if a.has({"MetallicElements": 2}):
+            a.apply_delta_map({"MetallicElements": -2, "MetallicAlloys": 1, "MetallicAlloysWaste": 1})
+        a.add("Population", rng.choice([-1, 1]))
+        check_incremental_quality(world, "A", weights)
+
+    # Copies carry the running sum; pop_floor applies to empty countries
+    w2 = world.copy()
+    w2.get_country("B").add("MetallicAlloys", 2)
+    assert abs(w2.get_country("B").quality() - 1.2) < 1e-12
+    assert world.get_country("B").quality() == 0.0
+    check_incremental_quality(w2, "A", weights)
+
+    with pytest.raises(ValueError):
+        CountryState("X", {"Population": 1}).quality()
+
+
+def test_incremental_quality_exclude_and_floor():
+    weights = ResourceWeights({"Housing": 2.0, "HousingWaste": -2.0})
+    world = WorldState({"A": CountryState("A", {"Population": 3, "Housing": 6, "HousingWaste": 1})})
+    world.bind_weights(weights, exclude=["HousingWaste"], pop_floor=4.0)
+    assert world.get_country("A").quality() == 3.0
+    assert check_incremental_quality(world, "A", weights, exclude=["HousingWaste"], pop_floor=4.0) == 3.0
+
+
+def test_frozen_weights_sparse_scoring():
+    w = WorldState()
+    w.countries["A"] = CountryState("A", {"Population": 10.0, "Food": 20.0, "Dust": 7.0, "Water": 5.0})
+    w.countries["B"] = CountryState("B", {"Population": 4.0, "Food": 2.0})
+    weights = ResourceWeights({"Population": 0.0, "Food": 1.5, "Dust": 0.0, "Water": 2.0})
+
+    frozen = weights.freeze()
+    assert isinstance(frozen, FrozenWeights)
+    assert frozen.names == ("Food", "Water")
+    assert frozen.get("Dust") == 0.0 and frozen.get("Water") == 2.0
+    assert frozen.terms(["Water"]) == (("Food", 0, 1.5),)
+    assert frozen.terms(["Water"]) is frozen.terms({"Water"})  # cached per exclude set
+
+    for name in ("A", "B"):
+        for exclude in (None, ["Food"]):
+            assert state_quality(w, name, frozen, exclude=exclude) == state_quality(
+                w, name, weights, exclude=exclude
+            )
+
+    aw = ArrayWorldState.from_world_state(w)
+    fa = weights.freeze(aw.index)
+    assert fa.ids == (aw.index.get("Food"), aw.index.get("Water"))
+    assert state_qualities(aw, fa) == state_qualities(w, weights)
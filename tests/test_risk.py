@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.probability import acceptance_probability
+from source.risk import (
+    bernoulli_mask,
+    rejecter_count_distribution,
+    rejection_subset_probabilities,
+    schedule_risk,
+    simulate_acceptance,
+)
+
+
+def test_bernoulli_mask_rate_and_edges():
+    rng = random.Random(1)
+    n = 200_000
+    for p in (0.0, 0.1, 0.5, 0.73, 1.0):
+        rate = bernoulli_mask(rng, p, n).bit_count() / n
+        assert rate == pytest.approx(p, abs=0.005)
+    assert bernoulli_mask(rng, 1.0, 10) == 0b1111111111
+    with pytest.raises(ValueError):
+        bernoulli_mask(rng, 1.5, 10)
+
+
+def test_simulation_matches_exact_distribution_and_is_seeded():
+    drs = {"B": 0.5, "C": -0.2, "D": 1.5}
+    prof = simulate_acceptance(drs, 0.8, k=2.0, C=-1.0, samples=200_000, seed=7)
+    again = simulate_acceptance(drs, 0.8, k=2.0, C=-1.0, samples=200_000, seed=7)
+    assert prof == again
+
+    probs = [acceptance_probability(drs[c], k=2.0) for c in prof.countries]
+    assert list(prof.acceptance) == probs
+    exact = rejecter_count_distribution(probs)
+    assert sum(prof.rejecter_histogram) == prof.samples
+    for k, count in enumerate(prof.rejecter_histogram):
+        assert count / prof.samples == pytest.approx(exact[k], abs=0.01)
+    assert prof.rejecter_histogram[0] == prof.successes
+    for c, p in zip(prof.countries, probs):
+        assert prof.rejection_rates[c] == pytest.approx(1.0 - p, abs=0.01)
+
+    p_all = probs[0] * probs[1] * probs[2]
+    assert prof.mean == pytest.approx(p_all * 0.8 + (1 - p_all) * -1.0, abs=0.01)
+    assert prof.quantile(0.0) == -1.0 and prof.quantile(1.0) == 0.8
+    assert prof.cvar(0.01) == -1.0
+    assert prof.variance > 0
+
+    subsets = rejection_subset_probabilities(dict(zip(prof.countries, probs)))
+    assert len(subsets) == 8
+    assert sum(subsets.values()) == pytest.approx(1.0)
+    assert subsets[frozenset()] == pytest.approx(p_all)
+
+
+def test_schedule_risk_defaults_to_one_million_samples():
+    weights = ResourceWeights({"Housing": 1.0})
+    w0 = WorldState({n: CountryState(n, {"Population": 100, "Housing": 0}) for n in "ABCDE"})
+    w1 = w0.copy()
+    for i, n in enumerate("ABCDE"):
+        w1.get_country(n).add("Housing", 10 * i)
+    prof = schedule_risk(w0, w1, self_country="A", participant_countries=list("BCDE"), weights=weights, N=2)
+    assert prof.samples == 1_000_000 and len(prof.rejecter_histogram) == 5
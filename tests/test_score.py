@@ -1,5 +1,11 @@
 from source.world_state import WorldState, CountryState, ResourceWeights
-from source.score import undiscounted_reward, discounted_reward
+from source.score import (
+    undiscounted_reward,
+    discounted_reward,
+    undiscounted_rewards,
+    discounted_rewards,
+    trajectory_rewards,
+)
 
 
 def test_reward():
@@ -17,4 +23,63 @@ def test_reward():
     assert r == 1.0  # 100/100
 
     dr = discounted_reward(w0, w1, "A", weights, gamma=0.9, N=1)
-    assert abs(dr - 0.9) < 1e-9
\ No newline at end of file
+    assert abs(dr - 0.9) < 1e-9
+
+
+def test_batch_rewards_match_scalar():
+    weights = ResourceWeights({"MetallicElements": 1.0, "Housing": 2.0})
+    w0 = WorldState({
+        "A": CountryState("A", {"Population": 100, "MetallicElements": 0}),
+        "B": CountryState("B", {"Population": 50, "Housing": 1}),
+    })
+    w1 = WorldState({
+        "A": CountryState("A", {"Population": 100, "MetallicElements": 100}),
+        "B": CountryState("B", {"Population": 50, "Housing": 4}),
+    })
+
+    r = undiscounted_rewards(w0, w1, weights)
+    dr = discounted_rewards(w0, w1, weights, gamma=0.9, N=3, countries=["B", "A", "B"])
+    assert list(dr) == ["B", "A"]
+    for c in ("A", "B"):
+        assert r[c] == undiscounted_reward(w0, w1, c, weights)
+        assert abs(dr[c] - discounted_reward(w0, w1, c, weights, gamma=0.9, N=3)) < 1e-12
+
+
+def test_trajectory_rewards_every_prefix():
+    weights = ResourceWeights({"MetallicElements": 1.0, "Housing": 2.0})
+    w0 = WorldState({
+        "A": CountryState("A", {"Population": 100, "MetallicElements": 0}),
+        "B": CountryState("B", {"Population": 50, "Housing": 1}),
+    })
+    steps = [
+        {"A": {"MetallicElements": 10}},
+        {"B": {"Housing": 2}},
+        {"A": {"MetallicElements": -5}, "B": {"Housing": 1}},
+    ]
+    worlds = []
+    w = w0.copy()
+    for s in steps:
+        w = w.copy()
+        for name, d in s.items():
+            w.get_country(name).apply_delta_map(d)
+        worlds.append(w)
+
+    by_delta = trajectory_rewards(w0, steps, weights, gamma=0.9)
+    by_world = trajectory_rewards(w0, worlds, weights, gamma=0.9, countries=["B", "A"])
+    assert len(by_delta) == 4 and by_world.countries == ("B", "A")
+    assert by_delta.rewards[0] == {"A": 0.0, "B": 0.0}
+    for n, wn in enumerate(worlds, start=1):
+        for c in ("A", "B"):
+            expected = discounted_reward(w0, wn, c, weights, gamma=0.9, N=n)
+            assert abs(by_delta.rewards[n][c] - expected) < 1e-12
+            assert abs(by_world.rewards[n][c] - expected) < 1e-12
+    assert w0.get_country("A").get("MetallicElements") == 0  # start world untouched
+
+    # Mixed: a delta step after a world step continues from that world
+    mixed = trajectory_rewards(w0, [worlds[0], steps[1], worlds[1], steps[2]], weights, gamma=0.9)
+    reached = [worlds[0], worlds[1], worlds[1], worlds[2]]
+    for n, wn in enumerate(reached, start=1):
+        for c in ("A", "B"):
+            expected = discounted_reward(w0, wn, c, weights, gamma=0.9, N=n)
+            assert abs(mixed.rewards[n][c] - expected) < 1e-12
+    assert worlds[1].get_country("B").get("Housing") == 3  # world steps are not mutated
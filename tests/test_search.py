@@ -0,0 +1,89 @@
+import pytest
+
+from source.score import ScoreParams
+from source.search import BeamSearch, DepthFirstSearch, SearchConfig, beam_search, schedule_participants
+from source.successors import apply_action, iter_actions
+
+
+def test_beam_search_returns_sorted_replayable_schedules(world, transforms, weights):
+    cfg = SearchConfig(beam_width=4, max_depth=3, top_k=3, transfers=(("Timber", 5),))
+
+    results = beam_search(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+
+    assert 1 <= len(results) <= 3
+    eus = [r.eu for r in results]
+    assert eus == sorted(eus, reverse=True)
+
+    # Start world untouched; each schedule replays to the same EU
+    assert world.get_country("A").get("MetallicElements") == 12.0
+    search = BeamSearch(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+    for r in results:
+        w = world.copy()
+        for a in r.actions:
+            apply_action(w, a)
+        assert search.score(w, r.actions) == r.eu
+        assert 1 <= len(r.actions) <= 3
+
+
+def test_frontier_cap_bounds_memory_and_depth_zero(world, transforms, weights):
+    cfg = SearchConfig(beam_width=50, max_depth=3, frontier_cap=2, top_k=2, transfers=(("Timber", 1),))
+    s = BeamSearch(world, transforms.values(), self_country="A", weights=weights,
+                   participant_countries=["A", "B"], params=ScoreParams(gamma=0.5), config=cfg)
+    while s.step():
+        assert len(s.beam) <= 2
+    assert len(s.results()) == 2
+
+    assert beam_search(world, transforms.values(), self_country="A", weights=weights,
+                       config=SearchConfig(max_depth=0)) == []
+
+    with pytest.raises(ValueError):
+        SearchConfig(beam_width=0)
+
+
+def test_schedule_participants(world, transforms):
+    acts = [a for a in iter_actions(world, transforms.values(), transfers=[("Timber", 1)]) if "B" in a.deltas()]
+    assert schedule_participants("C", acts) == ["A", "B", "C"]
+
+
+def test_depth_first_search_single_world_matches_exhaustive_beam(world, transforms, weights):
+    cfg = SearchConfig(beam_width=10_000, max_depth=2, top_k=3, transfers=(("Timber", 5),))
+
+    dfs = DepthFirstSearch(world, transforms.values(), self_country="A", weights=weights, config=cfg).run()
+    beam = beam_search(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+
+    # A beam wider than the tree is exhaustive, so both find the same best EUs
+    assert [r.eu for r in dfs] == [r.eu for r in beam]
+    assert world.get_country("A").get("MetallicElements") == 12.0
+    for r in dfs:
+        w = world.copy()
+        w.replay(r.actions)
+        assert w == r.world
+
+
+def test_depth_first_search_steps_incrementally_and_cleans_up(world, transforms, weights):
+    cfg = SearchConfig(max_depth=3, top_k=3, transfers=(("Timber", 5),), transposition_capacity=64)
+    expected = DepthFirstSearch(world, transforms.values(), self_country="A", weights=weights, config=cfg).run()
+
+    stepped = DepthFirstSearch(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+    steps = 0
+    while stepped.step():
+        steps += 1
+    assert steps > stepped.nodes_generated  # one successor (or one closed node) per call
+    assert not stepped.step()
+    assert [(r.describe(), r.eu) for r in stepped.results()] == [(r.describe(), r.eu) for r in expected]
+
+    failing = DepthFirstSearch(world, transforms.values(), self_country="A", weights=weights, config=cfg)
+    root = failing.root.copy()
+    calls = iter(range(20))
+
+    def score(w, actions):
+        if next(calls) == 19:
+            raise RuntimeError("scoring failed")
+        return 0.0
+
+    failing.score = score
+    with pytest.raises(RuntimeError):
+        failing.run()
+    assert failing.root == root
+    with pytest.raises(ValueError):
+        failing.root.rollback()  # undo log released
@@ -0,0 +1,101 @@
+import pytest
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.state_hash import ZobristKeys, TranspositionTable
+from source.successors import TransferAction, TransformAction, apply_action, expanded
+from source.score import ScoreParams
+from source.search import BeamSearch, DepthFirstSearch, SearchConfig
+
+
+def test_incremental_hash_matches_full_and_ignores_order(world, transforms):
+    keys = ZobristKeys()
+    alloys = TransformAction(transforms["MAKE_ALLOYS"], "A")
+    move = TransferAction("B", "A", "Timber", 5)
+
+    w3 = world.copy()  # stays unhashed and untouched for the undo check below
+    w1 = world
+    w1.enable_hashing(keys)
+    w2 = w1.copy()
+    h0 = w1.state_hash()
+
+    apply_action(w1, alloys)
+    apply_action(w1, move)
+    apply_action(w2, move)
+    apply_action(w2, alloys)
+
+    assert w1.state_hash() == w2.state_hash() == keys.world_hash(w1)
+    assert w1.state_hash() != h0
+
+    # Undo restores the exact hash; explicit zero == missing
+    w3.enable_hashing(keys)
+    with expanded(w3, alloys):
+        pass
+    assert w3.state_hash() == h0
+    w3.get_country("A").add("Housing", 0)
+    assert w3.state_hash() == h0
+
+
+def test_hash_quantization():
+    keys = ZobristKeys(quantum=1e-3)
+    a = CountryState("A", {"Timber": 1.0})
+    b = CountryState("A", {"Timber": 1.0 + 1e-9})
+    c = CountryState("B", {"Timber": 1.0})
+    assert keys.country_hash(a) == keys.country_hash(b)
+    assert keys.country_hash(a) != keys.country_hash(c)
+    with pytest.raises(ValueError):
+        CountryState("X").state_hash
+
+
+def test_transposition_table_lru_and_depth():
+    tt = TranspositionTable(2)
+    tt.store(1, 0.5, 3)
+    assert not tt.is_duplicate(2, 3)
+    assert tt.is_duplicate(1, 3)
+    assert tt.is_duplicate(1, 4)
+    assert not tt.is_duplicate(1, 2)
+
+    tt.store(2, 0.1, 1)
+    tt.get(1)           # 1 becomes most recent
+    tt.store(3, 0.2, 1)  # evicts 2
+    assert 1 in tt and 3 in tt and 2 not in tt
+    assert tt.evictions == 1
+
+    tt.store(1, 0.9, 1)
+    assert tt.get(1).eu == 0.9 and tt.get(1).depth == 1
+
+
+def test_search_drops_transpositions(world, transforms, weights):
+    cfg = SearchConfig(beam_width=20, max_depth=3, top_k=10, transfers=(("Timber", 5),),
+                       transposition_capacity=10_000)
+    s = BeamSearch(world, transforms.values(), self_country="A", weights=weights,
+                   participant_countries=["A", "B"], config=cfg)
+    results = s.run()
+
+    assert s.duplicates_pruned > 0
+    hashes = set()
+    for r in results:
+        key = (r.world.state_hash(), len(r.actions))
+        assert key not in hashes
+        hashes.add(key)
+
+
+def test_deeper_repeat_of_a_state_is_still_scored():
+    # Giving Timber away costs A quality; gamma^N shrinks that loss, so the
+    # same state reached at depth 3 outscores its depth-1 visit and must survive.
+    world = WorldState({
+        "A": CountryState("A", {"Population": 10, "Timber": 10}),
+        "B": CountryState("B", {"Population": 10, "Timber": 10}),
+    })
+    keys = ZobristKeys()
+
+    def reached(capacity):
+        cfg = SearchConfig(max_depth=3, top_k=1000, transfers=(("Timber", 5),),
+                           transposition_capacity=capacity)
+        s = DepthFirstSearch(world, [], self_country="A", weights=ResourceWeights({"Timber": 1.0}),
+                             participant_countries=["A", "B"], params=ScoreParams(gamma=0.5), config=cfg)
+        return s, {(keys.world_hash(r.world), len(r.actions), r.eu) for r in s.run()}
+
+    _, expected = reached(0)
+    pruned, got = reached(1000)
+    assert pruned.duplicates_pruned > 0
+    assert got == expected
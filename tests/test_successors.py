@@ -0,0 +1,54 @@
+import pytest
+
+from source.world_state import WorldState, CountryState
+from source.quality import state_quality
+from source.successors import (
+    TransformAction,
+    TransferAction,
+    apply_action,
+    expanded,
+    iter_actions,
+    iter_successors,
+)
+
+
+def _world():
+    # Poorer than the shared fixture: A can only make alloys, B has a single Timber
+    return WorldState({
+        "A": CountryState("A", {"Population": 10, "MetallicElements": 3}),
+        "B": CountryState("B", {"Population": 10, "Timber": 1}),
+    })
+
+
+def test_iter_actions_prunes_infeasible(transforms):
+    world = _world()
+    actions = [str(a) for a in iter_actions(world, transforms.values(), transfers=[("Timber", 1), ("Timber", 2)])]
+    # A can make alloys (needs 2 ME) but not electronics (needs alloys) or housing
+    assert actions == ["MAKE_ALLOYS(A)", "TRANSFER(B -> A, Timber 1)"]
+
+
+def test_successor_estimates_match_expanded_quality(transforms, weights):
+    world = _world()
+    before = {n: dict(world.get_country(n).resources) for n in "AB"}
+
+    pairs = list(iter_successors(world, transforms.values(), transfers=[("Timber", 1)],
+                                 weights=weights, self_country="A"))
+    assert len(pairs) == 2
+    for action, est in pairs:
+        q0 = state_quality(world, "A", weights)
+        with expanded(world, action) as w:
+            assert abs((state_quality(w, "A", weights) - q0) - est) < 1e-12
+        # Undo restores exact amounts
+        for n in "AB":
+            for r, amt in before[n].items():
+                assert world.get_country(n).get(r) == amt
+
+
+def test_apply_action_rejects_infeasible_without_changes(transforms):
+    world = _world()
+    with pytest.raises(ValueError):
+        apply_action(world, TransformAction(transforms["MAKE_ELECTRONICS"], "A"))
+    with pytest.raises(ValueError):
+        apply_action(world, TransferAction("A", "B", "Timber", 1))
+    assert world.get_country("A").get("MetallicElements") == 3.0
+    assert world.get_country("B").get("Timber") == 1.0
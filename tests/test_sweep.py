@@ -0,0 +1,70 @@
+import pytest
+
+from source.world_state import WorldState, CountryState, ResourceWeights
+from source.expected_utility import expected_utility
+from source.sweep import ParameterGrid, parameter_sweep, prepare_schedule
+
+
+def _worlds():
+    weights = ResourceWeights({"Population": 0.0, "Housing": 1.0, "HousingWaste": -1.0})
+    w0 = WorldState({
+        n: CountryState(n, {"Population": 100, "Housing": 0, "HousingWaste": 0})
+        for n in ("A", "B", "C")
+    })
+    w1 = w0.copy()
+    w1.get_country("A").add("Housing", 5)
+    w1.get_country("B").add("HousingWaste", 2)
+    w1.get_country("C").add("Housing", 3)
+    return w0, w1, weights
+
+
+def test_sweep_matches_expected_utility_at_every_point():
+    w0, w1, weights = _worlds()
+    grid = ParameterGrid(gamma=(0.5, 0.9), k=(1.0, 3.0), x0=(0.0, 0.02), C=(-1.0, 0.0, -0.5))
+    inputs = [
+        prepare_schedule(w0, w1, weights, self_country="A", participant_countries=["B", "C"], N=n, label=f"s{n}")
+        for n in (1, 3)
+    ]
+    table = parameter_sweep(inputs, grid)
+    assert len(table) == 2 * len(grid) == 48
+
+    rows = list(table.rows())
+    assert len(rows) == 48
+    for r in rows:
+        expected = expected_utility(
+            w0, w1, self_country="A", participant_countries=["B", "C"], weights=weights,
+            gamma=r.gamma, N=int(r.schedule[1:]), k=r.k, x0=r.x0, C=r.C,
+        )
+        assert r.eu == expected
+        assert table.value(r.schedule, gamma=r.gamma, k=r.k, x0=r.x0, C=r.C) == r.eu
+
+    best = table.best("s3")
+    assert best.schedule == "s3" and best.eu == max(r.eu for r in rows if r.schedule == "s3")
+    with pytest.raises(KeyError):
+        table.value("s1", gamma=0.7, k=1.0, x0=0.0, C=-1.0)
+
+
+def test_grid_validation_and_around():
+    with pytest.raises(ValueError):
+        ParameterGrid(gamma=(1.0,), k=(1.0,), x0=(0.0,), C=(-1.0,))
+    with pytest.raises(ValueError):
+        ParameterGrid(gamma=(), k=(1.0,), x0=(0.0,), C=(-1.0,))
+    grid = ParameterGrid.around(k=[1.0, 2.0])
+    assert grid.shape == (1, 2, 1, 1) and grid.gamma == (0.9,)
+    with pytest.raises(ValueError):
+        ParameterGrid.around(beta=[1.0])
+
+
+def test_ten_thousand_point_grid():
+    w0, w1, weights = _worlds()
+    inputs = [prepare_schedule(w0, w1, weights, self_country="A", participant_countries=["B", "C"], N=3, label="s")]
+    grid = ParameterGrid(
+        gamma=tuple(0.05 * i for i in range(1, 11)),
+        k=tuple(0.5 * i for i in range(1, 11)),
+        x0=tuple(0.01 * i for i in range(10)),
+        C=tuple(-0.1 * i for i in range(10)),
+    )
+    table = parameter_sweep(inputs, grid)
+    assert len(table) == 10_000 and grid.shape == (10, 10, 10, 10)
+    row = table.best()
+    assert row.eu == table.value("s", gamma=row.gamma, k=row.k, x0=row.x0, C=row.C)
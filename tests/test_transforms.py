@@ -0,0 +1,82 @@
+import pytest
+
+from source.world_state import CountryState, WorldState
+from source.array_world import ArrayWorldState, ResourceIndex
+from source.transforms import parse_transform_templates, compile_transforms
+
+
+def test_load_repo_template(templates):
+    assert [t.name for t in templates] == ["BUILD_HOUSING", "MAKE_ALLOYS", "MAKE_ELECTRONICS"]
+
+    alloys = templates[1]
+    assert alloys.inputs == (("Population", 1.0), ("MetallicElements", 2.0))
+    assert alloys.net() == {
+        "Population": 0.0,
+        "MetallicElements": -2.0,
+        "MetallicAlloys": 1.0,
+        "MetallicAlloysWaste": 1.0,
+    }
+
+
+def test_parse_errors():
+    with pytest.raises(ValueError):
+        parse_transform_templates("(TRANSFORM X (INPUTS (A 1)) (OUTPUTS (B 1))")
+    with pytest.raises(ValueError):
+        parse_transform_templates("(TRANSFORM X (OUTPUTS (B 1)) (INPUTS (A 1)))")
+
+
+def test_max_multiplier_matches_repeated_has(transforms):
+    housing = transforms["BUILD_HOUSING"]
+    c = CountryState("X", {"Population": 5, "MetallicElements": 3, "Timber": 12, "MetallicAlloys": 9})
+
+    n = housing.max_multiplier(c)
+    assert n == 2  # Timber: 12 -> 7 -> 2
+
+    # Same answer as stepping one application at a time
+    step = CountryState("X", dict(c.resources))
+    count = 0
+    while step.has(housing.inputs):
+        step.apply_delta_map(housing.delta_map())
+        count += 1
+    assert count == n
+
+    assert housing.max_multiplier(c, limit=1) == 1
+    assert housing.max_multiplier(CountryState("Y", {"Population": 4})) == 0
+
+
+def test_apply_n_in_one_step_both_backends(templates):
+    index = ResourceIndex()
+    ts = compile_transforms(templates, index)
+    alloys = ts["MAKE_ALLOYS"]
+
+    world = WorldState({"A": CountryState("A", {"Population": 10, "MetallicElements": 7})})
+    aw = ArrayWorldState.from_world_state(world, index)
+
+    for c in (world.get_country("A"), aw.get_country("A")):
+        alloys.apply(c, 3)
+        assert c.get("MetallicElements") == 1.0
+        assert c.get("MetallicAlloys") == 3.0
+        assert c.get("MetallicAlloysWaste") == 3.0
+        assert c.get("Population") == 10.0
+
+        with pytest.raises(ValueError):
+            alloys.apply(c, 1)
+        assert c.get("MetallicElements") == 1.0
+
+
+def test_max_multiplier_is_exact_at_the_boundary(templates):
+    index = ResourceIndex()
+    ts = compile_transforms(templates, index)
+    alloys = ts["MAKE_ALLOYS"]  # needs 2 MetallicElements, consumes 2
+
+    for amount, expected in ((6.0, 3), (6.0 - 1e-12, 2), (0.6, 0), (2.0000000001, 1)):
+        world = WorldState({"A": CountryState("A", {"Population": 1, "MetallicElements": amount})})
+        aw = ArrayWorldState.from_world_state(world, index)
+        results = []
+        for c in (world.get_country("A"), aw.get_country("A")):
+            n = alloys.max_multiplier(c)
+            assert n == expected
+            alloys.apply(c, n)  # never drives a resource negative, so both backends accept it
+            results.append(c.get("MetallicElements"))
+            assert results[-1] >= 0.0
+        assert results[0] == results[1]
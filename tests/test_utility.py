@@ -1,7 +1,16 @@
+import math
+
 import pytest
 
 from source.world_state import WorldState, CountryState, ResourceWeights
-from source.expected_utility import expected_utility
+from source.array_world import ArrayWorldState
+from source.expected_utility import (
+    best_truncation,
+    expected_utility,
+    expected_utility_batch,
+    expected_utility_trajectory,
+)
+from source.probability import acceptance_probability, log_acceptance_probability
 
 
 def test_expected_utility_bounds_deterministic_case():
@@ -85,4 +94,99 @@ def test_expected_utility_participants_product_effect():
         C=-1.0,
     )
 
-    assert eu_3 < eu_2
\ No newline at end of file
+    assert eu_3 < eu_2
+
+
+def test_expected_utility_batch_identical_to_scalar():
+    weights = ResourceWeights({
+        "Population": 0.0,
+        "Housing": 1.0,
+        "HousingWaste": -1.0,
+    })
+    w0 = WorldState({
+        n: CountryState(n, {"Population": 100, "Housing": 0, "HousingWaste": 0})
+        for n in ("A", "B", "C")
+    })
+    ends = []
+    for i in range(6):
+        w = w0.copy()
+        w.get_country("A").add("Housing", i)
+        w.get_country("B").add("HousingWaste", i % 3)
+        w.get_country("C").add("Housing", 7 - i)
+        ends.append(w)
+
+    kwargs = dict(
+        self_country="A",
+        participant_countries=["B", "C"],
+        weights=weights,
+        gamma=0.9,
+        N=3,
+        k=2.0,
+        x0=0.01,
+        C=-1.0,
+    )
+    scalar = [expected_utility(w0, w1, **kwargs) for w1 in ends]
+    assert expected_utility_batch(w0, ends, **kwargs) == scalar
+
+    a0 = ArrayWorldState.from_world_state(w0)
+    a_ends = [ArrayWorldState.from_world_state(w, a0.index) for w in ends]
+    assert expected_utility_batch(a0, iter(a_ends), **kwargs) == [
+        expected_utility(a0, a1, **kwargs) for a1 in a_ends
+    ]
+
+    with pytest.raises(ValueError):
+        expected_utility_batch(w0, ends, **{**kwargs, "gamma": 1.0})
+
+
+def test_expected_utility_trajectory_matches_per_prefix():
+    weights = ResourceWeights({"Population": 0.0, "Housing": 1.0, "HousingWaste": -1.0})
+    w0 = WorldState({
+        n: CountryState(n, {"Population": 100, "Housing": 0, "HousingWaste": 0})
+        for n in ("A", "B")
+    })
+    steps = [
+        {"A": {"Housing": 5}, "B": {"Housing": 1}},
+        {"A": {"Housing": 5}},
+        {"A": {"HousingWaste": 40}},
+    ]
+    kwargs = dict(
+        self_country="A", participant_countries=["B"], weights=weights,
+        k=2.0, x0=0.0, C=-1.0, gamma=0.9,
+    )
+    eus = expected_utility_trajectory(w0, steps, **kwargs)
+    assert len(eus) == 4
+
+    w = w0.copy()
+    for n, s in enumerate(steps, start=1):
+        w.replay([s])
+        assert eus[n] == pytest.approx(expected_utility(w0, w, N=n, **kwargs), abs=1e-12)
+
+    assert best_truncation(eus) == (2, eus[2])
+    with pytest.raises(ValueError):
+        best_truncation(eus[:1])
+
+
+def test_expected_utility_many_participants_does_not_collapse_to_C():
+    # 60 participants each with DR = -12.5: their linear product underflows to 0.0,
+    # but P(s) * (DR_self - C) is still a normal float
+    names = [f"P{i}" for i in range(60)]
+    weights = ResourceWeights({"Population": 0.0, "Timber": 1.0})
+    w0 = WorldState({n: CountryState(n, {"Population": 1, "Timber": 12.5}) for n in names})
+    w0.countries["S"] = CountryState("S", {"Population": 1, "Timber": 0})
+    w1 = w0.copy()
+    for n in names:
+        w1.get_country(n).set("Timber", 0.0)
+    w1.get_country("S").set("Timber", 1e20)
+
+    p_linear = 1.0
+    for _ in names:
+        p_linear *= acceptance_probability(-12.5)
+    assert p_linear == 0.0
+
+    kwargs = dict(self_country="S", participant_countries=names, weights=weights,
+                  gamma=0.5, N=0, k=1.0, x0=0.0, C=0.0)
+    eu = expected_utility(w0, w1, **kwargs)
+    expected = math.exp(60 * log_acceptance_probability(-12.5) + math.log(1e20))
+    assert eu > 0.0
+    assert abs(eu - expected) <= 1e-12 * expected
+    assert expected_utility_batch(w0, [w1], **kwargs) == [eu]
@@ -0,0 +1,110 @@
+import json
+import os
+import struct
+from pathlib import Path
+
+from source.array_world import ArrayWorldState
+from source.parse import parse_world_and_weights_csv, parse_weights_csv
+from source.world_cache import (
+    MAGIC,
+    cache_path_for,
+    load_world_cached,
+    load_weights_cached,
+    read_cache,
+)
+
+
+def _write(tmp_path: Path, name: str, text: str) -> Path:
+    p = tmp_path / name
+    p.write_text(text.strip() + "\n", encoding="utf-8")
+    return p
+
+
+WIDE = """
+Country,Population,MetallicElements,Timber,Housing,HousingWaste
+Atlantis,100,5,10,1,0
+Carpania,50,0,0,0,0
+WEIGHTS,0.2,0.5,1.0,2.0,-2.0
+"""
+
+
+def test_world_snapshot_roundtrip_and_hit(tmp_path: Path):
+    p = _write(tmp_path, "world.csv", WIDE)
+    world, weights = load_world_cached(p)
+    snap = cache_path_for(p)
+    assert snap.exists()
+
+    hit = read_cache(snap, kind="world")
+    assert hit is not None
+    cached, cached_weights = hit
+    assert list(cached.country_names()) == ["Atlantis", "Carpania"]
+    assert cached.get_country("Atlantis").get("Timber") == 10.0
+    assert cached_weights.weights == weights.weights
+
+    # Second load comes from the snapshot and agrees with the plain parser
+    world2, weights2 = load_world_cached(p)
+    ref_world, ref_weights = parse_world_and_weights_csv(p)
+    for name, c in ref_world.countries.items():
+        for r, amt in c.resources.items():
+            assert world2.get_country(name).get(r) == amt
+    assert weights2.weights == ref_weights.weights
+
+    cached_world, _ = parse_world_and_weights_csv(p, cache=True)
+    assert isinstance(cached_world, ArrayWorldState)  # no per-country dicts rebuilt on load
+    assert cached_world.get_country("Carpania").get("Population") == 50.0
+
+
+def test_snapshot_invalidated_when_csv_changes(tmp_path: Path):
+    p = _write(tmp_path, "world.csv", WIDE)
+    load_world_cached(p)
+
+    # Same size, same mtime, different content: only the hash catches it
+    st = p.stat()
+    p.write_text(p.read_text().replace("Atlantis,100", "Atlantis,900"), encoding="utf-8")
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns))
+    world, _ = load_world_cached(p)
+    assert world.get_country("Atlantis").get("Population") == 900.0
+
+    # Different required resources is a different snapshot
+    world, weights = load_world_cached(p, required_resources=["Water"])
+    assert "Water" in weights.weights and "Electronics" not in weights.weights
+
+
+def _snapshot(header) -> bytes:
+    blob = json.dumps(header).encode("utf-8")
+    return MAGIC + struct.pack("<Q", len(blob)) + blob
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path: Path):
+    p = _write(tmp_path, "world.csv", WIDE)
+    snap = cache_path_for(p)
+    snap.write_bytes(b"garbage")
+    world, _ = load_world_cached(p)
+    assert world.get_country("Atlantis").get("Timber") == 10.0
+    assert read_cache(snap, kind="world") is not None
+
+    good = snap.read_bytes()
+    (hlen,) = struct.unpack_from("<Q", good, len(MAGIC))
+    header = json.loads(good[len(MAGIC) + 8:len(MAGIC) + 8 + hlen])
+    torn = [
+        MAGIC + b"\0\0",                            # cut inside the length field
+        MAGIC + struct.pack("<Q", 1 << 40) + b"{}",  # length past the end of the file
+        _snapshot({k: v for k, v in header.items() if k != "weights"}),
+        _snapshot({**header, "countries": "Atlantis"}),
+        _snapshot({**header, "weights": {"Timber": "heavy"}}),
+        _snapshot([header]),
+    ]
+    for blob in torn:
+        snap.write_bytes(blob)
+        assert read_cache(snap, kind="world") is None
+        world, _ = load_world_cached(p)  # falls back to the CSV and rewrites the snapshot
+        assert world.get_country("Atlantis").get("Timber") == 10.0
+        assert read_cache(snap, kind="world") is not None
+
+
+def test_weights_snapshot(tmp_path: Path):
+    p = _write(tmp_path, "resources.csv", "Resource,Weight\nPopulation,0\nTimber,0.2\nHousing,0.8")
+    w1 = load_weights_cached(p)
+    assert cache_path_for(p).exists()
+    w2 = parse_weights_csv(p, cache=True)
+    assert w1.weights == w2.weights == parse_weights_csv(p).weights
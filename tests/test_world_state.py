@@ -64,4 +64,140 @@ def test_world_get_country_and_copy_deep():
 def test_resource_weights_default_zero():
     rw = ResourceWeights({"Housing": 2.0})
     assert rw.get("Housing") == 2.0
-    assert rw.get("Missing") == 0.0
\ No newline at end of file
+    assert rw.get("Missing") == 0.0
+
+
+def test_copy_shares_untouched_inventories():
+    w = WorldState({
+        "Atlantis": CountryState("Atlantis", {"Timber": 10}),
+        "Carpania": CountryState("Carpania", {"Timber": 3}),
+    })
+    w2 = w.copy()
+
+    # Nothing cloned until a write happens
+    assert w2.get_country("Atlantis").resources is w.get_country("Atlantis").resources
+
+    w2.get_country("Atlantis").apply_delta_map({"Timber": -4, "Housing": 1})
+
+    # Only the mutated country got its own inventory
+    assert w2.get_country("Atlantis").resources is not w.get_country("Atlantis").resources
+    assert w2.get_country("Carpania").resources is w.get_country("Carpania").resources
+
+    # Parent never mutated
+    assert w.get_country("Atlantis").get("Timber") == 10.0
+    assert w.get_country("Atlantis").get("Housing") == 0.0
+    assert "Housing" not in w.get_country("Atlantis").resources
+
+
+def test_copy_parent_writes_do_not_leak_into_children():
+    w = WorldState({"A": CountryState("A", {"Timber": 10})})
+    w2 = w.copy()
+    w3 = w2.copy()
+
+    w.get_country("A").add("Timber", 5)
+    w3.get_country("A").add("Timber", -1)
+
+    assert w.get_country("A").get("Timber") == 15.0
+    assert w2.get_country("A").get("Timber") == 10.0
+    assert w3.get_country("A").get("Timber") == 9.0
+
+
+def test_copy_failed_update_keeps_sharing():
+    w = WorldState({"A": CountryState("A", {"Timber": 1})})
+    w2 = w.copy()
+    with pytest.raises(ValueError):
+        w2.get_country("A").apply_delta_map({"Timber": -2})
+    assert w2.get_country("A").resources is w.get_country("A").resources
+    assert w.get_country("A").get("Timber") == 1.0
+
+
+def test_checkpoint_rollback_restores_exact_amounts():
+    w = WorldState({
+        "A": CountryState("A", {"Timber": 0.1, "Housing": 0}),
+        "B": CountryState("B", {"Timber": 5}),
+    })
+    with pytest.raises(ValueError):
+        w.rollback()
+
+    m0 = w.checkpoint()
+    w.apply_delta("A", {"Timber": 0.2, "Housing": 1})
+    m1 = w.checkpoint()
+    w.apply_delta("B", {"Timber": -5, "Electronics": 2})
+    with pytest.raises(ValueError):
+        w.apply_delta("A", {"Timber": -1})  # failed update leaves no log entries
+
+    w.rollback(m1)
+    assert w.get_country("B").get("Timber") == 5.0
+    assert w.get_country("B").get("Electronics") == 0.0
+    assert abs(w.get_country("A").get("Timber") - 0.3) < 1e-12
+
+    w.rollback(m0)
+    assert w.get_country("A").get("Timber") == 0.1  # exact, not 0.1 + 0.2 - 0.2
+    assert w.get_country("A").get("Housing") == 0.0
+
+
+def test_replay_is_all_or_nothing_and_copy_safe():
+    w = WorldState({"A": CountryState("A", {"Timber": 3}), "B": CountryState("B", {})})
+    snapshot = w.copy()
+
+    mark = w.replay([
+        {"A": {"Timber": -1}, "B": {"Timber": 1}},
+        {"A": {"Timber": -1}, "B": {"Timber": 1}},
+    ])
+    assert w.get_country("B").get("Timber") == 2.0
+
+    with pytest.raises(ValueError):
+        w.replay([{"A": {"Timber": -1}}, {"A": {"Timber": -1}}])
+    assert w.get_country("A").get("Timber") == 1.0
+
+    w.rollback(mark)
+    assert w.get_country("A").get("Timber") == 3.0
+    assert w.get_country("B").get("Timber") == 0.0
+    assert snapshot.get_country("A").get("Timber") == 3.0
+
+    w.release()
+    w.apply_delta("A", {"Timber": -3})
+    with pytest.raises(ValueError):
+        w.rollback()
+
+
+def test_apply_batch_is_atomic_across_countries():
+    w = WorldState({
+        "A": CountryState("A", {"Gold": 5.0}),
+        "B": CountryState("B", {"Gold": 1.0, "Food": 4.0}),
+        "C": CountryState("C", {}),
+    })
+    w.bind_weights(ResourceWeights({"Gold": 1.0}))
+    before = w.copy()
+
+    # A gives 3 Gold split between B and C; B sends all its Food to C
+    w.apply_batch([
+        ("A", "Gold", -2.0), ("B", "Gold", 2.0),
+        ("A", "Gold", -1.0), ("C", "Gold", 1.0),
+        ("B", "Food", -4.0), ("C", "Food", 4.0),
+    ])
+    assert w.get_country("A").get("Gold") == 2.0
+    assert w.get_country("B").resources == {"Gold": 3.0, "Food": 0.0}
+    assert w.get_country("C").resources == {"Gold": 1.0, "Food": 4.0}
+    assert w.get_country("C").quality() == 1.0
+    assert before.get_country("A").get("Gold") == 5.0  # copy-on-write respected
+
+    snapshot = w.copy()
+    with pytest.raises(ValueError):
+        w.apply_batch([("C", "Gold", 5.0), ("A", "Gold", -3.0)])
+    with pytest.raises(KeyError):
+        w.apply_batch([("A", "Gold", -1.0), ("Z", "Gold", 1.0)])
+    assert w == snapshot
+
+    # Intermediate negatives are fine as long as the net amount is not
+    w.apply_batch([("C", "Food", -5.0), ("C", "Food", 2.0)])
+    assert w.get_country("C").get("Food") == 1.0
+
+
+def test_apply_batch_is_journaled():
+    w = WorldState({"A": CountryState("A", {"Gold": 5.0}), "B": CountryState("B", {})})
+    mark = w.checkpoint()
+    w.apply_batch([("A", "Gold", -5.0), ("B", "Gold", 5.0)])
+    w.rollback(mark)
+    assert w.get_country("A").resources == {"Gold": 5.0}
+    assert w.get_country("B").resources == {}